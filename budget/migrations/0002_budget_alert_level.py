@@ -0,0 +1,18 @@
+# Generated by Django 5.1.3 on 2026-10-18 18:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('budget', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='budget',
+            name='alert_level',
+            field=models.PositiveSmallIntegerField(choices=[(0, 'None'), (1, 'Warning'), (2, 'Critical')], default=0),
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.1.3 on 2026-10-18 19:04
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('budget', '0002_budget_alert_level'),
+        ('category', '0003_soft_delete_partial_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='budget',
+            index=models.Index(condition=models.Q(('is_deleted', False)), fields=['user', '-created_at', '-id'], name='budget_user_created_live_idx'),
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.1.3 on 2026-10-18 19:27
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('budget', '0003_soft_delete_partial_indexes'),
+        ('category', '0003_soft_delete_partial_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterUniqueTogether(
+            name='budget',
+            unique_together=set(),
+        ),
+        migrations.AddConstraint(
+            model_name='budget',
+            constraint=models.UniqueConstraint(condition=models.Q(('is_deleted', False)), fields=('user', 'category', 'year', 'month'), name='budget_unique_live_period'),
+        ),
+    ]
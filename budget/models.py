@@ -4,6 +4,7 @@ from django.core.validators import MinValueValidator, MaxValueValidator
 from user.models import CustomUser
 from category.models import Category
 from utils.models import BaseModel
+from utils.constants import BudgetAlertLevel
 from datetime import timedelta
 
 
@@ -36,7 +37,27 @@ class Budget(BaseModel):
         max_digits=10,
         decimal_places=2,
     )
+    # Highest threshold already alerted on for this budget, so an alert is only
+    # sent when spending crosses a threshold upwards.
+    alert_level = models.PositiveSmallIntegerField(
+        choices=BudgetAlertLevel.CHOICES,
+        default=BudgetAlertLevel.NONE,
+    )
 
     class Meta:
         ordering = ["-year", "-month"]
-        unique_together = ["user", "category", "year", "month", "is_deleted"]
+        # Any number of deleted budgets may share a period with the live one.
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "category", "year", "month"],
+                name="budget_unique_live_period",
+                condition=models.Q(is_deleted=False),
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=["user", "-created_at", "-id"],
+                name="budget_user_created_live_idx",
+                condition=models.Q(is_deleted=False),
+            ),
+        ]
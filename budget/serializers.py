@@ -1,10 +1,10 @@
 from datetime import date
 from decimal import Decimal
-from django.db.models import Sum
 from rest_framework import serializers
 from .models import Budget
+from category.models import Category
 from user.models import CustomUser
-from transaction.models import Transaction
+from transaction.utils import get_monthly_total
 from rest_framework.exceptions import ValidationError
 from utils.is_uuid import is_uuid
 
@@ -22,6 +22,7 @@ class BudgetSerializer(serializers.ModelSerializer):
             "user",
             "category",
             "spent_amount",
+            "alert_level",
             "year",
             "month",
             "is_deleted",
@@ -34,9 +35,12 @@ class BudgetSerializer(serializers.ModelSerializer):
             "month",
             "is_deleted",
             "spent_amount",
+            "alert_level",
             "created_at",
             "updated_at",
         ]
+        # Deleted categories are rejected by validate_category.
+        extra_kwargs = {"category": {"queryset": Category.objects.all_with_deleted()}}
 
     def __init__(self, *args, **kwargs):
         request = kwargs.get("context", {}).get("request", None)
@@ -174,12 +178,11 @@ class BudgetSerializer(serializers.ModelSerializer):
 
     def get_spent_amount(self, obj):
         """Get current spent amount for budget"""
-
-        spent = Transaction.objects.filter(
-            user=obj.user,
-            category=obj.category,
-            date__year=obj.year,
-            date__month=obj.month,
-            is_deleted=False,
-        ).aggregate(total=Sum("amount"))["total"] or Decimal("0.00")
+        spent_amounts = self.context.get("spent_amounts")
+        if spent_amounts is not None:
+            spent = spent_amounts.get(
+                (obj.user_id, obj.category_id, obj.year, obj.month), Decimal("0.00")
+            )
+        else:
+            spent = get_monthly_total(obj.user_id, obj.category_id, obj.year, obj.month)
         return str(spent)
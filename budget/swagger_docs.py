@@ -19,6 +19,18 @@ budget_list_get_doc = swagger_auto_schema(
             description="Filter by month-year in MM-YYYY format",
             type=openapi.TYPE_STRING,
         ),
+        openapi.Parameter(
+            "cursor",
+            openapi.IN_QUERY,
+            description="Opaque cursor from a previous `next`/`previous` link",
+            type=openapi.TYPE_STRING,
+        ),
+        openapi.Parameter(
+            "pagination",
+            openapi.IN_QUERY,
+            description="Set to `offset` for page-number pagination with a total count",
+            type=openapi.TYPE_STRING,
+        ),
     ],
     responses={
         200: BudgetSerializer(many=True),
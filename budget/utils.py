@@ -1,9 +1,9 @@
 from django.conf import settings
 from decimal import Decimal
-from django.db.models import Sum
 from services.notification import send_mail
 from .models import Budget
-from transaction.models import Transaction
+from transaction.utils import get_monthly_total
+from utils.constants import BudgetAlertLevel
 
 
 def monitor_budget_and_notify(budget):
@@ -12,25 +12,44 @@ def monitor_budget_and_notify(budget):
     month = budget.month
     year = budget.year
 
-    total_spent = Transaction.objects.filter(
-        user=user,
-        category=category,
-        date__year=year,
-        date__month=month,
-        is_deleted=False,
-    ).aggregate(Sum("amount"))["amount__sum"] or Decimal("0")
+    total_spent = get_monthly_total(user.id, category.id, year, month)
+    evaluate_budget_alert(budget, total_spent)
 
-    # Check if the spending has exceeded any thresholds
+
+def get_alert_level(budget, total_spent):
+    """Return the threshold level reached by `total_spent`."""
     total_spent_percentage = (total_spent / budget.amount) * 100
 
-    # Check for warning and critical thresholds
     if Decimal(total_spent_percentage) >= budget.CRITICAL_THRESHOLD:
-        send_budget_alert(budget, total_spent, critical=True)
-    elif Decimal(total_spent_percentage) >= budget.WARNING_THRESHOLD:
-        send_budget_alert(
-            budget,
-            total_spent,
+        return BudgetAlertLevel.CRITICAL
+    if Decimal(total_spent_percentage) >= budget.WARNING_THRESHOLD:
+        return BudgetAlertLevel.WARNING
+    return BudgetAlertLevel.NONE
+
+
+def evaluate_budget_alert(budget, total_spent):
+    """
+    Persist the alert level reached by `total_spent` and email on an upward crossing.
+
+    The level is raised with a conditional UPDATE, so when several workers
+    evaluate the same budget at once only the one that moves it sends the
+    email. Dropping below a threshold lowers the level silently, which re-arms
+    the alert for the next crossing.
+    """
+    level = get_alert_level(budget, total_spent)
+
+    if level > budget.alert_level:
+        raised = Budget.objects.filter(id=budget.id, alert_level__lt=level).update(
+            alert_level=level
         )
+        budget.alert_level = level
+        if raised:
+            send_budget_alert(
+                budget, total_spent, critical=level == BudgetAlertLevel.CRITICAL
+            )
+    elif level < budget.alert_level:
+        Budget.objects.filter(id=budget.id).update(alert_level=level)
+        budget.alert_level = level
 
 
 def send_budget_alert(budget, total_spent, critical=False):
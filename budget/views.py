@@ -20,11 +20,13 @@ from .swagger_docs import (
     budget_detail_get_doc,
     budget_detail_patch_doc,
 )
-from utils.pagination import CustomPageNumberPagination
+from utils.pagination import CursorOrPageNumberPagination
 from .tasks import process_budget_spending
+from transaction.models import MonthlyCategoryTotal
+from utils.constants import TransactionType
 
 
-class BudgetListCreateView(APIView, CustomPageNumberPagination):
+class BudgetListCreateView(APIView, CursorOrPageNumberPagination):
     permission_classes = [IsAuthenticated]
 
     @budget_list_get_doc
@@ -37,16 +39,14 @@ class BudgetListCreateView(APIView, CustomPageNumberPagination):
             queryset = self._get_filtered_queryset(category_id, month_year, user)
             paginated_budget = self.paginate_queryset(queryset, request)
             serializer = BudgetSerializer(
-                paginated_budget, many=True, context={"request": request}
-            )
-            return success_response(
-                {
-                    "count": queryset.count(),
-                    "next": self.get_next_link(),
-                    "previous": self.get_previous_link(),
-                    "results": serializer.data,
-                }
+                paginated_budget,
+                many=True,
+                context={
+                    "request": request,
+                    "spent_amounts": self._get_spent_amounts(paginated_budget),
+                },
             )
+            return success_response(self.get_paginated_payload(serializer.data))
         except Category.DoesNotExist:
             return not_found_error_response("Category not found")
 
@@ -61,9 +61,28 @@ class BudgetListCreateView(APIView, CustomPageNumberPagination):
             return success_single_response(serializer.data)
         return validation_error_response(serializer.errors)
 
+    def _get_spent_amounts(self, budgets):
+        """Fetch the spent amounts of a page of budgets with one rollup query."""
+        keys = {(b.user_id, b.category_id, b.year, b.month) for b in budgets}
+        if not keys:
+            return {}
+        totals = MonthlyCategoryTotal.objects.filter(
+            user_id__in={key[0] for key in keys},
+            category_id__in={key[1] for key in keys},
+            year__in={key[2] for key in keys},
+            month__in={key[3] for key in keys},
+            type=TransactionType.DEBIT,
+        ).values_list("user_id", "category_id", "year", "month", "total")
+        return {
+            (user_id, category_id, year, month): total
+            for user_id, category_id, year, month, total in totals
+            if (user_id, category_id, year, month) in keys
+        }
+
     def _get_filtered_queryset(self, category_id=None, month_year=None, user=None):
         """Get filtered queryset based on user permissions and filters"""
-        queryset = Budget.objects.filter()
+        # Staff see every budget, deleted ones included
+        queryset = Budget.objects.all_with_deleted()
 
         # Apply user filter for non-staff users
         if not user.is_staff:
@@ -111,7 +130,9 @@ class BudgetDetailView(APIView):
             budget, data=request.data, context={"request": request}, partial=True
         )
         if serializer.is_valid():
-            serializer.save()
+            budget = serializer.save()
+            # A new amount can move the budget across a threshold either way.
+            process_budget_spending.delay(budget.id)
             return success_single_response(
                 serializer.data, status_code=status.HTTP_201_CREATED
             )
@@ -130,6 +151,8 @@ class BudgetDetailView(APIView):
 
     def _get_budget_object(self, id):
         """Get budget object with proper filtering"""
-        budget = get_object_or_404(Budget, id=id)
+        budget = get_object_or_404(
+            Budget.objects.visible_to(self.request.user), id=id
+        )
         self.check_object_permissions(self.request, budget)
         return budget
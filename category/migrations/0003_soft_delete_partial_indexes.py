@@ -0,0 +1,19 @@
+# Generated by Django 5.1.3 on 2026-10-18 19:04
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('category', '0002_alter_category_type'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='category',
+            index=models.Index(condition=models.Q(('is_deleted', False)), fields=['user', '-created_at', '-id'], name='category_user_created_live_idx'),
+        ),
+    ]
@@ -16,5 +16,14 @@ class Category(BaseModel):
     type = models.CharField(max_length=10, choices=TransactionType.CHOICES)
     is_predefined = models.BooleanField(default=False)
 
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["user", "-created_at", "-id"],
+                name="category_user_created_live_idx",
+                condition=models.Q(is_deleted=False),
+            ),
+        ]
+
     def __str__(self):
         return str(self.name)
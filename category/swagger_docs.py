@@ -13,6 +13,18 @@ category_list_get_doc = swagger_auto_schema(
             description="Filter categories by type (debit or credit).",
             type=openapi.TYPE_STRING,
         ),
+        openapi.Parameter(
+            "cursor",
+            openapi.IN_QUERY,
+            description="Opaque cursor from a previous `next`/`previous` link",
+            type=openapi.TYPE_STRING,
+        ),
+        openapi.Parameter(
+            "pagination",
+            openapi.IN_QUERY,
+            description="Set to `offset` for page-number pagination with a total count",
+            type=openapi.TYPE_STRING,
+        ),
     ],
     responses={
         200: CategorySerializer(many=True),
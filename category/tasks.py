@@ -1 +1,25 @@
 from celery import shared_task
+from utils.cascade import CascadeStep, run_cascade
+from utils.logging import logger
+
+
+@shared_task(bind=True, max_retries=5, default_retry_delay=60)
+def delete_category_related(self, category_id):
+    """
+    Soft delete the budgets and recurring schedules of a deleted category.
+    """
+    from budget.models import Budget
+    from recurring_transaction.models import RecurringTransaction
+
+    steps = [
+        CascadeStep(
+            "recurring_transactions",
+            RecurringTransaction.objects.filter(category_id=category_id),
+        ),
+        CascadeStep("budgets", Budget.objects.filter(category_id=category_id)),
+    ]
+    try:
+        return run_cascade(f"category:{category_id}", steps)
+    except Exception as e:
+        logger.error(f"Error deleting related data of category {category_id}: {str(e)}", exc_info=True)
+        raise self.retry(exc=e)
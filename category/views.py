@@ -4,7 +4,7 @@ from rest_framework import status
 from rest_framework.permissions import IsAuthenticated
 from .models import Category
 from .serializers import CategorySerializer
-from utils.pagination import CustomPageNumberPagination
+from utils.pagination import CursorOrPageNumberPagination
 from utils.responses import (
     validation_error_response,
     success_response,
@@ -12,7 +12,7 @@ from utils.responses import (
     not_found_error_response,
     success_no_content_response,
 )
-from budget.models import Budget
+from .tasks import delete_category_related
 from .swagger_docs import (
     category_list_get_doc,
     category_create_doc,
@@ -22,11 +22,12 @@ from .swagger_docs import (
 )
 from django.shortcuts import get_object_or_404
 from utils.permissions import IsStaffOrOwner
+from utils.cache import invalidate_user_reports
 from django.db import transaction
 from transaction.models import Transaction
 
 
-class CategoryListView(APIView, CustomPageNumberPagination):
+class CategoryListView(APIView, CursorOrPageNumberPagination):
     """Handles listing all categories and creating a new category."""
 
     permission_classes = [IsAuthenticated]
@@ -37,7 +38,7 @@ class CategoryListView(APIView, CustomPageNumberPagination):
         category_type = request.query_params.get("type")
 
         if request.user.is_staff:
-            categories = Category.objects.all().order_by("-created_at")
+            categories = Category.objects.all_with_deleted().order_by("-created_at")
         else:
             categories = Category.objects.filter(
                 user=request.user,
@@ -52,14 +53,7 @@ class CategoryListView(APIView, CustomPageNumberPagination):
             categories = categories.filter(type=category_type)
         paginated_categories = self.paginate_queryset(categories, request)
         serializer = CategorySerializer(paginated_categories, many=True)
-        return success_response(
-            {
-                "count": categories.count(),
-                "next": self.get_next_link(),
-                "previous": self.get_previous_link(),
-                "results": serializer.data,
-            }
-        )
+        return success_response(self.get_paginated_payload(serializer.data))
 
     @category_create_doc
     def post(self, request):
@@ -80,18 +74,10 @@ class CategoryDetailView(APIView):
     def get_object(self, id, request):
         """Retrieve the category object and check permissions."""
 
-        category = get_object_or_404(Category, id=id)
+        category = get_object_or_404(Category.objects.visible_to(request.user), id=id)
         self.check_object_permissions(request, category)
         return category
 
-    def delete_associated_budgets(self, category):
-        """Soft delete all budgets associated with this category and user."""
-        # Get all budgets associated with this category
-        budgets = Budget.objects.filter(
-            category=category, user=category.user, is_deleted=False
-        )
-        budgets.update(is_deleted=True)
-
     @category_detail_get_doc
     def get(self, request, id):
         """Retrieve a specific category."""
@@ -117,6 +103,7 @@ class CategoryDetailView(APIView):
         )
         if serializer.is_valid():
             serializer.save()
+            invalidate_user_reports(category.user_id)
             return success_single_response(serializer.data)
         return validation_error_response(serializer.errors)
 
@@ -134,5 +121,6 @@ class CategoryDetailView(APIView):
                 )
         category.is_deleted = True
         category.save()
-        self.delete_associated_budgets(category)
+        delete_category_related.delay(category.id)
+        invalidate_user_reports(category.user_id)
         return success_no_content_response()
@@ -143,6 +143,9 @@ PASSWORD_RESET_TIMEOUT = 3600  # 1 hour (in seconds)
 
 STATIC_URL = "static/"
 
+# Uploaded bank statements are kept here until the import task has read them.
+MEDIA_ROOT = BASE_DIR / "media"
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.1/ref/settings/#default-auto-field
 
@@ -172,6 +175,64 @@ CELERY_BROKER_URL = os.getenv("CELERY_BROKER_URL")
 CELERY_RESULT_BACKEND = "django-db"
 CELERY_TIMEZONE = "UTC"
 
+# Shared cache; falls back to a per-process cache when no Redis is configured.
+if os.getenv("REDIS_CACHE_URL"):
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": os.getenv("REDIS_CACHE_URL"),
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        }
+    }
+
+# With TOKEN_CACHE_SHARED, validated access tokens are cached in the shared cache
+# until they expire and in-process for at most TOKEN_CACHE_LOCAL_TTL seconds.
+# Without it tokens are not cached, so a revoked token is refused at once.
+TOKEN_CACHE_LOCAL_MAX_SIZE = int(os.getenv("TOKEN_CACHE_LOCAL_MAX_SIZE", 10000))
+TOKEN_CACHE_LOCAL_TTL = int(os.getenv("TOKEN_CACHE_LOCAL_TTL", 30))
+TOKEN_CACHE_SHARED = bool(os.getenv("REDIS_CACHE_URL"))
+
+# Logging in beyond this many active sessions logs out the oldest ones (0 = no limit).
+MAX_ACTIVE_SESSIONS_PER_USER = int(os.getenv("MAX_ACTIVE_SESSIONS_PER_USER", 0))
+
+# Budget re-evaluations for the same (user, category, month) enqueued within
+# this window are collapsed into a single task. Coalescing needs a cache shared
+# by the web processes and the workers, so it is off without Redis.
+BUDGET_CHECK_COALESCE = bool(os.getenv("REDIS_CACHE_URL"))
+BUDGET_CHECK_COALESCE_SECONDS = int(os.getenv("BUDGET_CHECK_COALESCE_SECONDS", 30))
+
+# Emailed reports larger than this are not attached; the email links to the
+# streamed CSV download (delivery=download) instead.
+REPORT_EMAIL_ATTACHMENT_MAX_BYTES = int(
+    os.getenv("REPORT_EMAIL_ATTACHMENT_MAX_BYTES", 5 * 1024 * 1024)
+)
+REPORT_DOWNLOAD_BASE_URL = os.getenv("REPORT_DOWNLOAD_BASE_URL", "http://localhost:8000")
+
+# The nightly anomaly scan is split into this many user-id shards, one task each.
+ANOMALY_DETECTION_SHARDS = int(os.getenv("ANOMALY_DETECTION_SHARDS", 8))
+
+# Due recurring transactions are posted by parallel workers in batches of this size.
+RECURRING_BATCH_SIZE = int(os.getenv("RECURRING_BATCH_SIZE", 500))
+# Post every missed occurrence of a schedule in one run (e.g. after a beat
+# outage), capped per schedule; the rest is picked up by the next run.
+RECURRING_CATCH_UP = os.getenv("RECURRING_CATCH_UP", "true").lower() == "true"
+RECURRING_MAX_CATCH_UP = int(os.getenv("RECURRING_MAX_CATCH_UP", 366))
+
+# Due savings plan checks are split into this many user-id shards, one task each.
+SAVINGS_CHECK_SHARDS = int(os.getenv("SAVINGS_CHECK_SHARDS", 8))
+# Due plans are claimed in batches of this size; a claimed plan is not queued
+# again for this many seconds unless its check has rescheduled it.
+SAVINGS_CHECK_BATCH_SIZE = int(os.getenv("SAVINGS_CHECK_BATCH_SIZE", 500))
+SAVINGS_CHECK_LEASE_SECONDS = int(os.getenv("SAVINGS_CHECK_LEASE_SECONDS", 15 * 60))
+
+# Rows changed per transaction by the soft-delete cascades (utils.cascade).
+CASCADE_BATCH_SIZE = int(os.getenv("CASCADE_BATCH_SIZE", 1000))
+
 # settings.py
 APPEND_SLASH = False
 
@@ -188,6 +249,15 @@ CELERY_BEAT_SCHEDULE = {
         'task': 'saving_plan.tasks.schedule_savings_checks',
         'schedule': crontab( minute="*/1"),  
     },
+
+    "purge-expired-tokens": {
+        "task": "user.tasks.purge_expired_tokens",
+        "schedule": crontab(minute=15),
+    },
+    "detect-spending-anomalies": {
+        "task": "transaction_summary_report.tasks.detect_spending_anomalies",
+        "schedule": crontab(hour=2, minute=0),
+    },
 }
 
 
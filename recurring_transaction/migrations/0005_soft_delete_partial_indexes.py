@@ -0,0 +1,25 @@
+# Generated by Django 5.1.3 on 2026-10-18 19:04
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('category', '0003_soft_delete_partial_indexes'),
+        ('recurring_transaction', '0004_recurringtransaction_savings_plan_and_more'),
+        ('saving_plan', '0012_soft_delete_partial_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='recurringtransaction',
+            index=models.Index(condition=models.Q(('is_deleted', False)), fields=['user', '-created_at', '-id'], name='recurring_user_live_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='recurringtransaction',
+            index=models.Index(condition=models.Q(('is_deleted', False)), fields=['next_run'], name='recurring_next_run_live_idx'),
+        ),
+    ]
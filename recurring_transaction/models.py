@@ -78,5 +78,20 @@ class RecurringTransaction(BaseModel):
 
         return next_year
 
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["user", "-created_at", "-id"],
+                name="recurring_user_live_idx",
+                condition=models.Q(is_deleted=False),
+            ),
+            # process_recurring_transactions looks up due schedules.
+            models.Index(
+                fields=["next_run"],
+                name="recurring_next_run_live_idx",
+                condition=models.Q(is_deleted=False),
+            ),
+        ]
+
     def __str__(self):
         return f"{self.user} - {self.type} - {self.amount} - {self.frequency}"
@@ -5,6 +5,8 @@ from decimal import Decimal
 from datetime import datetime
 from utils.is_uuid import is_uuid
 from user.models import CustomUser
+from category.models import Category
+from saving_plan.models import SavingsPlan
 from .models import RecurringTransaction
 
 
@@ -25,6 +27,11 @@ class RecurringTransactionSerializer(serializers.ModelSerializer):
             "description",
         ]
         read_only_fields = ["id", "next_run"]
+        # Deleted rows are rejected by validate_category/validate_savings_plan.
+        extra_kwargs = {
+            "category": {"queryset": Category.objects.all_with_deleted()},
+            "savings_plan": {"queryset": SavingsPlan.objects.all_with_deleted()},
+        }
 
     def __init__(self, *args, **kwargs):
         """Ensure user field is ignored silently if present for normal users."""
@@ -92,6 +99,9 @@ class RecurringTransactionSerializer(serializers.ModelSerializer):
                 "Category does not belong to the provided user."
             )
 
+        if category.is_deleted:
+            raise serializers.ValidationError("Category not found.")
+
         if category.type != transaction_type:
             raise serializers.ValidationError(
                 "Category type must match the transaction type."
@@ -1,15 +1,20 @@
+from collections import defaultdict
+from datetime import datetime
+from functools import partial
 from celery import shared_task, Task
 from django.utils import timezone
 from django.db import transaction
 from django.conf import settings
 from decimal import Decimal
-from django.db.models import Sum
 from services.notification import send_mail
 from typing import  Dict, Any
 from utils.logging import logger
+from utils.cache import invalidate_user_reports
 from transaction.models import Transaction
 from .models import RecurringTransaction
-from transaction.tasks import track_and_notify_budget
+from transaction.tasks import enqueue_budget_checks
+from transaction.utils import apply_monthly_deltas, collect_monthly_deltas
+from saving_plan.utils import apply_savings_delta
 
 class TransactionNotificationTask(Task):
     max_retries = 3
@@ -63,59 +68,136 @@ class SavingsPlanManager:
             )
 
 @shared_task
-def process_recurring_transactions():
-    """Process daily recurring transactions - Runs once per day"""
+def process_recurring_transactions(batch_size=None, catch_up=None):
+    """
+    Fan the recurring transactions that are due out to worker tasks.
+
+    Due ids are read in primary-key order through a server-side cursor and
+    sent to `process_recurring_batch` in chunks of `batch_size`. The workers
+    claim their rows themselves, so overlapping runs of this dispatcher cannot
+    post the same occurrence twice.
+    """
+    batch_size = batch_size or settings.RECURRING_BATCH_SIZE
+    if catch_up is None:
+        catch_up = settings.RECURRING_CATCH_UP
+    now = timezone.now()
+    due_ids = (
+        RecurringTransaction.objects.filter(next_run__lte=now, is_deleted=False)
+        .order_by("id")
+        .values_list("id", flat=True)
+        .iterator(chunk_size=batch_size)
+    )
+
+    batches = 0
+    batch = []
+    for rec_id in due_ids:
+        batch.append(str(rec_id))
+        if len(batch) >= batch_size:
+            process_recurring_batch.delay(batch, now.isoformat(), catch_up)
+            batches += 1
+            batch = []
+    if batch:
+        process_recurring_batch.delay(batch, now.isoformat(), catch_up)
+        batches += 1
+
+    logger.info(f"Dispatched {batches} recurring transaction batches")
+    return batches
+
+
+@shared_task
+def process_recurring_batch(rec_ids, now, catch_up=False):
+    """
+    Post the due occurrences of each recurring transaction in `rec_ids`.
+
+    Rows are locked with `SELECT ... FOR UPDATE SKIP LOCKED` and re-checked
+    against `now`, so a row being handled by another worker is skipped and a
+    row whose `next_run` was already advanced is left alone. The transactions
+    of the batch are inserted with one bulk_create and the schedules advanced
+    with one bulk update, all in a single DB transaction.
+
+    Without `catch_up` one occurrence is posted per schedule. With it, every
+    occurrence missed up to `now` (and not after `end_date`) is posted, up to
+    RECURRING_MAX_CATCH_UP per schedule, and the user gets one summary email
+    per schedule.
+
+    A failure while posting does not sink the batch: the schedules are then
+    posted again one by one, each in its own savepoint, and a schedule that
+    still fails is logged and left due for the next run. Returns the number
+    of transactions created.
+    """
+    now = datetime.fromisoformat(now) if isinstance(now, str) else now
+    limit = settings.RECURRING_MAX_CATCH_UP if catch_up else 1
     try:
-        now = timezone.now()
-        
-        # Fetch transactions due today
-        recurring_transactions = (
-            RecurringTransaction.objects
-            .select_related('user', 'category', 'savings_plan')
-            .filter(next_run__lte=now, is_deleted=False)
-            .iterator()
-        )
+        with transaction.atomic():
+            due = list(
+                RecurringTransaction.objects.select_for_update(
+                    skip_locked=True, of=("self",)
+                )
+                .select_related("user", "category", "savings_plan")
+                .filter(id__in=rec_ids, next_run__lte=now, is_deleted=False)
+            )
+            if not due:
+                return 0
+
+            expired = {rec_txn.id for rec_txn in due if not _is_transaction_valid(rec_txn)}
+            if expired:
+                RecurringTransaction.objects.filter(id__in=expired).update(
+                    is_deleted=True
+                )
+
+            expanded = []
+            for rec_txn in due:
+                if rec_txn.id in expired:
+                    continue
+                try:
+                    rec_txn.run_dates, rec_txn.next_run = _expand_occurrences(
+                        rec_txn, now, limit
+                    )
+                except Exception as e:
+                    _log_failed_schedule(rec_txn, e)
+                    continue
+                expanded.append(rec_txn)
 
-        for rec_txn in recurring_transactions:
             try:
                 with transaction.atomic():
-                    if not _is_transaction_valid(rec_txn):
-                        rec_txn.is_deleted = True
-                        rec_txn.save(update_fields=["is_deleted"])
+                    new_transactions = _post_occurrences(expanded)
+                posted = expanded
+            except Exception as e:
+                logger.warning(
+                    f"Posting recurring batch failed ({e}); retrying schedules one by one"
+                )
+                new_transactions, posted = [], []
+                for rec_txn in expanded:
+                    try:
+                        with transaction.atomic():
+                            new_transactions += _post_occurrences([rec_txn])
+                    except Exception as e:
+                        _log_failed_schedule(rec_txn, e)
                         continue
+                    posted.append(rec_txn)
 
-                    # Create new transaction
-                    new_transaction = _create_transaction(rec_txn)
+            transaction.on_commit(lambda: _notify_posted(posted))
+    except Exception as e:
+        logger.error(f"Error processing recurring transaction batch: {str(e)}", exc_info=True)
+        raise
 
-                    # Handle category or savings plan
-                    if rec_txn.category:
-                        track_and_notify_budget.delay(new_transaction.id)
-                    elif rec_txn.savings_plan:
-                        _process_savings_plan(rec_txn, new_transaction)
+    enqueue_budget_checks([t for t in new_transactions if t.category_id])
+    return len(new_transactions)
 
-                    # Update next run date
-                    RecurringTransaction.objects.filter(id=rec_txn.id).update(
-                        next_run=rec_txn.get_next_run_date(rec_txn.next_run)
-                    )
 
-                    # Send notification
-                    send_transaction_notification.delay(
-                        rec_txn.user.email, 
-                        "",
-                        {
-                            "subject": "Recurring Transaction",
-                            "transaction_amount": f"{rec_txn.amount:.2f}",
-                            "transaction_date": rec_txn.next_run.strftime("%Y-%m-%d"),
-                            "description": rec_txn.description or "No description provided",
-                        }, 
-                        settings.SENDGRID_RECURRING_TRANSACTION_TEMPLATE_ID
-                    )
+def _post_occurrences(rec_txns):
+    """Create the expanded occurrences of `rec_txns` and advance their schedules"""
+    new_transactions = _create_transactions(rec_txns)
+    _process_savings_plans(new_transactions)
+    RecurringTransaction.objects.bulk_update(rec_txns, ["next_run"])
+    return new_transactions
 
-            except Exception as e:
-                logger.error(f"Error processing recurring transaction {rec_txn.id}: {str(e)}", exc_info=True)
 
-    except Exception as e:
-        logger.error(f"Error processing recurring transactions: {str(e)}", exc_info=True)
+def _log_failed_schedule(rec_txn, exc) -> None:
+    logger.error(
+        f"Error processing recurring transaction {rec_txn.id}: {str(exc)}", exc_info=True
+    )
+
 
 def _is_transaction_valid(rec_txn) -> bool:
     """Check if the recurring transaction is valid for processing"""
@@ -126,47 +208,104 @@ def _is_transaction_valid(rec_txn) -> bool:
         and not (rec_txn.end_date and rec_txn.end_date < rec_txn.next_run)
     )
 
-def _create_transaction(rec_txn) -> Transaction:
-    """Create a new transaction for the recurring transaction"""
-    return Transaction.objects.create(
-        user=rec_txn.user,
-        category=rec_txn.category,
-        savings_plan=rec_txn.savings_plan,
-        type=rec_txn.type,
-        amount=rec_txn.amount,
-        date=rec_txn.next_run,
-        description=rec_txn.description,
+
+def _expand_occurrences(rec_txn, now, limit):
+    """
+    Return the run dates due by `now`, at most `limit` of them, and the next run after them.
+
+    The first date is the schedule's current next_run, which the caller has
+    already checked against `now` and `end_date`.
+    """
+    run_dates = [rec_txn.next_run]
+    next_run = rec_txn.get_next_run_date(rec_txn.next_run)
+    while (
+        len(run_dates) < limit
+        and next_run <= now
+        and not (rec_txn.end_date and rec_txn.end_date < next_run)
+    ):
+        run_dates.append(next_run)
+        next_run = rec_txn.get_next_run_date(next_run)
+    return run_dates, next_run
+
+
+def _create_transactions(rec_txns):
+    """Insert one transaction per run date of each recurring transaction"""
+    new_transactions = Transaction.objects.bulk_create(
+        [
+            Transaction(
+                user=rec_txn.user,
+                category=rec_txn.category,
+                savings_plan=rec_txn.savings_plan,
+                type=rec_txn.type,
+                amount=rec_txn.amount,
+                date=run_date,
+                description=rec_txn.description,
+            )
+            for rec_txn in rec_txns
+            for run_date in rec_txn.run_dates
+        ]
     )
+    apply_monthly_deltas(collect_monthly_deltas(new_transactions))
+    invalidate_user_reports(*(t.user_id for t in new_transactions))
+    return new_transactions
 
 
-def _process_savings_plan(rec_txn, transaction) -> None:
-    """Process a savings plan transaction"""
-    savings_plan = rec_txn.savings_plan
-    total_saved = Transaction.objects.filter(
-        savings_plan=savings_plan,
-        is_deleted=False
-    ).aggregate(total=Sum('amount'))['total'] or Decimal("0")
+def _process_savings_plans(transactions) -> None:
+    """Add the batch's deposits to each savings plan once and notify completed plans"""
+    deltas = defaultdict(Decimal)
+    users = {}
+    for new_transaction in transactions:
+        if new_transaction.savings_plan_id:
+            deltas[new_transaction.savings_plan_id] += new_transaction.amount
+            users[new_transaction.savings_plan_id] = new_transaction.user
 
-    # Add new transaction amount to total saved
-    total_saved += transaction.amount
+    for plan_id in sorted(deltas, key=str):
+        savings_plan, completed = apply_savings_delta(
+            plan_id, deltas[plan_id], notify=False
+        )
+        if not completed:
+            continue
 
-    # Check if the total saved amount now meets or exceeds the target
-    if total_saved >= savings_plan.target_amount:
-        savings_plan.status = "COMPLETED"
-        savings_plan.save(update_fields=["status"])
-        
-        # Send completion notification
+        user = users[plan_id]
         notification_data = {
-            "user_name": savings_plan.user.name,
+            "user_name": user.name,
             "savings_plan_name": savings_plan.name,
-            "total_saved": f"{total_saved:,.2f}",
+            "total_saved": f"{savings_plan.total_saved:,.2f}",
             "target_amount": f"{savings_plan.target_amount:,.2f}",
             "message": f"Congratulations! Your savings plan '{savings_plan.name}' has been completed!"
         }
-        
+        transaction.on_commit(
+            partial(
+                send_transaction_notification.delay,
+                user.email,
+                "Savings PLan Completed",
+                notification_data,
+                settings.SENDGRID_GOAL_COMPLETED_TEMPLATE_ID,
+            )
+        )
+
+
+def _notify_posted(rec_txns) -> None:
+    """Queue one recurring transaction email per schedule, summarising caught-up runs"""
+    for rec_txn in rec_txns:
+        run_dates = rec_txn.run_dates
+        data = {
+            "subject": "Recurring Transaction",
+            "transaction_amount": f"{rec_txn.amount:.2f}",
+            "transaction_date": run_dates[0].strftime("%Y-%m-%d"),
+            "description": rec_txn.description or "No description provided",
+        }
+        if len(run_dates) > 1:
+            data.update(
+                {
+                    "occurrences": len(run_dates),
+                    "total_amount": f"{rec_txn.amount * len(run_dates):.2f}",
+                    "last_transaction_date": run_dates[-1].strftime("%Y-%m-%d"),
+                }
+            )
         send_transaction_notification.delay(
-            savings_plan.user.email,
-            "Savings PLan Completed",
-            notification_data,
-            settings.SENDGRID_GOAL_COMPLETED_TEMPLATE_ID
+            rec_txn.user.email,
+            "",
+            data,
+            settings.SENDGRID_RECURRING_TRANSACTION_TEMPLATE_ID
         )
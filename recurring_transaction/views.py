@@ -12,12 +12,12 @@ from utils.responses import (
 )
 from .models import RecurringTransaction
 from .serializers import RecurringTransactionSerializer
-from utils.pagination import CustomPageNumberPagination
+from utils.pagination import CursorOrPageNumberPagination
 from utils.permissions import IsStaffOrOwner
 from rest_framework.permissions import IsAuthenticated
 
 
-class RecurringTransactionListCreateView(APIView, CustomPageNumberPagination):
+class RecurringTransactionListCreateView(APIView, CursorOrPageNumberPagination):
     """Comprehensive list and create view for recurring transactions"""
 
     permission_classes = [IsAuthenticated]
@@ -26,7 +26,9 @@ class RecurringTransactionListCreateView(APIView, CustomPageNumberPagination):
         """List recurring transactions with comprehensive filtering"""
 
         if request.user.is_staff:
-            queryset = RecurringTransaction.objects.all().order_by("-created_at")
+            queryset = RecurringTransaction.objects.all_with_deleted().order_by(
+                "-created_at"
+            )
         else:
             queryset = RecurringTransaction.objects.filter(
                 user=request.user, is_deleted=False
@@ -35,14 +37,7 @@ class RecurringTransactionListCreateView(APIView, CustomPageNumberPagination):
         paginated_data = self.paginate_queryset(queryset, request)
         serializer = RecurringTransactionSerializer(paginated_data, many=True)
         logger.info(f"User {request.user.id} retrieved recurring transactions.")
-        return success_response(
-            {
-                "count": queryset.count(),
-                "next": self.get_next_link(),
-                "previous": self.get_previous_link(),
-                "results": serializer.data,
-            }
-        )
+        return success_response(self.get_paginated_payload(serializer.data))
 
     def post(self, request):
         """Create a new recurring transaction"""
@@ -68,7 +63,9 @@ class RecurringTransactionDetailView(APIView):
 
     def get_object(self, id, request):
         """Retrieve recurring transaction with comprehensive permissions"""
-        recurring_transaction = get_object_or_404(RecurringTransaction, id=id)
+        recurring_transaction = get_object_or_404(
+            RecurringTransaction.objects.visible_to(request.user), id=id
+        )
         self.check_object_permissions(request, recurring_transaction)
         return recurring_transaction
 
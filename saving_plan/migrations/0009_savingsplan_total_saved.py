@@ -0,0 +1,38 @@
+# Generated by Django 5.1.3 on 2026-10-18 18:13
+
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+
+def populate_total_saved(apps, schema_editor):
+    SavingsPlan = apps.get_model("saving_plan", "SavingsPlan")
+    Transaction = apps.get_model("transaction", "Transaction")
+    totals = (
+        Transaction.objects.filter(savings_plan=OuterRef("pk"), is_deleted=False)
+        .values("savings_plan")
+        .annotate(total=Sum("amount"))
+        .values("total")
+    )
+    SavingsPlan.objects.update(
+        total_saved=Coalesce(
+            Subquery(totals), Value(0), output_field=models.DecimalField()
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('saving_plan', '0008_delete_deadlineextension'),
+        ('transaction', '0006_monthlycategorytotal'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='savingsplan',
+            name='total_saved',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=12),
+        ),
+        migrations.RunPython(populate_total_saved, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.3 on 2026-10-18 18:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('saving_plan', '0009_savingsplan_total_saved'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='savingsplan',
+            name='last_reminded_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.1.3 on 2026-10-18 18:51
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('saving_plan', '0010_savingsplan_last_reminded_at'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='savingsplan',
+            name='next_check_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='savingsplan',
+            index=models.Index(condition=models.Q(('is_deleted', False), ('status', 'ACTIVE')), fields=['next_check_at'], name='savingsplan_next_check_idx'),
+        ),
+    ]
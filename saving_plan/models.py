@@ -19,14 +19,16 @@ class SavingsPlan(BaseModel):
     current_deadline = models.DateField()
     status = models.CharField(max_length=10, choices=SavingsPlanStatus.CHOICES, default=SavingsPlanStatus.ACTIVE)
     frequency = models.CharField(max_length=10, choices=Frequency.CHOICES)
+    # Sum of the plan's non-deleted transactions, maintained by
+    # saving_plan.utils.apply_savings_delta.
+    total_saved = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    # When check_savings_progress last sent a behind-schedule reminder.
+    last_reminded_at = models.DateTimeField(null=True, blank=True)
+    # When schedule_savings_checks next has to evaluate the plan; NULL means now.
+    next_check_at = models.DateTimeField(null=True, blank=True)
 
     def get_total_saved(self):
-        return (
-            self.transactions.filter(is_deleted=False).aggregate(
-                total=models.Sum("amount")
-            )["total"]
-            or 0
-        )
+        return self.total_saved
 
     def get_remaining_amount(self):
         return self.target_amount - self.get_total_saved()
@@ -41,6 +43,18 @@ class SavingsPlan(BaseModel):
                 check=models.Q(target_amount__gt=0), name="positive_target_amount"
             )
         ]
+        indexes = [
+            models.Index(
+                fields=["user", "-created_at", "-id"],
+                name="savingsplan_user_live_idx",
+                condition=models.Q(is_deleted=False),
+            ),
+            models.Index(
+                fields=["next_check_at"],
+                name="savingsplan_next_check_idx",
+                condition=models.Q(status=SavingsPlanStatus.ACTIVE, is_deleted=False),
+            )
+        ]
 
 
 
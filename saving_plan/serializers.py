@@ -7,6 +7,7 @@ import re
 
 from saving_plan.tasks import send_savings_plan_completion_notification
 class SavingsPlanSerializer(serializers.ModelSerializer):
+    # A method field keeps total_saved a JSON number, not a decimal string.
     total_saved = serializers.SerializerMethodField()
     progress = serializers.SerializerMethodField()
     time_remaining = serializers.SerializerMethodField()
@@ -164,6 +165,8 @@ class SavingsPlanSerializer(serializers.ModelSerializer):
             if "current_deadline" in data:
                 data["original_deadline"] = data["current_deadline"]
         if self.instance:
+            # Any edit can change the plan's schedule; evaluate it on the next beat.
+            data["next_check_at"] = None
             current_saved = self.instance.get_total_saved()
             target_amount = data.get("target_amount", self.instance.target_amount)
             percentage = (current_saved / target_amount * 100) if target_amount > 0 else 0
@@ -178,11 +181,15 @@ class SavingsPlanSerializer(serializers.ModelSerializer):
         return data
 
     def get_total_saved(self, obj):
-        return obj.get_total_saved()
+        return obj.total_saved
 
     def get_progress(self, obj):
         """Calculate progress percentage and remaining amount."""
-        total_saved = obj.get_total_saved()
+        total_saved = obj.total_saved
+        # List views annotate remaining_amount in SQL.
+        remaining_amount = getattr(obj, "remaining_amount", None)
+        if remaining_amount is None:
+            remaining_amount = obj.get_remaining_amount()
         try:
             percentage = round((total_saved / obj.target_amount) * 100, 2) if obj.target_amount > 0 else 0
         except (TypeError, ValueError):
@@ -190,7 +197,7 @@ class SavingsPlanSerializer(serializers.ModelSerializer):
 
         return {
 
-            "remaining_amount": obj.get_remaining_amount(),
+            "remaining_amount": remaining_amount,
             "saved_amount_percentage": percentage,
         }
     
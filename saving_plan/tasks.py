@@ -2,17 +2,22 @@ from celery import shared_task
 from django.db import transaction
 from django.utils import timezone
 from django.conf import settings
-from datetime import timedelta
+from datetime import datetime, time, timedelta
+from dateutil.relativedelta import relativedelta
 from django.db import models
 from decimal import Decimal
 from sendgrid import SendGridAPIClient
 from sendgrid.helpers.mail import Mail
 from utils.logging import logger
+from utils.cache import invalidate_user_reports
+from utils.cascade import CascadeStep, run_cascade
 from calendar import monthrange
 from saving_plan.models import  SavingsPlan
 from transaction.models import Transaction
 from services.notification import send_mail
 from django.db.models import Sum
+from django.db.models.functions import Coalesce
+from utils.constants import Frequency, SavingsPlanStatus
 
 # SendGrid template configurations
 SENDGRID_TEMPLATES = {
@@ -22,121 +27,205 @@ SENDGRID_TEMPLATES = {
     'OVERDUE':settings.SENDGRID_OVERDUE_TEMPLATE_ID
 }
 
+AUTO_EXTEND_DAYS = {
+    Frequency.MONTHLY: 30,
+    Frequency.WEEKLY: 7,
+    Frequency.DAILY: 1,
+}
+
+
 @shared_task
-def check_overdue_savings_plans():
+def check_overdue_savings_plans(plan_ids=None):
     """
     Check for overdue savings plans and apply the hybrid auto-extension approach.
+
+    Runs in a fixed number of queries: one read of the candidate plans (their
+    maintained `total_saved`), one UPDATE for the plans that reached their
+    target and one CASE-based UPDATE moving the other plans' deadlines. The
+    emails are queued once the updates commit. Only the plans in `plan_ids`
+    are considered when it is given.
     """
     today = timezone.now().date()
 
     overdue_plans = SavingsPlan.objects.filter(
         current_deadline__lt=today,
         is_deleted=False,
-        status="ACTIVE"
-    )
+        status=SavingsPlanStatus.ACTIVE,
+    ).select_related("user")
+    if plan_ids is not None:
+        overdue_plans = overdue_plans.filter(id__in=plan_ids)
 
+    completed, extended = [], []
     for plan in overdue_plans:
-        total_saved = Transaction.objects.filter(savings_plan=plan).aggregate(total=Sum("amount"))["total"] or Decimal("0")
+        if plan.total_saved >= plan.target_amount:
+            completed.append(plan)
+        else:
+            extended.append(plan)
 
-        # If the user has reached the target amount, mark as completed
-        if total_saved >= plan.target_amount:
-            plan.status = "COMPLETED"
-            plan.save()
-            send_savings_plan_completion_notification.delay(plan.id)
-            continue
-        auto_extend_days = 30 if plan.frequency == "MONTHLY" else 7 if plan.frequency == "WEEKLY" else 1
-        new_deadline = plan.current_deadline + timedelta(days=auto_extend_days)
+    notifications = []
+    for plan in extended:
+        new_deadline = plan.current_deadline + timedelta(
+            days=AUTO_EXTEND_DAYS.get(plan.frequency, 1)
+        )
+        notifications.append(
+            (
+                plan.user.email,
+                f"Your Savings Plan {plan.name} Deadline Passed - Auto-Extension in Progress",
+                {
+                    "user_name": plan.user.name,
+                    "plan_name": plan.name,
+                    "deadline": plan.current_deadline.strftime("%Y-%m-%d"),
+                    "new_deadline": new_deadline.strftime("%Y-%m-%d"),
+                    "target_amount": f"{plan.target_amount:,.2f}",
+                    "total_saved": f"{plan.total_saved:,.2f}",
+                    "remaining_amount": f"{plan.target_amount - plan.total_saved:,.2f}",
+                    "message": (
+                        f"Your savings plan deadline has passed, and we are extending it automatically to {new_deadline.strftime('%Y-%m-%d')}."
+                    ),
+                },
+                SENDGRID_TEMPLATES["OVERDUE"],
+            )
+        )
+        # Automatically extend deadline unless the user opts out
+        plan.current_deadline = new_deadline
+
+    with transaction.atomic():
+        if completed:
+            SavingsPlan.objects.filter(id__in=[plan.id for plan in completed]).update(
+                status=SavingsPlanStatus.COMPLETED
+            )
+        if extended:
+            SavingsPlan.objects.bulk_update(extended, ["current_deadline"])
+
+        def queue_notifications():
+            for plan in completed:
+                send_savings_plan_completion_notification.delay(plan.id)
+            for args in notifications:
+                send_savings_plan_notification.delay(*args)
+
+        transaction.on_commit(queue_notifications)
+
+    return len(completed), len(extended)
+
+
+def get_period_starts(now):
+    """Start of the current day, week (Monday) and month in the local time zone."""
+    day_start = timezone.localtime(now).replace(hour=0, minute=0, second=0, microsecond=0)
+    return {
+        Frequency.DAILY: day_start,
+        Frequency.WEEKLY: day_start - timedelta(days=day_start.weekday()),
+        Frequency.MONTHLY: day_start.replace(day=1),
+    }
+
+
+@shared_task
+def check_savings_progress(plan_ids=None):
+    """
+    Ensure users are meeting their periodic savings targets based on remaining time.
+
+    The current day, week and month savings of every plan are read in one
+    grouped query, as one conditional sum per window. A plan that is behind
+    is reminded at most once per period of its frequency, tracked in
+    `last_reminded_at`, and the emails are queued instead of sent inline.
+    Only the plans in `plan_ids` are considered when it is given.
+    """
+    now = timezone.now()
+    today = timezone.localdate(now)
+    period_starts = get_period_starts(now)
+
+    not_reminded = models.Q(last_reminded_at__isnull=True)
+    for frequency, period_start in period_starts.items():
+        not_reminded |= models.Q(frequency=frequency, last_reminded_at__lt=period_start)
+
+    def period_sum(period_start):
+        return Coalesce(
+            Sum(
+                "transactions__amount",
+                filter=models.Q(
+                    transactions__is_deleted=False,
+                    transactions__date__gte=period_start,
+                    transactions__date__lte=now,
+                ),
+            ),
+            Decimal("0"),
+        )
 
-        subject = f"Your Savings Plan {plan.name} Deadline Passed - Auto-Extension in Progress"
+    plans = (
+        SavingsPlan.objects.filter(
+            not_reminded,
+            is_deleted=False,
+            status=SavingsPlanStatus.ACTIVE,
+            current_deadline__gt=today,
+            total_saved__lt=models.F("target_amount"),
+        )
+        .select_related("user")
+    )
+    if plan_ids is not None:
+        plans = plans.filter(id__in=plan_ids)
+    plans = plans.annotate(
+        **{
+            f"saved_{frequency.lower()}": period_sum(period_start)
+            for frequency, period_start in period_starts.items()
+        }
+    )
+
+    reminded = []
+    for plan in plans:
+        remaining_amount = plan.target_amount - plan.total_saved
+        days_remaining = (plan.current_deadline - today).days
+
+        if plan.frequency == Frequency.MONTHLY:
+            remaining_periods = max((days_remaining + 29) // 30, 1)
+        elif plan.frequency == Frequency.WEEKLY:
+            remaining_periods = max((days_remaining + 6) // 7, 1)
+        else:
+            remaining_periods = max(days_remaining, 1)
+        required_per_period = remaining_amount / remaining_periods
+        period_savings = getattr(plan, f"saved_{plan.frequency.lower()}")
+
+        if period_savings >= required_per_period:
+            continue
 
         dynamic_template_data = {
             "user_name": plan.user.name,
             "plan_name": plan.name,
-            "deadline": plan.current_deadline.strftime("%Y-%m-%d"),
-            "new_deadline": new_deadline.strftime("%Y-%m-%d"),
             "target_amount": f"{plan.target_amount:,.2f}",
-            "total_saved": f"{total_saved:,.2f}",
-            "remaining_amount": f"{plan.target_amount - total_saved:,.2f}",
+            "total_saved": f"{plan.total_saved:,.2f}",
+            "remaining_amount": f"{remaining_amount:,.2f}",
+            "required_per_period": f"{required_per_period:,.2f}",
+            "saved_this_period": f"{period_savings:,.2f}",
+            "shortfall": f"{max(required_per_period - period_savings, 0):,.2f}",
+            "frequency": plan.frequency.lower(),
+            "days_remaining": days_remaining,
             "message": (
-                f"Your savings plan deadline has passed, and we are extending it automatically to {new_deadline.strftime('%Y-%m-%d')}."
-            ),
+                f"You need to save {required_per_period:.2f} per {plan.frequency.lower()} "
+                f"to meet your goal by {plan.current_deadline}."
+            )
         }
-        
-        send_mail(
-            [plan.user.email],
-            subject,
-            dynamic_template_data=dynamic_template_data,
-            dynamic_template_id=SENDGRID_TEMPLATES["OVERDUE"],
+        send_savings_plan_notification.delay(
+            plan.user.email,
+            f"Reminder: You need to save {required_per_period:.2f} for {plan.name}",
+            dynamic_template_data,
+            SENDGRID_TEMPLATES["BEHIND_SCHEDULE"],
         )
+        reminded.append(plan.id)
 
-        # Automatically extend deadline unless the user opts out
-        plan.current_deadline = new_deadline
-        plan.save()
+    if reminded:
+        SavingsPlan.objects.filter(id__in=reminded).update(last_reminded_at=now)
+    return len(reminded)
 
-@shared_task
-def check_savings_progress():
-    """Ensure users are meeting their periodic savings targets based on remaining time."""
-    today = timezone.now().date()
 
-    plans = SavingsPlan.objects.filter(
-        is_deleted=False,
-        status="ACTIVE",
-        current_deadline__gte=today
-    ).annotate(
-        total_saved=Sum("transactions__amount")
-    ).filter(
-        total_saved__lt=models.F("target_amount")
+@shared_task
+def send_savings_plan_notification(user_email, subject, dynamic_template_data, dynamic_template_id):
+    """Send one savings plan email."""
+    send_mail(
+        [user_email],
+        subject,
+        dynamic_template_data=dynamic_template_data,
+        dynamic_template_id=dynamic_template_id,
     )
 
-    for plan in plans:
-        total_saved = plan.total_saved or Decimal("0")
-        remaining_amount = plan.target_amount - total_saved
-
-        days_remaining = (plan.current_deadline - today).days
-        if days_remaining <= 0 or remaining_amount <= 0:
-            continue
 
-        if plan.frequency == "MONTHLY":
-            remaining_periods = max((days_remaining + 29) // 30, 1)
-            required_per_period = remaining_amount / remaining_periods
-            period_start = today.replace(day=1)
-        elif plan.frequency == "WEEKLY":
-            remaining_periods = max((days_remaining + 6) // 7, 1)
-            required_per_period = remaining_amount / remaining_periods
-            period_start = today - timedelta(days=today.weekday())
-        elif plan.frequency == "DAILY":
-            required_per_period = remaining_amount / max(days_remaining, 1)
-            period_start = today
-
-        period_savings = Transaction.objects.filter(
-            savings_plan=plan,
-            date__gte=period_start,
-            date__lte=today
-        ).aggregate(total=Sum("amount"))["total"] or Decimal("0")
-
-        if period_savings < required_per_period:
-            dynamic_template_data = {
-                "user_name": plan.user.name,
-                "plan_name": plan.name,
-                "target_amount": f"{plan.target_amount:,.2f}",
-                "total_saved": f"{total_saved:,.2f}",
-                "remaining_amount": f"{remaining_amount:,.2f}",
-                "required_per_period": f"{required_per_period:,.2f}",
-                "saved_this_period": f"{period_savings:,.2f}",
-                "shortfall": f"{max(required_per_period - period_savings, 0):,.2f}",
-                "frequency": plan.frequency.lower(),
-                "days_remaining": days_remaining,
-                "message": (
-                    f"You need to save {required_per_period:.2f} per {plan.frequency.lower()} "
-                    f"to meet your goal by {plan.current_deadline}."
-                )
-            }
-            send_mail(
-                [plan.user.email],
-                f"Reminder: You need to save {required_per_period:.2f} for {plan.name}",
-                dynamic_template_data=dynamic_template_data,
-                dynamic_template_id=SENDGRID_TEMPLATES["BEHIND_SCHEDULE"]
-            )
 @shared_task
 def send_savings_plan_creation_notification(plan_id):
     """Send notification when a new savings plan is created."""
@@ -163,20 +252,36 @@ def send_savings_plan_creation_notification(plan_id):
 
 
 
-@shared_task
-def delete_related(savings_plan_id):
+@shared_task(bind=True, max_retries=5, default_retry_delay=60)
+def delete_related(self, savings_plan_id):
     """
-    Celery task to handle soft deletion of extension models.
+    Soft delete the recurring schedules and transactions of a deleted savings plan.
     """
-    saving_plan = SavingsPlan.objects.filter(
-        savings_plan_id=savings_plan_id
-    ).first()
-    
-    with transaction.atomic():
-        Transaction.objects.filter(saving_plan=saving_plan).update(
-            is_deleted=True
-        )
-    return f"Successfully processed extensions for soft deletion"
+    from recurring_transaction.models import RecurringTransaction
+
+    steps = [
+        CascadeStep(
+            "recurring_transactions",
+            RecurringTransaction.objects.filter(savings_plan_id=savings_plan_id),
+        ),
+        CascadeStep(
+            "transactions", Transaction.objects.filter(savings_plan_id=savings_plan_id)
+        ),
+    ]
+    try:
+        changed = run_cascade(f"savings-plan:{savings_plan_id}", steps)
+    except Exception as e:
+        logger.error(f"Error deleting related data of savings plan {savings_plan_id}: {str(e)}", exc_info=True)
+        raise self.retry(exc=e)
+
+    user_id = (
+        SavingsPlan.objects.filter(id=savings_plan_id)
+        .values_list("user_id", flat=True)
+        .first()
+    )
+    if user_id:
+        invalidate_user_reports(user_id)
+    return changed
 
 
 @shared_task
@@ -199,7 +304,85 @@ def send_savings_plan_completion_notification(plan_id):
         dynamic_template_id=SENDGRID_TEMPLATES['GOAL_COMPLETED']
     )
 @shared_task
-def schedule_savings_checks():
-    """Main task to be scheduled that coordinates all notifications."""
-    check_savings_progress.delay()
-    check_overdue_savings_plans.delay()
+def schedule_savings_checks(batch_size=None):
+    """
+    Main task to be scheduled that coordinates all notifications.
+
+    Only ACTIVE plans whose `next_check_at` has passed (or was never set) are
+    read, through the partial index on that column. Due rows are claimed in
+    batches of `batch_size`: they are locked with SKIP LOCKED and their
+    `next_check_at` is pushed SAVINGS_CHECK_LEASE_SECONDS ahead in the same
+    DB transaction, so an overlapping run does not queue them again. Each
+    batch is split into SAVINGS_CHECK_SHARDS user-id shards, one task each;
+    `evaluate_savings_plans` then sets the real next check. Rows of a task
+    that dies become due again when the lease runs out.
+    """
+    batch_size = batch_size or settings.SAVINGS_CHECK_BATCH_SIZE
+    shards = settings.SAVINGS_CHECK_SHARDS
+    now = timezone.now()
+    lease_until = now + timedelta(seconds=settings.SAVINGS_CHECK_LEASE_SECONDS)
+    due = SavingsPlan.objects.filter(
+        models.Q(next_check_at__isnull=True) | models.Q(next_check_at__lte=now),
+        is_deleted=False,
+        status=SavingsPlanStatus.ACTIVE,
+    )
+
+    queued = 0
+    while True:
+        with transaction.atomic():
+            claimed = list(
+                due.select_for_update(skip_locked=True)
+                .order_by()
+                .values_list("id", "user_id")[:batch_size]
+            )
+            SavingsPlan.objects.filter(id__in=[plan_id for plan_id, _ in claimed]).update(
+                next_check_at=lease_until
+            )
+
+        plan_ids = [[] for _ in range(shards)]
+        for plan_id, user_id in claimed:
+            plan_ids[user_id.int % shards].append(str(plan_id))
+        for shard_plan_ids in plan_ids:
+            if shard_plan_ids:
+                evaluate_savings_plans.delay(shard_plan_ids)
+                queued += 1
+
+        if len(claimed) < batch_size:
+            return queued
+
+
+@shared_task
+def evaluate_savings_plans(plan_ids):
+    """Run the overdue and progress checks for `plan_ids` and schedule their next check."""
+    check_overdue_savings_plans(plan_ids)
+    check_savings_progress(plan_ids)
+
+    now = timezone.now()
+    plans = list(
+        SavingsPlan.objects.filter(id__in=plan_ids).only(
+            "id", "frequency", "current_deadline"
+        )
+    )
+    for plan in plans:
+        plan.next_check_at = get_next_check_at(plan, now)
+    SavingsPlan.objects.bulk_update(plans, ["next_check_at"], batch_size=500)
+    return len(plans)
+
+
+def get_next_check_at(plan, now):
+    """
+    When a plan's evaluation can next change: the start of its next period, or
+    the day after its deadline when that comes first.
+    """
+    period_start = get_period_starts(now)[plan.frequency]
+    if plan.frequency == Frequency.MONTHLY:
+        next_period = period_start + relativedelta(months=1)
+    elif plan.frequency == Frequency.WEEKLY:
+        next_period = period_start + timedelta(weeks=1)
+    else:
+        next_period = period_start + timedelta(days=1)
+
+    overdue_at = timezone.make_aware(
+        datetime.combine(plan.current_deadline + timedelta(days=1), time.min)
+    )
+    return min(next_period, overdue_at)
@@ -0,0 +1,45 @@
+from django.db import transaction as db_transaction
+from django.db.models import F
+from saving_plan.models import SavingsPlan
+from saving_plan.tasks import send_savings_plan_completion_notification
+from utils.constants import SavingsPlanStatus
+
+
+def apply_savings_delta(plan_id, delta, notify=True):
+    """
+    Add `delta` to a plan's total_saved and flip its status if needed.
+
+    The plan row is locked for the rest of the surrounding DB transaction, so
+    concurrent deposits are serialised and the COMPLETED/ACTIVE decision is
+    made on the up-to-date total. Returns the plan and whether it was just
+    completed.
+    """
+    with db_transaction.atomic():
+        # Deleted plans still get their total adjusted when their
+        # transactions change.
+        plans = SavingsPlan.objects.all_with_deleted()
+        plan = plans.select_for_update().get(id=plan_id)
+        if delta:
+            plans.filter(id=plan_id).update(total_saved=F("total_saved") + delta)
+            plan.refresh_from_db(fields=["total_saved"])
+
+        completed = False
+        if (
+            plan.total_saved >= plan.target_amount
+            and plan.status != SavingsPlanStatus.COMPLETED
+        ):
+            plan.status = SavingsPlanStatus.COMPLETED
+            plan.save(update_fields=["status"])
+            completed = True
+            if notify:
+                db_transaction.on_commit(
+                    lambda: send_savings_plan_completion_notification.delay(plan.id)
+                )
+        elif (
+            plan.total_saved < plan.target_amount
+            and plan.status == SavingsPlanStatus.COMPLETED
+        ):
+            plan.status = SavingsPlanStatus.ACTIVE
+            plan.save(update_fields=["status"])
+
+    return plan, completed
@@ -1,3 +1,5 @@
+from datetime import datetime
+from django.db.models import F
 from rest_framework import status
 from rest_framework.views import APIView
 from saving_plan.models import SavingsPlan
@@ -13,32 +15,64 @@ from utils.responses import (
 from django.shortcuts import get_object_or_404
 from saving_plan.tasks import delete_related
 from utils.logging import logger
-from utils.pagination import CustomPageNumberPagination
+from utils.constants import SavingsPlanStatus
+from utils.pagination import CursorOrPageNumberPagination
+from utils.cache import invalidate_user_reports
 from rest_framework.permissions import IsAuthenticated
 from .tasks import send_savings_plan_creation_notification
 
-class SavingsPlanListCreateAPIView(APIView, CustomPageNumberPagination):
+class SavingsPlanListCreateAPIView(APIView, CursorOrPageNumberPagination):
     permission_classes = [IsStaffOrOwner, IsAuthenticated]
 
     def get(self, request):
+        """
+        List savings plans, optionally filtered by `status` (comma separated)
+        and a `deadline_from`/`deadline_to` range on the current deadline.
+        """
         logger.info("Fetching savings plans for user: %s", request.user)
-        queryset = SavingsPlan.objects.filter()
+        queryset = SavingsPlan.objects.all_with_deleted()
         if not request.user.is_staff:
             queryset = queryset.filter(user=request.user, is_deleted=False)
 
+        try:
+            queryset = self.filter_queryset(queryset, request)
+        except ValueError as e:
+            return validation_error_response({"detail": str(e)})
+
+        # Progress is derived from the maintained total_saved column in SQL,
+        # so serializing a page issues no per-plan queries.
+        queryset = queryset.annotate(
+            remaining_amount=F("target_amount") - F("total_saved")
+        )
         paginated_queryset = self.paginate_queryset(queryset, request)
         serializer = SavingsPlanSerializer(
-            queryset, many=True, context={"request": request}
+            paginated_queryset, many=True, context={"request": request}
         )
 
-        return success_response(
-            {
-                "count": queryset.count(),
-                "next": self.get_next_link(),
-                "previous": self.get_previous_link(),
-                "results": serializer.data,
-            }
-        )
+        return success_response(self.get_paginated_payload(serializer.data))
+
+    def filter_queryset(self, queryset, request):
+        statuses = request.query_params.get("status")
+        if statuses:
+            statuses = [value.strip().upper() for value in statuses.split(",")]
+            valid = {choice for choice, _ in SavingsPlanStatus.CHOICES}
+            invalid = [value for value in statuses if value not in valid]
+            if invalid:
+                raise ValueError(f"Invalid status: {', '.join(invalid)}")
+            queryset = queryset.filter(status__in=statuses)
+
+        for param, lookup in (
+            ("deadline_from", "current_deadline__gte"),
+            ("deadline_to", "current_deadline__lte"),
+        ):
+            value = request.query_params.get(param)
+            if value:
+                try:
+                    day = datetime.strptime(value, "%Y-%m-%d").date()
+                except ValueError:
+                    raise ValueError(f"{param} must be a date in YYYY-MM-DD format")
+                queryset = queryset.filter(**{lookup: day})
+        return queryset
 
     def post(self, request):
         logger.info("Creating a new savings plan for user: %s", request.user)
@@ -63,7 +97,9 @@ class SavingsPlanDetailAPIView(APIView):
 
     def get_object(self, id):
         logger.info("Fetching savings plan with ID: %s", id)
-        obj = get_object_or_404(SavingsPlan, id=id)
+        obj = get_object_or_404(
+            SavingsPlan.objects.visible_to(self.request.user), id=id
+        )
         self.check_object_permissions(self.request, obj)
         return obj
 
@@ -89,6 +125,7 @@ class SavingsPlanDetailAPIView(APIView):
         )
         if serializer.is_valid():
             updated_plan = serializer.save()
+            invalidate_user_reports(updated_plan.user_id)
             return success_single_response(serializer.data)
         logger.warning(
             "Validation error while updating savings plan: %s, Errors: %s",
@@ -110,5 +147,6 @@ class SavingsPlanDetailAPIView(APIView):
         plan.is_deleted = True
         plan.save()
         delete_related.delay(plan.id)
+        invalidate_user_reports(plan.user_id)
         logger.info("Savings plan soft deleted successfully: %s", id)
         return success_no_content_response()
@@ -1,3 +1,4 @@
+import io
 import os
 import base64
 from sendgrid import SendGridAPIClient
@@ -11,6 +12,29 @@ from sendgrid.helpers.mail import (
 )
 from django.conf import settings
 
+ENCODE_CHUNK_SIZE = 3 * 64 * 1024
+
+
+def b64encode_file(file):
+    """
+    Base64-encode an open (text or binary) file chunk by chunk.
+
+    Only the encoded text is built up, so the raw file content is never held
+    in memory as a whole next to it.
+    """
+    encoded = io.StringIO()
+    pending = b""
+    while chunk := file.read(ENCODE_CHUNK_SIZE):
+        if isinstance(chunk, str):
+            chunk = chunk.encode()
+        pending += chunk
+        # Encode whole 3-byte groups only, so no padding lands mid-stream.
+        cut = len(pending) - len(pending) % 3
+        encoded.write(base64.b64encode(pending[:cut]).decode())
+        pending = pending[cut:]
+    encoded.write(base64.b64encode(pending).decode())
+    return encoded.getvalue()
+
 
 def send_mail(
     user_email, subject, dynamic_template_data, dynamic_template_id, attachment=None
@@ -27,7 +51,7 @@ def send_mail(
             Expected format:
             {
                 "file_name": "example.pdf",
-                "file_data": <binary file data>,
+                "file_data": <binary file data, or an open file>,
                 "file_type": "application/pdf"
             }
     """
@@ -58,7 +82,10 @@ def send_mail(
                 file_data = file_data.encode()  # Convert string to bytes
 
             # Encode file data to base64
-            encoded_file = base64.b64encode(file_data).decode()
+            if isinstance(file_data, bytes):
+                encoded_file = base64.b64encode(file_data).decode()
+            else:
+                encoded_file = b64encode_file(file_data)
             attached_file = Attachment(
                 FileContent(encoded_file),
                 FileName(file_name),
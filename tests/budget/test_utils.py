@@ -0,0 +1,28 @@
+import pytest
+from decimal import Decimal
+from budget.models import Budget
+from budget.utils import evaluate_budget_alert
+from category.models import Category
+from utils.constants import BudgetAlertLevel
+
+
+@pytest.mark.django_db
+def test_budget_alert_sent_only_on_upward_crossing(create_user, mocker):
+    send_alert = mocker.patch("budget.utils.send_budget_alert")
+    user = create_user(email="b@example.com", username="budgeter", password="pass12345")
+    category = Category.objects.create(name="Food", user=user, type="DEBIT")
+    budget = Budget.objects.create(
+        user=user, category=category, year=2025, month=1, amount=Decimal("100")
+    )
+
+    for spent in ("50", "91", "95", "120", "130"):
+        evaluate_budget_alert(budget, Decimal(spent))
+
+    assert [c.kwargs["critical"] for c in send_alert.call_args_list] == [False, True]
+    budget.refresh_from_db()
+    assert budget.alert_level == BudgetAlertLevel.CRITICAL
+
+    # Falling back below the thresholds re-arms the alert.
+    evaluate_budget_alert(budget, Decimal("10"))
+    evaluate_budget_alert(budget, Decimal("92"))
+    assert send_alert.call_count == 3
@@ -36,4 +36,43 @@ def test_update_category(authenticated_client, create_category):
         "name":"Travel 2"
     }
     response = api_client.patch(f"/api/v1/categories/{category_id}/",payload)
-    assert response.status_code == 200
\ No newline at end of file
+    assert response.status_code == 200
+
+@pytest.mark.django_db
+def test_list_categories_cursor_pagination(authenticated_client):
+    """Cursor pages walk every row once and do not report a count"""
+    api_client, user_id = authenticated_client
+    for i in range(7):
+        response = api_client.post(
+            "/api/v1/categories/", {"user": user_id, "type": "DEBIT", "name": f"Cat {i}"}
+        )
+        assert response.status_code == 201
+
+    first = api_client.get("/api/v1/categories/").data["data"]
+    assert "count" not in first
+    assert len(first["results"]) == 5
+    assert first["previous"] is None
+
+    second = api_client.get(first["next"]).data["data"]
+    assert len(second["results"]) == 2
+    assert second["next"] is None
+    seen = {c["id"] for c in first["results"]} | {c["id"] for c in second["results"]}
+    assert len(seen) == 7
+
+    back = api_client.get(second["previous"]).data["data"]
+    assert [c["id"] for c in back["results"]] == [c["id"] for c in first["results"]]
+
+
+@pytest.mark.django_db
+def test_list_categories_offset_pagination(authenticated_client, create_category):
+    api_client, _ = authenticated_client
+    response = api_client.get("/api/v1/categories/?pagination=offset")
+    assert response.status_code == 200
+    assert response.data["data"]["count"] == 1
+
+
+@pytest.mark.django_db
+def test_list_categories_invalid_cursor(authenticated_client, create_category):
+    api_client, _ = authenticated_client
+    response = api_client.get("/api/v1/categories/?cursor=not-a-cursor")
+    assert response.status_code == 404
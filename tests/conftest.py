@@ -1,7 +1,18 @@
 import pytest
 from rest_framework.test import APIClient
+from django.core.cache import cache
 from django.db import connection
 from user.models import CustomUser
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    """Reports, budget-check coalescing and token caching use the cache; start each test clean"""
+    cache.clear()
+    yield
+    cache.clear()
+
+
 @pytest.fixture
 def api_client():
     """Fixture to return a DRF test client"""
@@ -0,0 +1,43 @@
+import pytest
+from datetime import timedelta
+from django.utils import timezone
+from category.models import Category
+from recurring_transaction.models import RecurringTransaction
+from user.models import CustomUser
+
+
+@pytest.fixture
+def recurring_user(db):
+    return CustomUser.objects.create_user(
+        name="Recurring User",
+        email="recurring@example.com",
+        username="recurring",
+        password="Test@1234",
+    )
+
+
+@pytest.fixture
+def create_recurring(recurring_user):
+    """Creates due monthly DEBIT recurring transactions on a Rent category"""
+    category = Category.objects.create(user=recurring_user, type="DEBIT", name="Rent")
+
+    def _create_recurring(count=1, **kwargs):
+        next_run = timezone.now() - timedelta(hours=1)
+        return [
+            RecurringTransaction.objects.create(
+                **{
+                    "user": recurring_user,
+                    "type": "DEBIT",
+                    "category": category,
+                    "amount": "100.00",
+                    "frequency": "MONTHLY",
+                    "start_date": next_run,
+                    "next_run": next_run,
+                    "description": "Rent",
+                    **kwargs,
+                }
+            )
+            for _ in range(count)
+        ]
+
+    return _create_recurring
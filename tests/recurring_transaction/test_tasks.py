@@ -0,0 +1,117 @@
+import pytest
+from datetime import timedelta
+from django.utils import timezone
+from recurring_transaction.models import RecurringTransaction
+from recurring_transaction.tasks import (
+    process_recurring_batch,
+    process_recurring_transactions,
+)
+from transaction.models import MonthlyCategoryTotal, Transaction
+
+
+@pytest.mark.django_db
+def test_dispatcher_fans_out_due_rows_in_batches(create_recurring, mocker):
+    delay = mocker.patch("recurring_transaction.tasks.process_recurring_batch.delay")
+    due = create_recurring(count=5)
+    create_recurring(next_run=timezone.now() + timedelta(days=1))
+
+    assert process_recurring_transactions(batch_size=2) == 3
+
+    dispatched = [id for call in delay.call_args_list for id in call.args[0]]
+    assert sorted(dispatched) == sorted(str(rec.id) for rec in due)
+
+
+@pytest.mark.django_db
+def test_batch_posts_each_due_row_once(
+    create_recurring, mocker, django_capture_on_commit_callbacks
+):
+    mocker.patch("transaction.tasks.track_and_notify_budget_period.apply_async")
+    notify = mocker.patch("recurring_transaction.tasks.send_transaction_notification.delay")
+    recs = create_recurring(count=3)
+    ids = [str(rec.id) for rec in recs]
+    now = timezone.now()
+
+    with django_capture_on_commit_callbacks(execute=True):
+        assert process_recurring_batch(ids, now.isoformat()) == 3
+    # A second dispatch of the same ids finds next_run already advanced.
+    with django_capture_on_commit_callbacks(execute=True):
+        assert process_recurring_batch(ids, now.isoformat()) == 0
+
+    assert Transaction.objects.count() == 3
+    assert notify.call_count == 3
+    for rec in RecurringTransaction.objects.filter(id__in=ids):
+        assert rec.next_run > now
+    assert MonthlyCategoryTotal.objects.get().total == 300
+
+
+@pytest.mark.django_db
+def test_batch_retires_ended_schedules(create_recurring, mocker):
+    mocker.patch("recurring_transaction.tasks.send_transaction_notification.delay")
+    (rec,) = create_recurring(end_date=timezone.now() - timedelta(days=1))
+
+    assert process_recurring_batch([str(rec.id)], timezone.now().isoformat()) == 0
+
+    rec.refresh_from_db()
+    assert rec.is_deleted
+    assert not Transaction.objects.exists()
+
+
+@pytest.mark.django_db
+def test_catch_up_posts_every_missed_occurrence(
+    create_recurring, mocker, django_capture_on_commit_callbacks
+):
+    mocker.patch("transaction.tasks.track_and_notify_budget_period.apply_async")
+    notify = mocker.patch("recurring_transaction.tasks.send_transaction_notification.delay")
+    now = timezone.now()
+    start = now - timedelta(weeks=8, hours=1)
+    (rec,) = create_recurring(
+        frequency="WEEKLY",
+        start_date=start,
+        next_run=start,
+        end_date=now - timedelta(weeks=2),
+    )
+
+    with django_capture_on_commit_callbacks(execute=True):
+        assert process_recurring_batch([str(rec.id)], now.isoformat(), True) == 7
+
+    assert Transaction.objects.filter(user=rec.user).count() == 7
+    rec.refresh_from_db()
+    assert rec.next_run == start + timedelta(weeks=7)
+    notify.assert_called_once()
+    data = notify.call_args.args[2]
+    assert data["occurrences"] == 7
+    assert data["total_amount"] == "700.00"
+
+
+@pytest.mark.django_db
+def test_failing_schedule_does_not_block_the_batch(
+    create_recurring, mocker, django_capture_on_commit_callbacks
+):
+    from recurring_transaction import tasks
+
+    mocker.patch("transaction.tasks.track_and_notify_budget_period.apply_async")
+    notify = mocker.patch("recurring_transaction.tasks.send_transaction_notification.delay")
+    bad, *good = create_recurring(count=3)
+    create_transactions = tasks._create_transactions
+
+    def failing_create(rec_txns):
+        if any(rec_txn.id == bad.id for rec_txn in rec_txns):
+            raise ValueError("broken schedule")
+        return create_transactions(rec_txns)
+
+    mocker.patch("recurring_transaction.tasks._create_transactions", failing_create)
+    now = timezone.now()
+
+    ids = [str(rec.id) for rec in [bad, *good]]
+
+    with django_capture_on_commit_callbacks(execute=True):
+        assert process_recurring_batch(ids, now.isoformat()) == 2
+
+    assert Transaction.objects.count() == 2
+    assert notify.call_count == 2
+    assert MonthlyCategoryTotal.objects.get().total == 200
+    bad.refresh_from_db()
+    assert bad.next_run <= now
+    for rec in good:
+        rec.refresh_from_db()
+        assert rec.next_run > now
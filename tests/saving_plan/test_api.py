@@ -0,0 +1,74 @@
+import pytest
+from datetime import timedelta
+from decimal import Decimal
+from django.utils import timezone
+from saving_plan.models import SavingsPlan
+
+
+@pytest.fixture
+def plans(authenticated_client):
+    """Creates six plans for the authenticated user: two COMPLETED, four ACTIVE"""
+    api_client, user_id = authenticated_client
+    today = timezone.localdate()
+    created = []
+    for i in range(6):
+        deadline = today + timedelta(days=10 * (i + 1))
+        created.append(
+            SavingsPlan.objects.create(
+                user_id=user_id,
+                name=f"Plan {i}",
+                target_amount=Decimal("100.00"),
+                total_saved=Decimal("100.00") if i < 2 else Decimal("25.00"),
+                status="COMPLETED" if i < 2 else "ACTIVE",
+                original_deadline=deadline,
+                current_deadline=deadline,
+                frequency="WEEKLY",
+            )
+        )
+    return created
+
+
+@pytest.mark.django_db
+def test_list_serializes_only_the_page(authenticated_client, plans, django_assert_max_num_queries):
+    api_client, user_id = authenticated_client
+    api_client.get("/api/v1/savings-plans/")
+
+    with django_assert_max_num_queries(2):
+        response = api_client.get("/api/v1/savings-plans/?page_size=2")
+
+    assert response.status_code == 200
+    results = response.data["data"]["results"]
+    assert len(results) == 2
+    assert results[0]["progress"]["remaining_amount"] == Decimal("75.00")
+    # total_saved is rendered as a JSON number, as before it was a column.
+    assert response.json()["data"]["results"][0]["total_saved"] == 25.0
+
+
+@pytest.mark.django_db
+def test_list_filters_by_status_and_deadline(authenticated_client, plans):
+    api_client, user_id = authenticated_client
+    today = timezone.localdate()
+
+    response = api_client.get(
+        "/api/v1/savings-plans/",
+        {
+            "status": "active",
+            "deadline_from": str(today + timedelta(days=35)),
+            "deadline_to": str(today + timedelta(days=60)),
+            "page_size": 10,
+        },
+    )
+
+    assert response.status_code == 200
+    names = {plan["name"] for plan in response.data["data"]["results"]}
+    assert names == {"Plan 3", "Plan 4", "Plan 5"}
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    "params", [{"status": "DONE"}, {"deadline_from": "31-12-2025"}]
+)
+def test_list_rejects_invalid_filters(authenticated_client, params):
+    api_client, user_id = authenticated_client
+    response = api_client.get("/api/v1/savings-plans/", params)
+    assert response.status_code == 400
@@ -0,0 +1,142 @@
+import pytest
+from datetime import timedelta
+from decimal import Decimal
+from django.utils import timezone
+from saving_plan.models import SavingsPlan
+from saving_plan.tasks import (
+    check_overdue_savings_plans,
+    check_savings_progress,
+    evaluate_savings_plans,
+    schedule_savings_checks,
+)
+from transaction.models import Transaction
+from user.models import CustomUser
+
+
+@pytest.fixture
+def create_plan(db):
+    """Creates an ACTIVE plan due in about ten weeks"""
+    user = CustomUser.objects.create_user(
+        name="Saver", email="saver@example.com", username="saver", password="Test@1234"
+    )
+
+    def _create_plan(**kwargs):
+        deadline = timezone.localdate() + timedelta(days=70)
+        return SavingsPlan.objects.create(
+            **{
+                "user": user,
+                "name": "Holiday",
+                "target_amount": Decimal("700.00"),
+                "original_deadline": deadline,
+                "current_deadline": deadline,
+                "frequency": "WEEKLY",
+                **kwargs,
+            }
+        )
+
+    return _create_plan
+
+
+@pytest.mark.django_db
+def test_behind_plan_is_reminded_once_per_period(create_plan, mocker):
+    notify = mocker.patch("saving_plan.tasks.send_savings_plan_notification.delay")
+    plan = create_plan()
+
+    assert check_savings_progress() == 1
+    assert check_savings_progress() == 0
+
+    notify.assert_called_once()
+    assert notify.call_args.args[0] == "saver@example.com"
+    plan.refresh_from_db()
+    assert plan.last_reminded_at is not None
+
+
+@pytest.mark.django_db
+def test_on_track_plan_and_deleted_savings(create_plan, mocker):
+    notify = mocker.patch("saving_plan.tasks.send_savings_plan_notification.delay")
+    on_track = create_plan(name="On track", total_saved=Decimal("100.00"))
+    behind = create_plan(name="Behind", total_saved=Decimal("100.00"))
+    for plan, is_deleted in ((on_track, False), (behind, True)):
+        Transaction.objects.create(
+            user=plan.user,
+            savings_plan=plan,
+            type="DEBIT",
+            amount=Decimal("100.00"),
+            date=timezone.now(),
+            is_deleted=is_deleted,
+        )
+
+    assert check_savings_progress() == 1
+    assert notify.call_args.args[2]["plan_name"] == "Behind"
+
+
+@pytest.mark.django_db
+def test_scheduler_only_dispatches_due_plans(create_plan, mocker, settings):
+    settings.SAVINGS_CHECK_SHARDS = 4
+    delay = mocker.patch("saving_plan.tasks.evaluate_savings_plans.delay")
+    due = create_plan(name="Due")
+    create_plan(name="Later", next_check_at=timezone.now() + timedelta(hours=1))
+    create_plan(name="Paused", status="PAUSED")
+
+    assert schedule_savings_checks() == 1
+    delay.assert_called_once_with([str(due.id)])
+    # The dispatched plan is claimed until its check reschedules it.
+    assert schedule_savings_checks() == 0
+
+
+@pytest.mark.django_db
+def test_scheduler_dispatches_bounded_batches(create_plan, mocker, settings):
+    settings.SAVINGS_CHECK_SHARDS = 1
+    delay = mocker.patch("saving_plan.tasks.evaluate_savings_plans.delay")
+    plans = {str(create_plan(name=f"Plan {i}").id) for i in range(5)}
+
+    assert schedule_savings_checks(batch_size=2) == 3
+    batches = [call.args[0] for call in delay.call_args_list]
+    assert [len(batch) for batch in batches] == [2, 2, 1]
+    assert {plan_id for batch in batches for plan_id in batch} == plans
+
+
+@pytest.mark.django_db
+def test_evaluation_sets_next_check_at(create_plan, mocker):
+    mocker.patch("saving_plan.tasks.send_savings_plan_notification.delay")
+    weekly = create_plan(name="Weekly")
+    ending = create_plan(
+        name="Ending", frequency="MONTHLY", current_deadline=timezone.localdate()
+    )
+
+    evaluate_savings_plans([str(weekly.id), str(ending.id)])
+
+    weekly.refresh_from_db()
+    ending.refresh_from_db()
+    now = timezone.localtime()
+    assert weekly.next_check_at > now
+    assert timezone.localtime(weekly.next_check_at).weekday() == 0
+    assert timezone.localtime(ending.next_check_at).date() == timezone.localdate() + timedelta(days=1)
+
+
+@pytest.mark.django_db
+def test_overdue_sweep_runs_in_constant_queries(
+    create_plan, mocker, django_assert_max_num_queries, django_capture_on_commit_callbacks
+):
+    completion = mocker.patch(
+        "saving_plan.tasks.send_savings_plan_completion_notification.delay"
+    )
+    notify = mocker.patch("saving_plan.tasks.send_savings_plan_notification.delay")
+    deadline = timezone.localdate() - timedelta(days=1)
+    done = create_plan(name="Done", current_deadline=deadline, total_saved=Decimal("700.00"))
+    late = [
+        create_plan(name=f"Late {i}", current_deadline=deadline, frequency=frequency)
+        for i, frequency in enumerate(["DAILY", "WEEKLY", "MONTHLY"] * 5)
+    ]
+
+    with django_assert_max_num_queries(5):
+        with django_capture_on_commit_callbacks(execute=True):
+            assert check_overdue_savings_plans() == (1, 15)
+
+    done.refresh_from_db()
+    assert done.status == "COMPLETED"
+    completion.assert_called_once_with(done.id)
+    assert notify.call_count == 15
+    extensions = {1: "DAILY", 7: "WEEKLY", 30: "MONTHLY"}
+    for plan in SavingsPlan.objects.filter(id__in=[p.id for p in late]):
+        assert extensions[(plan.current_deadline - deadline).days] == plan.frequency
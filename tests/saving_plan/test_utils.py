@@ -0,0 +1,29 @@
+import pytest
+from datetime import timedelta
+from decimal import Decimal
+from django.utils import timezone
+from saving_plan.models import SavingsPlan
+from saving_plan.utils import apply_savings_delta
+
+
+@pytest.mark.django_db
+def test_apply_savings_delta_updates_deleted_plan(create_user):
+    user = create_user(email="plan@example.com", username="plan", password="Test@1234")
+    deadline = timezone.localdate() + timedelta(days=30)
+    plan = SavingsPlan.objects.create(
+        user=user,
+        name="Bike",
+        target_amount=Decimal("50.00"),
+        total_saved=Decimal("50.00"),
+        status="COMPLETED",
+        original_deadline=deadline,
+        current_deadline=deadline,
+        frequency="WEEKLY",
+        is_deleted=True,
+    )
+
+    plan, completed = apply_savings_delta(plan.id, Decimal("-20.00"))
+
+    assert not completed
+    plan.refresh_from_db()
+    assert (plan.total_saved, plan.status) == (Decimal("30.00"), "ACTIVE")
@@ -0,0 +1,11 @@
+import pytest
+
+
+@pytest.fixture
+def create_category(db, authenticated_client):
+    """Creates a debit category and returns its ID"""
+    api_client, user_id = authenticated_client
+    payload = {"user": user_id, "type": "DEBIT", "name": "Groceries"}
+    response = api_client.post("/api/v1/categories/", payload)
+    assert response.status_code == 201, f"Failed to create category: {response.data}"
+    return response.data["data"]["id"]
@@ -0,0 +1,319 @@
+import pytest
+from transaction.models import Transaction
+from transaction.tasks import get_budget_check_metrics, track_and_notify_budget_period
+
+
+@pytest.mark.django_db
+def test_bulk_create_transactions(authenticated_client, create_category, mocker):
+    api_client, user_id = authenticated_client
+    budget_check = mocker.patch("transaction.tasks.track_and_notify_budget_period.apply_async")
+    rows = [
+        {
+            "type": "DEBIT",
+            "amount": "10.50",
+            "user": user_id,
+            "category": create_category,
+            "date": f"2025-0{month}-0{day}T10:00:00Z",
+        }
+        for month in (1, 2)
+        for day in range(1, 4)
+    ]
+
+    response = api_client.post(
+        "/api/v1/transactions/bulk/", {"transactions": rows}, format="json"
+    )
+
+    assert response.status_code == 201, response.data
+    assert response.data["data"]["count"] == 6
+    assert Transaction.objects.filter(user_id=user_id).count() == 6
+    # One re-evaluation per (user, category, month), not per row.
+    assert budget_check.call_count == 2
+
+
+@pytest.mark.django_db
+def test_bulk_create_transactions_rejects_whole_batch(authenticated_client, create_category):
+    api_client, user_id = authenticated_client
+    rows = [
+        {"type": "DEBIT", "amount": "5", "user": user_id, "category": create_category,
+         "date": "2025-01-01T10:00:00Z"},
+        {"type": "CREDIT", "amount": "5", "user": user_id, "category": create_category,
+         "date": "2025-01-01T10:00:00Z"},
+        {"type": "DEBIT", "amount": "-1", "user": user_id, "category": create_category,
+         "date": "2025-01-01T10:00:00Z"},
+    ]
+
+    response = api_client.post(
+        "/api/v1/transactions/bulk/", {"transactions": rows}, format="json"
+    )
+
+    assert response.status_code == 400
+    assert set(response.data["errors"]) == {"2.amount"}
+    assert not Transaction.objects.exists()
+
+
+@pytest.mark.django_db
+def test_import_statement_skips_reimported_rows(
+    authenticated_client, create_category, mocker, settings, tmp_path
+):
+    from django.core.files.uploadedfile import SimpleUploadedFile
+    from transaction.models import TransactionImport
+    from transaction.tasks import import_transactions_csv
+
+    settings.MEDIA_ROOT = tmp_path
+    api_client, user_id = authenticated_client
+    queue_import = mocker.patch("transaction.views.import_transactions_csv.delay")
+    mocker.patch("transaction.tasks.track_and_notify_budget_period.apply_async")
+    statement = (
+        b"date,amount,description\n"
+        b"2025-01-02,-4.50,Coffee  Shop\n"
+        b"2025-01-02,-4.50,Coffee Shop\n"
+        b"2025-01-03,-20.00,Books\n"
+        b"not-a-date,-1.00,Broken\n"
+    )
+
+    def upload():
+        response = api_client.post(
+            "/api/v1/transactions/import/",
+            {
+                "user": user_id,
+                "debit_category": create_category,
+                "file": SimpleUploadedFile("statement.csv", statement),
+            },
+            format="multipart",
+        )
+        assert response.status_code == 202, response.data
+        import_transactions_csv(response.data["data"]["id"])
+        return TransactionImport.objects.get(id=response.data["data"]["id"])
+
+    first = upload()
+    assert queue_import.call_count == 1
+    assert (first.status, first.imported_count, first.error_count) == ("COMPLETED", 3, 1)
+
+    second = upload()
+    assert (second.imported_count, second.duplicate_count) == (0, 3)
+    assert Transaction.objects.filter(user_id=user_id).count() == 3
+
+
+@pytest.mark.django_db
+def test_monthly_totals_follow_transaction_writes(authenticated_client, create_category, mocker):
+    from django.core.management import call_command
+    from transaction.models import MonthlyCategoryTotal
+
+    api_client, user_id = authenticated_client
+    mocker.patch("transaction.tasks.track_and_notify_budget_period.apply_async")
+
+    def january_total():
+        row = MonthlyCategoryTotal.objects.filter(year=2025, month=1, type="DEBIT").first()
+        return row.total if row else 0
+
+    payload = {"type": "DEBIT", "amount": "30.00", "user": user_id,
+               "category": create_category, "date": "2025-01-15T10:00:00Z"}
+    first = api_client.post("/api/v1/transactions/", payload, format="json").data["data"]
+    api_client.post("/api/v1/transactions/", {**payload, "amount": "12.00"}, format="json")
+    assert january_total() == 42
+
+    api_client.patch(f"/api/v1/transactions/{first['id']}/", {"amount": "20.00", "category": create_category},
+                     format="json")
+    assert january_total() == 32
+
+    api_client.delete(f"/api/v1/transactions/{first['id']}/")
+    assert january_total() == 12
+
+    MonthlyCategoryTotal.objects.update(total=0)
+    call_command("rebuild_monthly_totals")
+    assert january_total() == 12
+
+
+@pytest.mark.django_db
+def test_savings_plan_total_follows_transactions(authenticated_client, mocker):
+    from datetime import date
+    from saving_plan.models import SavingsPlan
+
+    api_client, user_id = authenticated_client
+    mocker.patch("transaction.tasks.track_and_notify_budget_period.apply_async")
+    plan = SavingsPlan.objects.create(
+        user_id=user_id, name="Bike", target_amount="100.00", frequency="MONTHLY",
+        original_deadline=date(2099, 1, 1), current_deadline=date(2099, 1, 1),
+    )
+    payload = {"type": "DEBIT", "user": user_id, "savings_plan": str(plan.id),
+               "date": "2025-01-15T10:00:00Z"}
+
+    api_client.post("/api/v1/transactions/", {**payload, "amount": "40.00"}, format="json")
+    second = api_client.post(
+        "/api/v1/transactions/", {**payload, "amount": "60.00"}, format="json"
+    ).data["data"]
+    plan.refresh_from_db()
+    assert (plan.total_saved, plan.status) == (100, "COMPLETED")
+
+    api_client.delete(f"/api/v1/transactions/{second['id']}/")
+    plan.refresh_from_db()
+    assert (plan.total_saved, plan.status) == (40, "ACTIVE")
+
+
+@pytest.mark.django_db
+def test_budget_checks_are_coalesced_per_period(
+    authenticated_client, create_category, mocker, settings
+):
+    settings.BUDGET_CHECK_COALESCE = True
+    api_client, user_id = authenticated_client
+    budget_check = mocker.patch("transaction.tasks.track_and_notify_budget_period.apply_async")
+    payload = {
+        "type": "DEBIT",
+        "amount": "4.00",
+        "user": user_id,
+        "category": create_category,
+        "date": "2025-03-10T10:00:00Z",
+    }
+
+    for _ in range(3):
+        response = api_client.post("/api/v1/transactions/", payload)
+        assert response.status_code == 201, response.data
+
+    assert budget_check.call_count == 1
+    assert get_budget_check_metrics() == {"scheduled": 1, "collapsed": 2}
+
+    # Once the pending check runs, the next write schedules a fresh one.
+    year, month = 2025, 3
+    track_and_notify_budget_period(user_id, create_category, year, month)
+    api_client.post("/api/v1/transactions/", payload)
+    assert budget_check.call_count == 2
+
+
+@pytest.mark.django_db
+def test_budget_checks_are_not_coalesced_without_shared_cache(
+    authenticated_client, create_category, mocker, settings
+):
+    settings.BUDGET_CHECK_COALESCE = False
+    api_client, user_id = authenticated_client
+    budget_check = mocker.patch("transaction.tasks.track_and_notify_budget_period.apply_async")
+    payload = {
+        "type": "DEBIT",
+        "amount": "4.00",
+        "user": user_id,
+        "category": create_category,
+        "date": "2025-03-10T10:00:00Z",
+    }
+
+    for _ in range(2):
+        assert api_client.post("/api/v1/transactions/", payload).status_code == 201
+
+    assert budget_check.call_count == 2
+    assert get_budget_check_metrics() == {"scheduled": 0, "collapsed": 0}
+
+
+@pytest.mark.django_db
+def test_failed_import_keeps_file_and_resumes(
+    authenticated_client, create_category, mocker, settings, tmp_path
+):
+    from django.core.files.uploadedfile import SimpleUploadedFile
+    from transaction import tasks
+    from transaction.models import TransactionImport
+
+    settings.MEDIA_ROOT = tmp_path
+    api_client, user_id = authenticated_client
+    mocker.patch("transaction.views.import_transactions_csv.delay")
+    mocker.patch("transaction.tasks.track_and_notify_budget_period.delay")
+    mocker.patch("transaction.tasks.IMPORT_CHUNK_SIZE", 2)
+    statement = b"date,amount,description\n" + b"".join(
+        b"2025-01-%02d,-1.00,Coffee\n" % day for day in range(1, 6)
+    )
+    response = api_client.post(
+        "/api/v1/transactions/import/",
+        {
+            "user": user_id,
+            "debit_category": create_category,
+            "file": SimpleUploadedFile("statement.csv", statement),
+        },
+        format="multipart",
+    )
+    import_id = response.data["data"]["id"]
+
+    write_chunk = tasks._write_import_chunk
+    calls = []
+
+    def fail_second_chunk(*args):
+        calls.append(args)
+        if len(calls) == 2:
+            raise RuntimeError("database went away")
+        return write_chunk(*args)
+
+    mocker.patch("transaction.tasks._write_import_chunk", fail_second_chunk)
+    with pytest.raises(RuntimeError):
+        tasks.import_transactions_csv(import_id)
+
+    job = TransactionImport.objects.get(id=import_id)
+    assert (job.status, job.processed_rows, job.imported_count) == ("FAILED", 2, 2)
+    assert job.file.storage.exists(job.file.name)
+
+    mocker.patch("transaction.tasks._write_import_chunk", write_chunk)
+    tasks.import_transactions_csv(import_id)
+
+    job.refresh_from_db()
+    assert (job.status, job.imported_count, job.duplicate_count) == ("COMPLETED", 5, 0)
+    assert Transaction.objects.filter(user_id=user_id).count() == 5
+    assert not job.file.storage.exists(job.file.name)
+
+
+@pytest.mark.django_db
+def test_import_chunk_skips_conflicting_fingerprints(create_user):
+    from django.utils import timezone
+    from category.models import Category
+    from transaction.models import MonthlyCategoryTotal, TransactionImport
+    from transaction.tasks import _write_import_chunk
+
+    user = create_user(email="race@example.com", username="race", password="Test@1234")
+    category = Category.objects.create(user=user, type="DEBIT", name="Food")
+    job = TransactionImport.objects.create(
+        user=user, debit_category=category, file="statement.csv"
+    )
+
+    def row():
+        return Transaction(
+            user=user,
+            category=category,
+            type="DEBIT",
+            amount=5,
+            date=timezone.now(),
+            fingerprint="f" * 64,
+        )
+
+    # Both rows pass the duplicate check; the constraint lets only one in,
+    # as it does when two imports of one statement race.
+    _write_import_chunk(job, [row(), row()], 0)
+
+    job.refresh_from_db()
+    assert (job.imported_count, job.duplicate_count) == (1, 1)
+    assert Transaction.objects.filter(user=user).count() == 1
+    assert MonthlyCategoryTotal.objects.get(user=user).total == 5
+
+
+@pytest.mark.django_db
+def test_delete_rearms_budget_alert(
+    authenticated_client, create_category, mocker, django_capture_on_commit_callbacks
+):
+    from budget.models import Budget
+
+    api_client, user_id = authenticated_client
+    mocker.patch(
+        "transaction.tasks.track_and_notify_budget_period.delay",
+        side_effect=track_and_notify_budget_period,
+    )
+    send_alert = mocker.patch("budget.utils.send_budget_alert")
+    Budget.objects.create(
+        user_id=user_id, category_id=create_category, year=2025, month=3, amount=100
+    )
+    payload = {
+        "type": "DEBIT",
+        "amount": "95.00",
+        "user": user_id,
+        "category": create_category,
+        "date": "2025-03-10T10:00:00Z",
+    }
+
+    first = api_client.post("/api/v1/transactions/", payload).data["data"]
+    with django_capture_on_commit_callbacks(execute=True):
+        response = api_client.delete(f"/api/v1/transactions/{first['id']}/")
+    assert response.status_code == 204
+    api_client.post("/api/v1/transactions/", payload)
+
+    assert send_alert.call_count == 2
@@ -0,0 +1,35 @@
+from collections import Counter
+from types import SimpleNamespace
+
+import pytest
+from category.models import Category
+from transaction.tasks import _parse_statement_row
+
+
+@pytest.mark.django_db
+def test_purchase_and_refund_get_different_fingerprints(create_user):
+    user = create_user(email="refund@example.com", username="refund", password="Test@1234")
+    job = SimpleNamespace(
+        user_id=user.id,
+        column_mapping={
+            "date_column": "date",
+            "amount_column": "amount",
+            "description_column": "description",
+            "type_column": "",
+            "date_format": "%Y-%m-%d",
+        },
+        debit_category=Category.objects.create(user=user, type="DEBIT", name="Shop"),
+        credit_category=Category.objects.create(user=user, type="CREDIT", name="Refunds"),
+    )
+    occurrences = Counter()
+
+    purchase, refund = (
+        _parse_statement_row(
+            job, {"date": "2025-01-02", "amount": amount, "description": "Shop"}, occurrences
+        )
+        for amount in ("-4.50", "4.50")
+    )
+
+    assert (purchase.type, refund.type) == ("DEBIT", "CREDIT")
+    assert purchase.amount == refund.amount
+    assert purchase.fingerprint != refund.fingerprint
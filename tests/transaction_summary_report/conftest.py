@@ -0,0 +1,28 @@
+import pytest
+from datetime import datetime, timezone
+from decimal import Decimal
+from category.models import Category
+from transaction.models import Transaction
+from user.models import CustomUser
+
+
+@pytest.fixture
+def report_data(authenticated_client):
+    """Creates income and expense rows across two categories for the logged-in user"""
+    api_client, user_id = authenticated_client
+    user = CustomUser.objects.get(id=user_id)
+    salary = Category.objects.create(name="Salary", user=user, type="CREDIT")
+    food = Category.objects.create(name="Food", user=user, type="DEBIT")
+    rent = Category.objects.create(name="Rent", user=user, type="DEBIT")
+    rows = [(salary, "CREDIT", "1000")] + [(food, "DEBIT", "10")] * 5 + [(rent, "DEBIT", "300")]
+    Transaction.objects.bulk_create(
+        Transaction(
+            user=user,
+            category=category,
+            type=type,
+            amount=Decimal(amount),
+            date=datetime(2025, 1, day + 1, 10, tzinfo=timezone.utc),
+        )
+        for day, (category, type, amount) in enumerate(rows)
+    )
+    return api_client
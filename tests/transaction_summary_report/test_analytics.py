@@ -0,0 +1,53 @@
+import numpy as np
+from transaction_summary_report.analytics import (
+    TransactionFrame,
+    forecast_monthly_spending,
+    group_median_mad,
+)
+
+
+def test_forecast_flat_history_is_flat():
+    history = np.full((1, 24), 10000)
+
+    forecast, lower, upper = forecast_monthly_spending(history, 3)
+
+    assert np.allclose(forecast, 10000)
+    assert np.allclose(lower, forecast) and np.allclose(upper, forecast)
+
+
+def test_forecast_applies_same_month_last_year():
+    # Spending doubles every twelfth month; the first forecast month is one of them.
+    history = np.full((1, 36), 100)
+    history[0, [0, 12, 24]] = 200
+
+    forecast, lower, upper = forecast_monthly_spending(history, 2)
+
+    assert forecast[0, 0] > 1.5 * forecast[0, 1]
+    assert (lower <= forecast).all() and (forecast <= upper).all()
+
+
+def test_forecast_ignores_months_before_first_spending():
+    history = np.zeros((2, 60))
+    history[0, -3:] = 500
+    history[1, :] = 500
+
+    forecast, _, _ = forecast_monthly_spending(history, 1)
+
+    assert np.allclose(forecast[:, 0], 500)
+
+
+def test_rolling_sum():
+    values = np.array([1, 2, 3, 4, 5])
+
+    assert TransactionFrame.rolling_sum(values, 2).tolist() == [1, 3, 5, 7, 9]
+
+
+def test_group_median_mad():
+    codes = np.array([0, 1, 0, 0, 1, 0])
+    values = np.array([1.0, 10.0, 2.0, 3.0, 30.0, 100.0])
+
+    median, mad, counts = group_median_mad(codes, values, 3)
+
+    assert median.tolist() == [2.5, 20.0, 0.0]
+    assert mad.tolist() == [1.0, 10.0, 0.0]
+    assert counts.tolist() == [4, 2, 0]
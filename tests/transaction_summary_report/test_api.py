@@ -0,0 +1,201 @@
+import gzip
+import json
+import pytest
+from decimal import Decimal
+from django.utils import timezone
+from budget.models import Budget
+from category.models import Category
+from transaction.models import MonthlyCategoryTotal, Transaction
+
+REPORT_URL = "/api/v1/transaction-analytics/?start_date=2025-01-01&end_date=2025-01-31"
+
+
+@pytest.mark.django_db
+def test_transaction_report(report_data, django_assert_max_num_queries):
+    # Auth lookups plus totals, category breakdown and rows; independent of row count.
+    with django_assert_max_num_queries(6):
+        response = report_data.get(REPORT_URL)
+
+    assert response.status_code == 200, response.data
+    data = response.data["data"]
+    assert data["total_income"] == Decimal("1000")
+    assert data["total_expense"] == Decimal("350")
+    assert [(c["category_name"], c["total"]) for c in data["category_expense"]] == [
+        ("Rent", Decimal("300")),
+        ("Food", Decimal("50")),
+    ]
+    debit_rows = data["transactions"]["debit_transactions"]
+    assert len(debit_rows) == 6
+    assert debit_rows[0]["category"] == "Rent"
+    assert debit_rows[0]["amount"] == "300.00"
+    assert data["transactions"]["credit_transactions"][0]["category"] == "Salary"
+
+
+@pytest.mark.django_db
+def test_transaction_report_aggregates_only(report_data):
+    response = report_data.get(f"{REPORT_URL}&include_transactions=false")
+
+    assert response.status_code == 200, response.data
+    assert "transactions" not in response.data["data"]
+    assert response.data["data"]["total_expense"] == Decimal("350")
+
+
+@pytest.mark.django_db
+def test_transaction_report_cache_invalidated_by_writes(
+    report_data, django_assert_max_num_queries, django_capture_on_commit_callbacks, mocker
+):
+    mocker.patch("transaction.tasks.track_and_notify_budget_period.apply_async")
+    url = f"{REPORT_URL}&include_transactions=false"
+    assert report_data.get(url).data["data"]["total_expense"] == Decimal("350")
+
+    # Served from the cache: only the authentication queries run.
+    with django_assert_max_num_queries(2):
+        assert report_data.get(url).data["data"]["total_expense"] == Decimal("350")
+
+    transaction = Transaction.objects.filter(type="DEBIT").first()
+    with django_capture_on_commit_callbacks(execute=True):
+        response = report_data.post(
+            "/api/v1/transactions/",
+            {
+                "type": "DEBIT",
+                "amount": "25.00",
+                "user": transaction.user_id,
+                "category": transaction.category_id,
+                "date": "2025-01-20T10:00:00Z",
+            },
+        )
+    assert response.status_code == 201, response.data
+
+    assert report_data.get(url).data["data"]["total_expense"] == Decimal("375")
+
+
+EXPORT_URL = (
+    "/api/v1/transaction-analytics/summary/"
+    "?start_date=2025-01-01&end_date=2025-01-31&delivery=download"
+)
+
+
+@pytest.mark.django_db
+def test_transaction_history_download_csv(report_data):
+    response = report_data.get(EXPORT_URL)
+
+    assert response.status_code == 200
+    assert response.streaming
+    lines = b"".join(response.streaming_content).decode().splitlines()
+    assert lines[0] == "date,type,category,savings_plan,amount,description"
+    assert len(lines) == 8
+    assert lines[1].split(",")[1:5] == ["CREDIT", "Salary", "", "1000.00"]
+
+
+@pytest.mark.django_db
+def test_transaction_history_download_ndjson_gzip(report_data):
+    response = report_data.get(
+        f"{EXPORT_URL}&file_format=ndjson", HTTP_ACCEPT_ENCODING="br, gzip;q=0.8"
+    )
+
+    assert response.status_code == 200
+    assert response["Content-Encoding"] == "gzip"
+    body = gzip.decompress(b"".join(response.streaming_content)).decode()
+    rows = [json.loads(line) for line in body.splitlines()]
+    assert len(rows) == 7
+    assert rows[-1]["category"] == "Rent"
+    assert rows[-1]["amount"] == "300.00"
+
+
+@pytest.mark.django_db
+def test_spending_trends_dense_weekly_series(report_data):
+    url = (
+        "/api/v1/transaction-analytics/trends/"
+        "?start_date=2025-01-01&end_date=2025-01-31&granularity=week"
+    )
+    response = report_data.get(url)
+
+    assert response.status_code == 200, response.data
+    data = response.data["data"]
+    assert data["granularity"] == "week"
+    # 2025-01-01 is a Wednesday; buckets start on Mondays.
+    assert data["buckets"] == [
+        "2024-12-30", "2025-01-06", "2025-01-13", "2025-01-20", "2025-01-27"
+    ]
+    assert data["income_totals"] == [1000.0, 0.0, 0.0, 0.0, 0.0]
+    assert data["expense_totals"] == [40.0, 310.0, 0.0, 0.0, 0.0]
+    food = next(s for s in data["series"] if s["category_name"] == "Food")
+    assert food["amounts"] == [40.0, 10.0, 0.0, 0.0, 0.0]
+
+
+@pytest.mark.django_db
+def test_spending_trends_rejects_unknown_granularity(report_data):
+    response = report_data.get(
+        "/api/v1/transaction-analytics/trends/"
+        "?start_date=2025-01-01&end_date=2025-01-31&granularity=hour"
+    )
+
+    assert response.status_code == 400
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("granularity", ["day", "week", "month", "year"])
+def test_spending_trends_vector_engine_matches_sql(report_data, granularity):
+    url = (
+        "/api/v1/transaction-analytics/trends/"
+        f"?start_date=2024-12-15&end_date=2025-02-10&granularity={granularity}"
+    )
+    sql = report_data.get(url).json()["data"]
+    vector = report_data.get(f"{url}&engine=vector").json()["data"]
+
+    for key in ("total_income", "total_expense", "buckets", "income_totals",
+                "expense_totals", "series"):
+        assert vector[key] == sql[key], key
+    assert sorted(vector["expense"], key=lambda c: c["category_name"]) == sorted(
+        sql["expense"], key=lambda c: c["category_name"]
+    )
+    assert vector["statistics"]["max_7_day_expense"] == 350.0
+
+
+@pytest.mark.django_db
+def test_transaction_report_vector_engine(report_data):
+    response = report_data.get(f"{REPORT_URL}&engine=vector&include_transactions=false")
+
+    assert response.status_code == 200, response.data
+    data = response.data["data"]
+    assert data["total_income"] == Decimal("1000")
+    assert data["total_expense"] == Decimal("350")
+    assert [(c["category_name"], c["total"]) for c in data["category_expense"]] == [
+        ("Rent", Decimal("300")),
+        ("Food", Decimal("50")),
+    ]
+
+
+@pytest.mark.django_db
+def test_spending_forecast_compares_with_budget(authenticated_client):
+    api_client, user_id = authenticated_client
+    today = timezone.localdate()
+    food = Category.objects.create(name="Food", user_id=user_id, type="DEBIT")
+    current = today.year * 12 + today.month - 1
+    MonthlyCategoryTotal.objects.bulk_create(
+        MonthlyCategoryTotal(
+            user_id=user_id,
+            category=food,
+            year=(current - ago) // 12,
+            month=(current - ago) % 12 + 1,
+            type="DEBIT",
+            total=Decimal("200"),
+        )
+        for ago in range(1, 7)
+    )
+    Budget.objects.create(
+        user_id=user_id, category=food, year=today.year, month=today.month,
+        amount=Decimal("150"),
+    )
+
+    response = api_client.get("/api/v1/transaction-analytics/forecast/?months=2")
+
+    assert response.status_code == 200, response.data
+    data = response.data["data"]
+    assert data["months"][0] == f"{today.year}-{today.month:02d}"
+    [category] = data["categories"]
+    first = category["forecast"][0]
+    assert first["amount"] == 200.0
+    assert first["budget"] == 150.0
+    assert first["over_budget"] is True
+    assert category["forecast"][1]["budget"] is None
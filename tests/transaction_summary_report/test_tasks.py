@@ -0,0 +1,154 @@
+import base64
+import io
+import pytest
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from category.models import Category
+from services.notification import b64encode_file
+from transaction.models import Transaction
+from transaction_summary_report.models import SpendingAnomaly
+from transaction_summary_report.tasks import (
+    TransactionReport,
+    detect_spending_anomalies,
+    detect_spending_anomalies_shard,
+    email_transaction_history,
+)
+
+
+@pytest.mark.django_db
+def test_transaction_report_csv(report_data):
+    report = TransactionReport(
+        "2025-01-01", "2025-01-31", Transaction.objects.filter(is_deleted=False)
+    )
+
+    with report.make_csv() as output:
+        lines = output.read().splitlines()
+
+    assert "Total Income,RS1000.00" in lines
+    assert "Total Expenses,RS350.00" in lines
+    income = lines.index("Income")
+    expenses = lines.index("Expenses")
+    assert lines[income + 2] == "Salary,1000.00,2025-01-01"
+    assert len(lines[expenses + 2 :]) == 6
+
+
+@pytest.mark.django_db
+def test_transaction_report_pdf_spans_several_tables(create_user):
+    user = create_user(email="pdf@example.com", username="pdf", password="pass12345")
+    category = Category.objects.create(name="Food", user=user, type="DEBIT")
+    start = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    Transaction.objects.bulk_create(
+        Transaction(
+            user=user,
+            category=category,
+            type="DEBIT",
+            amount=Decimal("1.00"),
+            date=start + timedelta(minutes=i),
+        )
+        for i in range(TransactionReport.PDF_TABLE_ROWS * 2 + 1)
+    )
+    report = TransactionReport(
+        "2025-01-01", "2025-01-31", Transaction.objects.filter(user=user)
+    )
+
+    with report.make_pdf() as output:
+        assert output.read(5) == b"%PDF-"
+    assert report.total_expenses == Decimal("401.00")
+
+
+@pytest.mark.django_db
+def test_email_transaction_history_attaches_report(report_data, mocker):
+    sent = {}
+
+    def send_mail(*args, attachment, **kwargs):
+        sent.update(attachment, content=b64encode_file(attachment["file_data"]))
+        return True
+
+    mocker.patch("transaction_summary_report.tasks.send_mail", send_mail)
+    user = Transaction.objects.first().user
+
+    email_transaction_history(user.id, user.email, "2025-01-01", "2025-01-31", "csv")
+
+    assert sent["file_name"] == "transactions_2025-01-01_2025-01-31.csv"
+    assert "Rent,300.00,2025-01-07" in base64.b64decode(sent["content"]).decode()
+
+
+@pytest.mark.django_db
+def test_email_transaction_history_links_large_reports(report_data, mocker, settings):
+    settings.REPORT_EMAIL_ATTACHMENT_MAX_BYTES = 100
+    send_mail = mocker.patch(
+        "transaction_summary_report.tasks.send_mail", return_value=True
+    )
+    user = Transaction.objects.first().user
+
+    email_transaction_history(user.id, user.email, "2025-01-01", "2025-01-31", "pdf")
+
+    assert send_mail.call_args.kwargs["attachment"] is None
+    download_url = send_mail.call_args.kwargs["dynamic_template_data"]["download_url"]
+    assert "delivery=download&file_format=csv&start_date=2025-01-01" in download_url
+
+
+def test_b64encode_file_matches_whole_file_encoding():
+    text = "Café,4.50,2025-01-02\n" * 20000
+
+    assert b64encode_file(io.StringIO(text)) == base64.b64encode(text.encode()).decode()
+
+
+@pytest.mark.django_db
+def test_detect_spending_anomalies_flags_outliers(authenticated_client):
+    api_client, user_id = authenticated_client
+    category = Category.objects.create(name="Food", user_id=user_id, type="DEBIT")
+    day = datetime(2025, 3, 31, 12, tzinfo=timezone.utc)
+
+    def debit(amount, days_ago):
+        return Transaction(
+            user_id=user_id,
+            category=category,
+            type="DEBIT",
+            amount=Decimal(amount),
+            date=day - timedelta(days=days_ago),
+        )
+
+    history = [debit(str(10 + i % 5), days_ago) for i, days_ago in enumerate(range(1, 30))]
+    usual, outlier = debit("12", 0), debit("250", 0)
+    Transaction.objects.bulk_create(history + [usual, outlier])
+
+    assert detect_spending_anomalies_shard("2025-03-31", [user_id]) == 1
+    # A rerun of the same day does not duplicate the flag.
+    detect_spending_anomalies_shard("2025-03-31", [user_id])
+
+    anomaly = SpendingAnomaly.objects.get()
+    assert anomaly.transaction_id == outlier.id
+    assert anomaly.median == Decimal("12.00")
+    assert anomaly.score > 3.5
+
+    response = api_client.get("/api/v1/transaction-analytics/anomalies/")
+    assert response.status_code == 200, response.data
+    [row] = response.data["data"]["results"]
+    assert row["transaction"] == outlier.id
+    assert row["category_name"] == "Food"
+
+
+@pytest.mark.django_db
+def test_detect_spending_anomalies_splits_users_once(create_user, mocker, settings):
+    settings.ANOMALY_DETECTION_SHARDS = 4
+    delay = mocker.patch(
+        "transaction_summary_report.tasks.detect_spending_anomalies_shard.delay"
+    )
+    day = datetime(2025, 3, 31, 12, tzinfo=timezone.utc)
+    user_ids = set()
+    for i in range(3):
+        user = create_user(email=f"a{i}@example.com", username=f"a{i}", password="pass12345")
+        category = Category.objects.create(name="Food", user=user, type="DEBIT")
+        for amount in ("5", "7"):
+            Transaction.objects.create(
+                user=user, category=category, type="DEBIT", amount=Decimal(amount), date=day
+            )
+        user_ids.add(str(user.id))
+
+    detect_spending_anomalies("2025-03-31")
+
+    shards = [call.args for call in delay.call_args_list]
+    assert all(args[0] == "2025-03-31" for args in shards)
+    sent = [user_id for args in shards for user_id in args[1]]
+    assert sorted(sent) == sorted(user_ids)
@@ -127,3 +127,151 @@ def test_reset_password_confirm(password, expected_status_code, expected_respons
         assert user.check_password("Test@1234") == False
     
 
+
+
+@pytest.mark.django_db
+def test_token_authentication_is_cached(
+    authenticated_client, django_assert_num_queries, mocker, settings
+):
+    settings.TOKEN_CACHE_SHARED = True
+    api_client, user_id = authenticated_client
+    mocker.patch("transaction.tasks.track_and_notify_budget_period.apply_async")
+    api_client.get("/api/v1/transactions/")
+
+    # Warm cache: only the list query itself, no token or user lookups.
+    with django_assert_num_queries(1):
+        response = api_client.get("/api/v1/transactions/")
+    assert response.status_code == 200
+
+
+@pytest.mark.django_db
+def test_logout_evicts_cached_token(authenticated_client):
+    api_client, user_id = authenticated_client
+    assert api_client.get(f"/api/v1/users/{user_id}/").status_code == 200
+
+    assert api_client.post("/api/v1/auth/logout/").status_code == 200
+
+    assert api_client.get(f"/api/v1/users/{user_id}/").status_code == 401
+
+
+@pytest.mark.django_db
+def test_purge_expired_tokens(create_user):
+    from datetime import timedelta
+    from django.utils import timezone
+    from user.models import ActiveTokens
+    from user.tasks import purge_expired_tokens
+
+    user = create_user(email="purge@example.com", username="purge", password="Test@1234")
+    now = timezone.now()
+    for i in range(5):
+        ActiveTokens.objects.create(
+            user=user, digest=bytes([i]) * 32, expires_at=now - timedelta(minutes=1)
+        )
+    live = ActiveTokens.objects.create(
+        user=user, digest=b"\xff" * 32, expires_at=now + timedelta(minutes=5)
+    )
+
+    purge_expired_tokens(batch_size=2)
+
+    assert list(ActiveTokens.objects.values_list("id", flat=True)) == [live.id]
+
+
+@pytest.mark.django_db
+def test_login_enforces_session_limit(api_client, create_user, settings):
+    from user.models import ActiveTokens
+
+    settings.MAX_ACTIVE_SESSIONS_PER_USER = 2
+    user = create_user(email="cap@example.com", username="cap", password="Test@1234")
+    tokens = []
+    for _ in range(3):
+        response = api_client.post(
+            "/api/v1/auth/login/", {"username": "cap", "password": "Test@1234"}
+        )
+        assert response.status_code == 200
+        tokens.append(response.data["data"]["access_token"])
+
+    assert ActiveTokens.objects.filter(user=user).count() == 2
+    api_client.credentials(HTTP_AUTHORIZATION=f"Bearer {tokens[0]}")
+    assert api_client.get(f"/api/v1/users/{user.id}/").status_code == 401
+    api_client.credentials(HTTP_AUTHORIZATION=f"Bearer {tokens[-1]}")
+    assert api_client.get(f"/api/v1/users/{user.id}/").status_code == 200
+
+
+@pytest.mark.django_db
+def test_logout_in_another_process_revokes_cached_token(authenticated_client, settings):
+    from user.models import ActiveTokens
+    from utils.token_cache import TokenCache
+
+    settings.TOKEN_CACHE_SHARED = True
+    api_client, user_id = authenticated_client
+    assert api_client.get(f"/api/v1/users/{user_id}/").status_code == 200
+
+    # Another process logs the user out; this process still holds the token locally.
+    ActiveTokens.objects.filter(user_id=user_id).delete()
+    TokenCache().revoke_user(user_id)
+
+    assert api_client.get(f"/api/v1/users/{user_id}/").status_code == 401
+
+
+@pytest.mark.django_db
+def test_permission_change_revokes_cached_tokens(
+    authenticated_client, settings, django_capture_on_commit_callbacks
+):
+    from utils.token_cache import token_cache, token_digest
+
+    settings.TOKEN_CACHE_SHARED = True
+    api_client, user_id = authenticated_client
+    assert api_client.get(f"/api/v1/users/{user_id}/").status_code == 200
+    token = api_client._credentials["HTTP_AUTHORIZATION"].split(" ")[1]
+    assert token_cache.get(token_digest(token))["is_staff"] is False
+
+    user = CustomUser.objects.get(id=user_id)
+    user.is_staff = True
+    with django_capture_on_commit_callbacks(execute=True):
+        user.save()
+
+    assert token_cache.get(token_digest(token)) is None
+
+
+@pytest.mark.django_db
+def test_token_revoked_elsewhere_is_refused_without_shared_cache(authenticated_client):
+    from user.models import ActiveTokens
+
+    api_client, user_id = authenticated_client
+    assert api_client.get(f"/api/v1/users/{user_id}/").status_code == 200
+
+    # Another process logs the user out; no cache can vouch for the token.
+    ActiveTokens.objects.filter(user_id=user_id).delete()
+
+    assert api_client.get(f"/api/v1/users/{user_id}/").status_code == 401
+
+
+@pytest.mark.django_db
+def test_deactivation_by_queryset_update_revokes_cached_tokens(
+    authenticated_client, settings, django_capture_on_commit_callbacks
+):
+    settings.TOKEN_CACHE_SHARED = True
+    api_client, user_id = authenticated_client
+    assert api_client.get(f"/api/v1/users/{user_id}/").status_code == 200
+
+    with django_capture_on_commit_callbacks(execute=True):
+        CustomUser.objects.filter(id=user_id).update(is_active=False)
+
+    assert api_client.get(f"/api/v1/users/{user_id}/").status_code == 401
+
+
+@pytest.mark.django_db
+def test_cached_request_user_is_a_user_instance(authenticated_client, settings, mocker):
+    from user.authentication import CustomTokenAuthentication
+
+    settings.TOKEN_CACHE_SHARED = True
+    api_client, user_id = authenticated_client
+    api_client.get(f"/api/v1/users/{user_id}/")
+    authenticate = mocker.spy(CustomTokenAuthentication, "authenticate")
+
+    api_client.get(f"/api/v1/users/{user_id}/")
+
+    user, _ = authenticate.spy_return
+    assert type(user) is CustomUser
+    assert str(user) == "test@gmail.com"
+    assert user.username == "testuser"
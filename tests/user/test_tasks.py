@@ -0,0 +1,99 @@
+import pytest
+from datetime import timedelta
+from decimal import Decimal
+from django.core.cache import cache
+from django.utils import timezone
+from budget.models import Budget
+from category.models import Category
+from saving_plan.models import SavingsPlan
+from transaction.models import MonthlyCategoryTotal, Transaction
+from user.models import CascadeCheckpoint
+from user.tasks import soft_delete_related_data
+from utils import cascade
+
+
+@pytest.fixture
+def user_with_data(create_user):
+    """A user with a category, budget, savings plan and five debits"""
+    user = create_user(email="heavy@example.com", username="heavy", password="Test@1234")
+    category = Category.objects.create(user=user, type="DEBIT", name="Food")
+    Budget.objects.create(user=user, category=category, amount=100, year=2025, month=1)
+    deadline = timezone.localdate() + timedelta(days=30)
+    SavingsPlan.objects.create(
+        user=user,
+        name="Car",
+        target_amount=Decimal("1000.00"),
+        original_deadline=deadline,
+        current_deadline=deadline,
+        frequency="MONTHLY",
+    )
+    for day in range(1, 6):
+        Transaction.objects.create(
+            user=user,
+            category=category,
+            type="DEBIT",
+            amount=Decimal("10.00"),
+            date=timezone.now() - timedelta(days=day),
+        )
+    MonthlyCategoryTotal.objects.create(
+        user=user, category=category, year=2025, month=1, type="DEBIT", total=50
+    )
+    return user
+
+
+@pytest.mark.django_db
+def test_soft_delete_related_data_in_batches(user_with_data, settings):
+    settings.CASCADE_BATCH_SIZE = 2
+    changed = soft_delete_related_data(user_with_data.id)
+
+    assert changed["transactions"] == 5
+    for model in (Transaction, Budget, Category, SavingsPlan):
+        assert not model.objects.filter(user=user_with_data, is_deleted=False).exists()
+    assert not MonthlyCategoryTotal.objects.filter(user=user_with_data).exists()
+
+
+@pytest.mark.django_db
+def test_soft_delete_related_data_resumes_from_checkpoint(user_with_data, settings, mocker):
+    settings.CASCADE_BATCH_SIZE = 2
+    apply = cascade.CascadeStep.apply
+    calls = []
+
+    def fail_on_second_batch(step, pks):
+        calls.append(step.name)
+        if len(calls) == 2:
+            raise RuntimeError("worker lost")
+        return apply(step, pks)
+
+    mocker.patch.object(cascade.CascadeStep, "apply", fail_on_second_batch)
+    mocker.patch("user.tasks.soft_delete_related_data.retry", side_effect=RuntimeError)
+    with pytest.raises(RuntimeError):
+        soft_delete_related_data(user_with_data.id)
+    assert Transaction.objects.filter(user=user_with_data, is_deleted=False).count() == 3
+
+    # The retry may run on another worker, with an empty local cache.
+    cache.clear()
+    calls.clear()
+    mocker.patch.object(cascade.CascadeStep, "apply", apply)
+    changed = soft_delete_related_data(user_with_data.id)
+
+    # The retry picks up at the second transaction batch.
+    assert changed["transactions"] == 3
+    assert "recurring_transactions" not in changed
+    assert not Transaction.objects.filter(user=user_with_data, is_deleted=False).exists()
+    assert not CascadeCheckpoint.objects.exists()
+
+
+@pytest.mark.django_db
+def test_soft_delete_budget_with_deleted_twin(user_with_data):
+    budget = Budget.objects.get(user=user_with_data)
+    Budget.objects.create(
+        user=user_with_data,
+        category=budget.category,
+        amount=80,
+        year=budget.year,
+        month=budget.month,
+        is_deleted=True,
+    )
+
+    assert soft_delete_related_data(user_with_data.id)["budgets"] == 1
+    assert Budget.objects.all_with_deleted().filter(user=user_with_data).count() == 2
@@ -0,0 +1,121 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from category.models import Category
+from transaction.models import Transaction
+
+
+def explain(sql):
+    """Return the query plan of `sql` as text."""
+    with connection.cursor() as cursor:
+        if connection.vendor == "postgresql":
+            # Tiny test tables would otherwise be read with a sequential scan.
+            cursor.execute("SET LOCAL enable_seqscan = off")
+            cursor.execute(f"EXPLAIN {sql}")
+        else:
+            cursor.execute(f"EXPLAIN QUERY PLAN {sql}")
+        return "\n".join(" ".join(str(col) for col in row) for row in cursor.fetchall())
+
+
+@pytest.mark.django_db
+def test_default_manager_hides_deleted_rows(create_user):
+    user = create_user(email="soft@example.com", username="soft", password="Test@1234")
+    live = Category.objects.create(user=user, type="DEBIT", name="Live")
+    deleted = Category.objects.create(user=user, type="DEBIT", name="Gone", is_deleted=True)
+    transaction = Transaction.objects.create(
+        user=user, category=deleted, type="DEBIT", amount=10, date=timezone.now()
+    )
+
+    assert list(Category.objects.filter(user=user)) == [live]
+    assert set(Category.objects.all_with_deleted().filter(user=user)) == {live, deleted}
+    # Foreign keys still resolve to deleted rows.
+    assert Transaction.objects.get(id=transaction.id).category == deleted
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    "url, table, index",
+    [
+        ("/api/v1/transactions/", "transaction_transaction", "txn_user_created_live_idx"),
+        ("/api/v1/categories/", "category_category", "category_user_created_live_idx"),
+        ("/api/v1/budget/", "budget_budget", "budget_user_created_live_idx"),
+        ("/api/v1/savings-plans/", "saving_plan_savingsplan", "savingsplan_user_live_idx"),
+        (
+            "/api/v1/recurring-transactions/",
+            "recurring_transaction_recurringtransaction",
+            "recurring_user_live_idx",
+        ),
+    ],
+)
+def test_list_views_use_partial_indexes(authenticated_client, url, table, index):
+    api_client, user_id = authenticated_client
+    Category.objects.create(user_id=user_id, type="DEBIT", name="Food")
+
+    with CaptureQueriesContext(connection) as queries:
+        response = api_client.get(url)
+    assert response.status_code == 200
+
+    (list_query,) = [
+        query["sql"]
+        for query in queries.captured_queries
+        if f'FROM "{table}"' in query["sql"] and "LIMIT" in query["sql"]
+    ]
+    assert index in explain(list_query)
+
+
+@pytest.mark.django_db
+def test_staff_detail_views_find_deleted_rows(api_client, create_user):
+    staff = create_user(
+        email="staff@example.com", username="staff", password="Test@1234", is_staff=True
+    )
+    user = create_user(email="owner@example.com", username="owner", password="Test@1234")
+    category = Category.objects.create(user=user, type="DEBIT", name="Gone", is_deleted=True)
+
+    api_client.force_authenticate(staff)
+    assert api_client.get(f"/api/v1/categories/{category.id}/").status_code == 200
+
+    api_client.force_authenticate(user)
+    assert api_client.get(f"/api/v1/categories/{category.id}/").status_code == 404
+
+
+@pytest.mark.django_db
+def test_deleted_category_is_rejected_by_serializer_validation(authenticated_client):
+    api_client, user_id = authenticated_client
+    category = Category.objects.create(
+        user_id=user_id, type="DEBIT", name="Gone", is_deleted=True
+    )
+
+    response = api_client.post(
+        "/api/v1/transactions/",
+        {
+            "user": user_id,
+            "type": "DEBIT",
+            "amount": "10.00",
+            "category": str(category.id),
+            "date": timezone.now().isoformat(),
+        },
+        format="json",
+    )
+
+    assert response.status_code == 400
+    assert "Category not found." in str(response.data)
+
+
+@pytest.mark.django_db
+def test_staff_transaction_list_uses_index(api_client, create_user):
+    staff = create_user(
+        email="pager@example.com", username="pager", password="Test@1234", is_staff=True
+    )
+    api_client.force_authenticate(staff)
+
+    with CaptureQueriesContext(connection) as queries:
+        response = api_client.get("/api/v1/transactions/")
+    assert response.status_code == 200
+
+    (list_query,) = [
+        query["sql"]
+        for query in queries.captured_queries
+        if 'FROM "transaction_transaction"' in query["sql"] and "LIMIT" in query["sql"]
+    ]
+    assert "txn_created_idx" in explain(list_query)
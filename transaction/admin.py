@@ -1,7 +1,8 @@
 from django.contrib import admin
-from .models import Transaction, Category
+from .models import Transaction, TransactionImport, Category
 
 # Register your models here.
 
 admin.site.register(Transaction)
+admin.site.register(TransactionImport)
 admin.site.register(Category)
@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction as db_transaction
+from django.db.models import Sum
+from django.db.models.functions import ExtractMonth, ExtractYear
+from transaction.models import MonthlyCategoryTotal, Transaction
+
+
+class Command(BaseCommand):
+    help = "Rebuild the MonthlyCategoryTotal rollup from the transactions table."
+
+    batch_size = 1000
+
+    def handle(self, *args, **options):
+        totals = (
+            Transaction.objects.filter(is_deleted=False, category__isnull=False)
+            .annotate(year=ExtractYear("date"), month=ExtractMonth("date"))
+            .values("user_id", "category_id", "year", "month", "type")
+            .annotate(total=Sum("amount"))
+            .order_by()
+        )
+
+        created = 0
+        with db_transaction.atomic():
+            MonthlyCategoryTotal.objects.all().delete()
+            batch = []
+            for row in totals.iterator(chunk_size=self.batch_size):
+                batch.append(MonthlyCategoryTotal(**row))
+                if len(batch) >= self.batch_size:
+                    MonthlyCategoryTotal.objects.bulk_create(batch)
+                    created += len(batch)
+                    batch = []
+            MonthlyCategoryTotal.objects.bulk_create(batch)
+            created += len(batch)
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Rebuilt {created} monthly category totals.")
+        )
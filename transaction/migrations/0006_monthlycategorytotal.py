@@ -0,0 +1,50 @@
+# Generated by Django 5.1.3 on 2026-10-18 18:11
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Sum
+from django.db.models.functions import ExtractMonth, ExtractYear
+
+
+def populate_monthly_totals(apps, schema_editor):
+    Transaction = apps.get_model("transaction", "Transaction")
+    MonthlyCategoryTotal = apps.get_model("transaction", "MonthlyCategoryTotal")
+    totals = (
+        Transaction.objects.filter(is_deleted=False, category__isnull=False)
+        .annotate(year=ExtractYear("date"), month=ExtractMonth("date"))
+        .values("user_id", "category_id", "year", "month", "type")
+        .annotate(total=Sum("amount"))
+        .order_by()
+    )
+    MonthlyCategoryTotal.objects.bulk_create(
+        (MonthlyCategoryTotal(**row) for row in totals.iterator()), batch_size=1000
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('category', '0002_alter_category_type'),
+        ('transaction', '0005_transaction_fingerprint_transactionimport'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MonthlyCategoryTotal',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('year', models.PositiveIntegerField()),
+                ('month', models.PositiveIntegerField()),
+                ('type', models.CharField(choices=[('CREDIT', 'Credit'), ('DEBIT', 'Debit')], max_length=10)),
+                ('total', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('category', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='monthly_totals', to='category.category')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='monthly_totals', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('user', 'category', 'year', 'month', 'type'), name='unique_monthly_category_total')],
+            },
+        ),
+        migrations.RunPython(populate_monthly_totals, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.1.3 on 2026-10-18 19:04
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('category', '0003_soft_delete_partial_indexes'),
+        ('saving_plan', '0012_soft_delete_partial_indexes'),
+        ('transaction', '0006_monthlycategorytotal'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='transaction',
+            name='transaction_user_created_idx',
+        ),
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(condition=models.Q(('is_deleted', False)), fields=['user', '-created_at', '-id'], name='txn_user_created_live_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(condition=models.Q(('is_deleted', False)), fields=['user', 'date'], name='txn_user_date_live_idx'),
+        ),
+    ]
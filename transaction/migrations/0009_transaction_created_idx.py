@@ -0,0 +1,21 @@
+# Generated by Django 5.1.3 on 2026-10-18 19:48
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('category', '0003_soft_delete_partial_indexes'),
+        ('saving_plan', '0012_soft_delete_partial_indexes'),
+        ('transaction', '0008_import_fingerprint_unique_and_resume'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(fields=['-created_at', '-id'], name='txn_created_idx'),
+        ),
+    ]
@@ -4,7 +4,7 @@ from user.models import CustomUser
 from category.models import Category
 from utils.models import BaseModel
 from saving_plan.models import SavingsPlan
-from utils.constants import TransactionType
+from utils.constants import TransactionType, ImportStatus
 class Transaction(BaseModel):
     """Transaction Model (No Direct Budget Link)"""
 
@@ -22,3 +22,87 @@ class Transaction(BaseModel):
     date = models.DateTimeField()
     description = models.TextField(blank=True)
     type = models.CharField(max_length=10, choices=TransactionType.CHOICES)
+    # Content hash of imported statement rows, used to skip re-imported rows.
+    fingerprint = models.CharField(max_length=64, blank=True, null=True)
+
+    class Meta:
+        indexes = [
+            # Keyset pagination in TransactionListCreateView walks this order.
+            models.Index(
+                fields=["user", "-created_at", "-id"],
+                name="txn_user_created_live_idx",
+                condition=models.Q(is_deleted=False),
+            ),
+            # Staff listings page through every user's rows, deleted ones too.
+            models.Index(fields=["-created_at", "-id"], name="txn_created_idx"),
+            # Reports, trends and exports read a user's date range.
+            models.Index(
+                fields=["user", "date"],
+                name="txn_user_date_live_idx",
+                condition=models.Q(is_deleted=False),
+            ),
+        ]
+        constraints = [
+            # Deleted rows included, so an import never brings a deleted row back.
+            models.UniqueConstraint(
+                fields=["user", "fingerprint"], name="txn_user_fingerprint_uniq"
+            ),
+        ]
+
+
+class TransactionImport(BaseModel):
+    """A bank statement CSV upload, processed in the background by `import_transactions_csv`."""
+
+    user = models.ForeignKey(
+        CustomUser, on_delete=models.CASCADE, related_name="transaction_imports"
+    )
+    debit_category = models.ForeignKey(
+        Category, on_delete=models.CASCADE, related_name="+"
+    )
+    credit_category = models.ForeignKey(
+        Category, on_delete=models.CASCADE, related_name="+", blank=True, null=True
+    )
+    file = models.FileField(upload_to="transaction_imports/")
+    column_mapping = models.JSONField(default=dict, blank=True)
+    status = models.CharField(
+        max_length=10, choices=ImportStatus.CHOICES, default=ImportStatus.PENDING
+    )
+    imported_count = models.PositiveIntegerField(default=0)
+    duplicate_count = models.PositiveIntegerField(default=0)
+    error_count = models.PositiveIntegerField(default=0)
+    # Statement rows already committed; a retried import resumes after them.
+    processed_rows = models.PositiveIntegerField(default=0)
+    error = models.TextField(blank=True)
+
+    class Meta:
+        ordering = ["-created_at"]
+
+
+class MonthlyCategoryTotal(models.Model):
+    """
+    Running total of non-deleted transactions per (user, category, year, month, type).
+
+    Kept up to date by the transaction write paths through
+    `transaction.utils.apply_monthly_deltas`, so budget reads are a single
+    row lookup instead of a SUM over the month's transactions. Rebuild it
+    with `python manage.py rebuild_monthly_totals`.
+    """
+
+    user = models.ForeignKey(
+        CustomUser, on_delete=models.CASCADE, related_name="monthly_totals"
+    )
+    category = models.ForeignKey(
+        Category, on_delete=models.CASCADE, related_name="monthly_totals"
+    )
+    year = models.PositiveIntegerField()
+    month = models.PositiveIntegerField()
+    type = models.CharField(max_length=10, choices=TransactionType.CHOICES)
+    total = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "category", "year", "month", "type"],
+                name="unique_monthly_category_total",
+            )
+        ]
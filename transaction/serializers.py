@@ -96,12 +96,18 @@
 
 
 from rest_framework import serializers
-from .models import Transaction
+from .models import Transaction, TransactionImport
+from .utils import apply_monthly_deltas, collect_monthly_deltas
 from utils.is_uuid import is_uuid
+from utils.cache import invalidate_user_reports
 from user.models import CustomUser
+from collections import defaultdict
 from decimal import Decimal
-from django.db import models
-from saving_plan.tasks import send_savings_plan_completion_notification
+from django.db import transaction as db_transaction
+from saving_plan.utils import apply_savings_delta
+from saving_plan.models import SavingsPlan
+from category.models import Category
+from utils.constants import TransactionType
 from datetime import datetime
 
 
@@ -124,6 +130,11 @@ class TransactionSerializer(serializers.ModelSerializer):
             "is_deleted",
         ]
         read_only_fields = ["id", "created_at", "updated_at", "is_deleted"]
+        # Deleted rows are rejected by validate_category/validate_savings_plan.
+        extra_kwargs = {
+            "category": {"queryset": Category.objects.all_with_deleted()},
+            "savings_plan": {"queryset": SavingsPlan.objects.all_with_deleted()},
+        }
 
     def __init__(self, *args, **kwargs):
         """Ensure user and type fields are read-only for updates."""
@@ -260,49 +271,324 @@ class TransactionSerializer(serializers.ModelSerializer):
                     f"Transaction exceeds the remaining savings target by {Decimal(transaction_amount) - Decimal(remaining_amount)}.")
 
         return savings_plan
+    @db_transaction.atomic
     def create(self, validated_data):
         """Create a transaction and update savings plan status if target is met."""
         transaction = super().create(validated_data)
-        savings_plan = transaction.savings_plan
+        apply_monthly_deltas(collect_monthly_deltas([transaction]))
+        invalidate_user_reports(transaction.user_id)
 
-        if savings_plan:
-            # Calculate total saved amount
-            current_total = Transaction.objects.filter(
-                savings_plan=savings_plan,
-                is_deleted=False
-            ).aggregate(total=models.Sum('amount'))['total'] or Decimal("0")
-
-            # Update savings plan status based on total saved amount
-            if current_total >= savings_plan.target_amount and savings_plan.status != "COMPLETED":
-                savings_plan.status = "COMPLETED"
-                savings_plan.save(update_fields=["status"])
-                send_savings_plan_completion_notification.delay(savings_plan.id)
+        if transaction.savings_plan_id:
+            apply_savings_delta(transaction.savings_plan_id, transaction.amount)
 
         return transaction
 
 
 
+    @db_transaction.atomic
     def update(self, instance, validated_data):
         """Update a transaction and check savings plan status."""
         old_amount = instance.amount  # Store the old amount before update
+        old_savings_plan_id = instance.savings_plan_id
+        old_user_id = instance.user_id
+        deltas = collect_monthly_deltas([instance], sign=-1)
         transaction = super().update(instance, validated_data)
-        savings_plan = transaction.savings_plan
+        for key, delta in collect_monthly_deltas([transaction]).items():
+            deltas[key] += delta
+        apply_monthly_deltas(deltas)
+        invalidate_user_reports(old_user_id, transaction.user_id)
+
+        if old_savings_plan_id == transaction.savings_plan_id:
+            if transaction.savings_plan_id:
+                apply_savings_delta(
+                    transaction.savings_plan_id, transaction.amount - old_amount
+                )
+        else:
+            if old_savings_plan_id:
+                apply_savings_delta(old_savings_plan_id, -old_amount)
+            if transaction.savings_plan_id:
+                apply_savings_delta(transaction.savings_plan_id, transaction.amount)
 
-        if savings_plan:
-            # Calculate total saved amount after update
-            current_total = Transaction.objects.filter(
-                savings_plan=savings_plan,
-                is_deleted=False
-            ).aggregate(total=models.Sum('amount'))['total'] or Decimal("0")
+        return transaction
 
-            # Update savings plan status based on new total saved amount
-            if current_total >= savings_plan.target_amount and savings_plan.status != "COMPLETED":
-                savings_plan.status = "COMPLETED"
-                savings_plan.save(update_fields=["status"])
-                send_savings_plan_completion_notification.delay(savings_plan.id)
 
-            elif current_total < savings_plan.target_amount and savings_plan.status == "COMPLETED":
-                savings_plan.status = "ACTIVE"
-                savings_plan.save(update_fields=["status"])
+class TransactionBulkItemSerializer(serializers.Serializer):
+    """Field-level validation for one row of a bulk create, without DB lookups."""
 
-        return transaction
+    type = serializers.ChoiceField(choices=TransactionType.CHOICES)
+    amount = serializers.DecimalField(max_digits=10, decimal_places=2)
+    user = serializers.UUIDField()
+    category = serializers.UUIDField(required=False, allow_null=True)
+    savings_plan = serializers.UUIDField(required=False, allow_null=True)
+    date = serializers.DateTimeField()
+    description = serializers.CharField(required=False, allow_blank=True, default="")
+
+    def validate_amount(self, amount):
+        """Ensure amount is positive."""
+        if amount <= 0:
+            raise serializers.ValidationError("Amount must be a positive value.")
+        return amount
+
+    def validate(self, data):
+        if data.get("category") and data.get("savings_plan"):
+            raise serializers.ValidationError(
+                "A transaction can only be associated with either a category or a savings plan, not both."
+            )
+        if not data.get("category") and not data.get("savings_plan"):
+            raise serializers.ValidationError(
+                "A transaction must be associated with either a category or a savings plan."
+            )
+        return data
+
+
+class TransactionBulkCreateSerializer(serializers.Serializer):
+    """
+    Validate and create many transactions at once.
+
+    Users, categories and savings plans referenced by the batch are fetched
+    once into lookup maps, so validation costs a fixed number of queries
+    regardless of the batch size. Rows are written with a single bulk_create
+    and each savings plan's total is adjusted once.
+    """
+
+    MAX_BATCH_SIZE = 2000
+
+    transactions = serializers.ListField(
+        child=serializers.DictField(), allow_empty=False, max_length=MAX_BATCH_SIZE
+    )
+
+    def validate(self, data):
+        rows, errors = [], {}
+        for index, row in enumerate(data["transactions"]):
+            item = TransactionBulkItemSerializer(data=row)
+            if item.is_valid():
+                rows.append(item.validated_data)
+            else:
+                for field, messages in item.errors.items():
+                    errors[f"{index}.{field}"] = messages[0]
+        if errors:
+            raise serializers.ValidationError(errors)
+
+        request_user = self.context["request"].user
+        users = CustomUser.objects.in_bulk({row["user"] for row in rows})
+        categories = Category.objects.in_bulk(
+            {row["category"] for row in rows if row.get("category")}
+        )
+        plan_ids = {row["savings_plan"] for row in rows if row.get("savings_plan")}
+        savings_plans = SavingsPlan.objects.in_bulk(plan_ids)
+        saved_totals = {plan.id: plan.total_saved for plan in savings_plans.values()}
+
+        errors = {}
+        for index, row in enumerate(rows):
+            try:
+                row["user"] = self._validate_user(users.get(row["user"]), request_user)
+                if row.get("category"):
+                    row["category"] = self._validate_category(
+                        categories.get(row["category"]), row
+                    )
+                else:
+                    plan = self._validate_savings_plan(
+                        savings_plans.get(row["savings_plan"]), row, saved_totals
+                    )
+                    row["savings_plan"] = plan
+                    saved_totals[plan.id] = (
+                        saved_totals.get(plan.id) or Decimal("0")
+                    ) + row["amount"]
+            except serializers.ValidationError as e:
+                for field, message in e.detail.items():
+                    errors[f"{index}.{field}"] = message
+
+        if errors:
+            raise serializers.ValidationError(errors)
+        data["transactions"] = rows
+        return data
+
+    def _validate_user(self, user, request_user):
+        if not user or not user.is_active:
+            raise serializers.ValidationError({"user": "User not found."})
+        if not request_user.is_staff and user != request_user:
+            raise serializers.ValidationError(
+                {"user": "You can only create transactions for yourself."}
+            )
+        if request_user.is_staff and user.is_staff:
+            raise serializers.ValidationError(
+                {"user": "Staff can only create transactions for non-staff users."}
+            )
+        return user
+
+    def _validate_category(self, category, row):
+        if not category or category.is_deleted:
+            raise serializers.ValidationError({"category": "Category not found."})
+        if not category.is_predefined and category.user_id != row["user"].id:
+            raise serializers.ValidationError(
+                {"category": "Category does not belong to the provided user."}
+            )
+        if category.type != row["type"]:
+            raise serializers.ValidationError(
+                {"category": "Category type does not match transaction type."}
+            )
+        return category
+
+    def _validate_savings_plan(self, savings_plan, row, saved_totals):
+        if not savings_plan or savings_plan.is_deleted:
+            raise serializers.ValidationError({"savings_plan": "Savings plan not found."})
+        if savings_plan.user_id != row["user"].id:
+            raise serializers.ValidationError(
+                {"savings_plan": "Savings plan does not belong to the provided user."}
+            )
+        if savings_plan.status in ["COMPLETED", "PAUSED"]:
+            raise serializers.ValidationError(
+                {
+                    "savings_plan": f"Cannot add transactions to a {savings_plan.status.lower()} savings plan."
+                }
+            )
+        if row["date"].date() > savings_plan.current_deadline:
+            raise serializers.ValidationError(
+                {"date": "Transaction date cannot be after the savings plan's deadline."}
+            )
+        remaining = savings_plan.target_amount - (
+            saved_totals.get(savings_plan.id) or Decimal("0")
+        )
+        if row["amount"] > remaining:
+            raise serializers.ValidationError(
+                {
+                    "amount": f"Transaction exceeds the remaining savings target by {row['amount'] - remaining}."
+                }
+            )
+        return savings_plan
+
+    def create(self, validated_data):
+        """Insert all rows in one DB transaction and update the touched savings plans."""
+        rows = validated_data["transactions"]
+        plan_deltas = defaultdict(Decimal)
+        for row in rows:
+            if row.get("savings_plan"):
+                plan_deltas[row["savings_plan"].id] += row["amount"]
+
+        with db_transaction.atomic():
+            transactions = Transaction.objects.bulk_create(
+                [Transaction(**row) for row in rows], batch_size=500
+            )
+            apply_monthly_deltas(collect_monthly_deltas(transactions))
+            invalidate_user_reports(*(t.user_id for t in transactions))
+
+            for plan_id, delta in plan_deltas.items():
+                apply_savings_delta(plan_id, delta)
+
+        return transactions
+
+
+class TransactionImportSerializer(serializers.ModelSerializer):
+    """Serializer for uploading a bank statement CSV and reporting import progress."""
+
+    DEFAULT_COLUMN_MAPPING = {
+        "date_column": "date",
+        "amount_column": "amount",
+        "description_column": "description",
+        "type_column": "",
+        "date_format": "%Y-%m-%d",
+    }
+
+    date_column = serializers.CharField(write_only=True, required=False)
+    amount_column = serializers.CharField(write_only=True, required=False)
+    description_column = serializers.CharField(write_only=True, required=False)
+    type_column = serializers.CharField(
+        write_only=True, required=False, allow_blank=True
+    )
+    date_format = serializers.CharField(write_only=True, required=False)
+
+    class Meta:
+        model = TransactionImport
+        fields = [
+            "id",
+            "user",
+            "file",
+            "debit_category",
+            "credit_category",
+            "date_column",
+            "amount_column",
+            "description_column",
+            "type_column",
+            "date_format",
+            "column_mapping",
+            "status",
+            "imported_count",
+            "duplicate_count",
+            "error_count",
+            "error",
+            "created_at",
+            "updated_at",
+        ]
+        read_only_fields = [
+            "id",
+            "column_mapping",
+            "status",
+            "imported_count",
+            "duplicate_count",
+            "error_count",
+            "error",
+            "created_at",
+            "updated_at",
+        ]
+        extra_kwargs = {
+            "file": {"write_only": True},
+            "debit_category": {"queryset": Category.objects.all_with_deleted()},
+            "credit_category": {"queryset": Category.objects.all_with_deleted()},
+        }
+
+    def _get_import_user(self):
+        """Helper method to get the user the statement is imported for."""
+        user_id = self.initial_data.get("user")
+        if not is_uuid(str(user_id)):
+            return None
+        return CustomUser.objects.filter(id=user_id, is_active=True).first()
+
+    def validate_user(self, user):
+        """Ensure valid user selection based on user role."""
+        request_user = self.context["request"].user
+
+        if not user.is_active:
+            raise serializers.ValidationError("User not found.")
+        if not request_user.is_staff and user != request_user:
+            raise serializers.ValidationError(
+                "You can only import transactions for yourself."
+            )
+        if request_user.is_staff and user.is_staff:
+            raise serializers.ValidationError(
+                "Staff can only import transactions for non-staff users."
+            )
+        return user
+
+    def validate_file(self, file):
+        if not file.name.lower().endswith(".csv"):
+            raise serializers.ValidationError("Only CSV files can be imported.")
+        return file
+
+    def _validate_import_category(self, category, type):
+        user = self._get_import_user()
+        if category.is_deleted:
+            raise serializers.ValidationError("Category not found.")
+        if not category.is_predefined and category.user != user:
+            raise serializers.ValidationError(
+                "Category does not belong to the provided user."
+            )
+        if category.type != type:
+            raise serializers.ValidationError(
+                f"Category must be a {type.lower()} category."
+            )
+        return category
+
+    def validate_debit_category(self, category):
+        return self._validate_import_category(category, TransactionType.DEBIT)
+
+    def validate_credit_category(self, category):
+        if category is None:
+            return category
+        return self._validate_import_category(category, TransactionType.CREDIT)
+
+    def validate(self, data):
+        data["column_mapping"] = {
+            key: data.pop(key, default)
+            for key, default in self.DEFAULT_COLUMN_MAPPING.items()
+        }
+        return data
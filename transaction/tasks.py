@@ -1,19 +1,289 @@
+import csv
+import io
+from collections import Counter
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
 from celery import shared_task
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction as db_transaction
+from django.db.models import F
+from django.utils import timezone
 from budget.models import Budget
-from transaction.models import Transaction
-from budget.utils import monitor_budget_and_notify
+from transaction.models import Transaction, TransactionImport
+from budget.utils import evaluate_budget_alert
+from utils.constants import ImportStatus, TransactionType
+from utils.logging import logger
+from utils.cache import invalidate_user_reports
+from .utils import (
+    make_fingerprint,
+    normalize_description,
+    apply_monthly_deltas,
+    collect_monthly_deltas,
+    get_monthly_total,
+    get_period_key,
+)
 
 
-from django.core.exceptions import ObjectDoesNotExist
+BUDGET_CHECKS_SCHEDULED_KEY = "budget-check:metrics:scheduled"
+BUDGET_CHECKS_COLLAPSED_KEY = "budget-check:metrics:collapsed"
+
 
 @shared_task
-def track_and_notify_budget(transaction_id):
+def track_and_notify_budget_period(user_id, category_id, year, month):
+    """
+    Re-evaluate the budget of one (user, category, month) after a batch of writes.
+
+    The month's spending is read from the MonthlyCategoryTotal rollup, which
+    the writes already updated, and the alert goes through
+    `evaluate_budget_alert`, so an email is only sent on an upward crossing.
+    """
+    key = _budget_check_key(user_id, category_id, year, month)
+    # Release the slot first so writes that land during the evaluation schedule
+    # a fresh one instead of being folded into this run.
+    collapsed = cache.get(f"{key}:collapsed", 0)
+    cache.delete_many([key, f"{key}:collapsed"])
+    if collapsed:
+        logger.info("Budget check %s absorbed %s collapsed enqueues", key, collapsed)
+
+    budget = (
+        Budget.objects.select_related("user", "category")
+        .filter(
+            user_id=user_id,
+            category_id=category_id,
+            year=year,
+            month=month,
+            is_deleted=False,
+        )
+        .first()
+    )
+    if budget:
+        evaluate_budget_alert(
+            budget, get_monthly_total(user_id, category_id, year, month)
+        )
+
+
+def _budget_check_key(user_id, category_id, year, month):
+    return f"budget-check:{user_id}:{category_id}:{year}:{month}"
+
+
+def _incr_counter(key):
+    cache.add(key, 0, timeout=None)
     try:
-        transaction = Transaction.objects.select_related("user", "category").filter(id=transaction_id).first()
-        
-        if not transaction:
-            raise ObjectDoesNotExist(f"Transaction with ID {transaction_id} does not exist.")
+        cache.incr(key)
+    except ValueError:
+        # The key was evicted between add() and incr().
+        cache.set(key, 1, timeout=None)
+
+
+def schedule_budget_check(user_id, category_id, year, month):
+    """
+    Enqueue a budget re-evaluation, coalescing bursts for the same period.
+
+    The first call for a (user, category, year, month) claims a cache slot and
+    enqueues `track_and_notify_budget_period` with a countdown of
+    BUDGET_CHECK_COALESCE_SECONDS. Calls arriving while that evaluation is
+    pending are only counted. Returns True if a task was enqueued.
+
+    The slot is only meaningful when the web processes and the workers share
+    one cache; without BUDGET_CHECK_COALESCE every call enqueues directly.
+    """
+    if not settings.BUDGET_CHECK_COALESCE:
+        track_and_notify_budget_period.delay(user_id, category_id, year, month)
+        return True
+
+    countdown = settings.BUDGET_CHECK_COALESCE_SECONDS
+    key = _budget_check_key(user_id, category_id, year, month)
+    # The slot outlives the countdown so a late worker does not let a duplicate in,
+    # but still expires if the task is lost.
+    if cache.add(key, 1, timeout=countdown + 300):
+        _incr_counter(BUDGET_CHECKS_SCHEDULED_KEY)
+        track_and_notify_budget_period.apply_async(
+            (user_id, category_id, year, month), countdown=countdown
+        )
+        return True
+
+    _incr_counter(f"{key}:collapsed")
+    _incr_counter(BUDGET_CHECKS_COLLAPSED_KEY)
+    return False
+
+
+def get_budget_check_metrics():
+    """
+    Return how many budget checks were enqueued and how many were collapsed.
+
+    The counters live in the shared cache and are only kept while coalescing.
+    """
+    return {
+        "scheduled": cache.get(BUDGET_CHECKS_SCHEDULED_KEY, 0),
+        "collapsed": cache.get(BUDGET_CHECKS_COLLAPSED_KEY, 0),
+    }
+
+
+def enqueue_budget_checks(transactions):
+    """Schedule one budget re-evaluation per (user, category, month) touched by `transactions`."""
+    periods = {get_period_key(t)[:4] for t in transactions if t.category_id}
+    for user_id, category_id, year, month in periods:
+        schedule_budget_check(user_id, category_id, year, month)
+    return len(periods)
+
+
+IMPORT_CHUNK_SIZE = 500
+
+CREDIT_TYPE_VALUES = {"credit", "cr", "c", "deposit"}
+DEBIT_TYPE_VALUES = {"debit", "dr", "d", "withdrawal"}
+
+
+@shared_task(bind=True, max_retries=3, default_retry_delay=60)
+def import_transactions_csv(self, import_id):
+    """
+    Stream an uploaded bank statement into `Transaction` rows.
+
+    The file is read one row at a time and written in chunks of
+    IMPORT_CHUNK_SIZE, so memory use does not grow with the statement length.
+    Rows whose fingerprint already exists are counted as duplicates and skipped.
+
+    Each chunk commits together with the number of rows it consumed. If the
+    import fails, the file is kept and the task is retried: the retry
+    re-reads the rows that were already committed only to rebuild the
+    duplicate counters, then carries on from there. The file is deleted
+    once the import has completed.
+    """
+    job = TransactionImport.objects.select_related(
+        "user", "debit_category", "credit_category"
+    ).get(id=import_id)
+    TransactionImport.objects.filter(id=job.id).update(status=ImportStatus.PROCESSING)
+
+    periods = set()
+    occurrences = Counter()
+    failure = None
+    try:
+        with job.file.open("rb") as raw:
+            reader = csv.DictReader(io.TextIOWrapper(raw, encoding="utf-8-sig", newline=""))
+            chunk, errors = [], 0
+            for index, row in enumerate(reader):
+                if index < job.processed_rows:
+                    _replay_statement_row(job, row, occurrences)
+                    continue
+                try:
+                    chunk.append(_parse_statement_row(job, row, occurrences))
+                except (KeyError, ValueError, InvalidOperation) as e:
+                    logger.warning(
+                        "Skipping row %s of import %s: %s", reader.line_num, job.id, e
+                    )
+                    errors += 1
+                if len(chunk) + errors >= IMPORT_CHUNK_SIZE:
+                    periods |= _write_import_chunk(job, chunk, errors)
+                    chunk, errors = [], 0
+            periods |= _write_import_chunk(job, chunk, errors)
+
+        TransactionImport.objects.filter(id=job.id).update(
+            status=ImportStatus.COMPLETED
+        )
+    except Exception as e:
+        logger.error(f"Transaction import {job.id} failed: {str(e)}", exc_info=True)
+        TransactionImport.objects.filter(id=job.id).update(
+            status=ImportStatus.FAILED, error=str(e)
+        )
+        failure = e
+
+    for user_id, category_id, year, month in periods:
+        schedule_budget_check(user_id, category_id, year, month)
+
+    if failure is not None:
+        raise self.retry(exc=failure)
+    job.file.delete(save=False)
+
+
+def _replay_statement_row(job, row, occurrences):
+    """Count an already imported row towards `occurrences`, as its first run did."""
+    try:
+        _parse_statement_row(job, row, occurrences)
+    except (KeyError, ValueError, InvalidOperation):
+        pass
+
+
+def _parse_statement_row(job, row, occurrences):
+    """Map one CSV row to an unsaved Transaction using the job's column mapping."""
+    mapping = job.column_mapping
+    amount = Decimal(row[mapping["amount_column"]].strip().replace(",", ""))
+    date = datetime.strptime(row[mapping["date_column"]].strip(), mapping["date_format"])
+    description = (row.get(mapping["description_column"]) or "").strip()
+
+    if mapping.get("type_column"):
+        raw_type = row[mapping["type_column"]].strip().lower()
+        if raw_type in CREDIT_TYPE_VALUES:
+            type = TransactionType.CREDIT
+        elif raw_type in DEBIT_TYPE_VALUES:
+            type = TransactionType.DEBIT
+        else:
+            raise ValueError(f"Unknown transaction type '{raw_type}'")
+    else:
+        type = TransactionType.DEBIT if amount < 0 else TransactionType.CREDIT
+    amount = abs(amount)
+    if amount == 0:
+        raise ValueError("Amount must be a positive value.")
+
+    if type == TransactionType.DEBIT:
+        category = job.debit_category
+    elif job.credit_category:
+        category = job.credit_category
+    else:
+        raise ValueError("No credit category given for credit rows")
+
+    # Sign the amount so that a purchase and its refund get different hashes.
+    signed_amount = -amount if type == TransactionType.DEBIT else amount
+    key = (date.date(), signed_amount, normalize_description(description))
+    fingerprint = make_fingerprint(
+        job.user_id, date.date(), signed_amount, description, occurrences[key]
+    )
+    occurrences[key] += 1
+
+    return Transaction(
+        user_id=job.user_id,
+        category=category,
+        type=type,
+        amount=amount,
+        date=timezone.make_aware(date) if timezone.is_naive(date) else date,
+        description=description,
+        fingerprint=fingerprint,
+    )
+
+
+def _write_import_chunk(job, chunk, errors):
+    """Insert the rows of a chunk that were not imported before; return the touched budget periods."""
+    fingerprints = [t.fingerprint for t in chunk]
+    # Deleted rows count too, so deleting an imported row does not bring it back.
+    existing = set(
+        Transaction.objects.all_with_deleted()
+        .filter(user_id=job.user_id, fingerprint__in=fingerprints)
+        .values_list("fingerprint", flat=True)
+    )
+    candidates = [t for t in chunk if t.fingerprint not in existing]
 
+    with db_transaction.atomic():
+        # A concurrent import of the same statement may insert the same rows
+        # first; the unique (user, fingerprint) constraint turns those into
+        # skipped conflicts. Ids are set client side, so reading them back
+        # tells which rows this chunk actually inserted.
+        Transaction.objects.bulk_create(candidates, ignore_conflicts=True)
+        inserted = set(
+            Transaction.objects.all_with_deleted()
+            .filter(id__in=[t.id for t in candidates])
+            .values_list("id", flat=True)
+        )
+        new_transactions = [t for t in candidates if t.id in inserted]
+        apply_monthly_deltas(collect_monthly_deltas(new_transactions))
+        invalidate_user_reports(job.user_id)
+        TransactionImport.objects.filter(id=job.id).update(
+            imported_count=F("imported_count") + len(new_transactions),
+            duplicate_count=F("duplicate_count") + len(chunk) - len(new_transactions),
+            error_count=F("error_count") + errors,
+            processed_rows=F("processed_rows") + len(chunk) + errors,
+        )
 
-    except ObjectDoesNotExist as e:
-        print(f"Error: {e}")
+    return {
+        get_period_key(t)[:4]
+        for t in new_transactions
+        if t.type == TransactionType.DEBIT
+    }
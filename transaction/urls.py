@@ -1,9 +1,22 @@
 # urls.py
 
 from django.urls import path
-from .views import TransactionListCreateView, TransactionDetailView
+from .views import (
+    TransactionListCreateView,
+    TransactionBulkCreateView,
+    TransactionImportCreateView,
+    TransactionImportDetailView,
+    TransactionDetailView,
+)
 
 urlpatterns = [
     path("", TransactionListCreateView.as_view(), name="transaction-list-create"),
+    path("bulk/", TransactionBulkCreateView.as_view(), name="transaction-bulk-create"),
+    path("import/", TransactionImportCreateView.as_view(), name="transaction-import"),
+    path(
+        "import/<uuid:id>/",
+        TransactionImportDetailView.as_view(),
+        name="transaction-import-detail",
+    ),
     path("<uuid:id>/", TransactionDetailView.as_view(), name="transaction-detail"),
 ]
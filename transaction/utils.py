@@ -0,0 +1,93 @@
+import hashlib
+import re
+from collections import defaultdict
+from decimal import Decimal
+from django.db import IntegrityError, transaction as db_transaction
+from django.db.models import F
+from django.utils import timezone
+from utils.constants import TransactionType
+from .models import MonthlyCategoryTotal
+
+
+def normalize_description(description):
+    """Lower-case a statement description and collapse runs of whitespace."""
+    return re.sub(r"\s+", " ", (description or "").strip().lower())
+
+
+def make_fingerprint(user_id, date, amount, description, occurrence=0):
+    """
+    Hash the content of a statement row.
+
+    `amount` is signed (debits negative), so a purchase and the refund of
+    the same amount on the same day do not collide.
+
+    `occurrence` tells apart identical rows inside one statement (two equal
+    coffees on the same day), so that they are both imported the first time
+    and both skipped when an overlapping statement is imported again.
+    """
+    key = "|".join(
+        [
+            str(user_id),
+            date.isoformat(),
+            f"{amount:.2f}",
+            normalize_description(description),
+            str(occurrence),
+        ]
+    )
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+
+def get_period_key(transaction):
+    """Return the (user, category, year, month, type) rollup key of a transaction."""
+    date = timezone.localtime(transaction.date)
+    return (
+        transaction.user_id,
+        transaction.category_id,
+        date.year,
+        date.month,
+        transaction.type,
+    )
+
+
+def collect_monthly_deltas(transactions, sign=1):
+    """Sum transaction amounts per rollup key; savings plan transactions are ignored."""
+    deltas = defaultdict(Decimal)
+    for transaction in transactions:
+        if transaction.category_id:
+            deltas[get_period_key(transaction)] += sign * transaction.amount
+    return deltas
+
+
+def apply_monthly_deltas(deltas):
+    """
+    Add `deltas` ({rollup key: amount}) to MonthlyCategoryTotal.
+
+    Must be called inside the DB transaction that wrote the transactions, so the
+    rollup and the rows it summarises commit together.
+    """
+    for (user_id, category_id, year, month, type), delta in deltas.items():
+        if not delta:
+            continue
+        lookup = dict(
+            user_id=user_id, category_id=category_id, year=year, month=month, type=type
+        )
+        if MonthlyCategoryTotal.objects.filter(**lookup).update(total=F("total") + delta):
+            continue
+        try:
+            with db_transaction.atomic():
+                MonthlyCategoryTotal.objects.create(total=delta, **lookup)
+        except IntegrityError:
+            # A concurrent writer created the row first.
+            MonthlyCategoryTotal.objects.filter(**lookup).update(total=F("total") + delta)
+
+
+def get_monthly_total(user_id, category_id, year, month, type=TransactionType.DEBIT):
+    """Return the rolled-up total for one (user, category, month, type)."""
+    total = (
+        MonthlyCategoryTotal.objects.filter(
+            user_id=user_id, category_id=category_id, year=year, month=month, type=type
+        )
+        .values_list("total", flat=True)
+        .first()
+    )
+    return total or Decimal("0.00")
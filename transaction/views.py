@@ -1,10 +1,17 @@
+import copy
+from functools import partial
 from rest_framework.views import APIView
 from rest_framework import status
 from rest_framework.permissions import IsAuthenticated
-from django.db import models
+from rest_framework.parsers import MultiPartParser, FormParser
+from django.db import transaction as db_transaction
 from django.shortcuts import get_object_or_404
-from .models import Transaction
-from .serializers import TransactionSerializer
+from .models import Transaction, TransactionImport
+from .serializers import (
+    TransactionSerializer,
+    TransactionBulkCreateSerializer,
+    TransactionImportSerializer,
+)
 from utils.responses import (
     validation_error_response,
     success_single_response,
@@ -12,13 +19,19 @@ from utils.responses import (
     not_found_error_response,
     success_response,
 )
-from utils.pagination import CustomPageNumberPagination
+from utils.pagination import CursorOrPageNumberPagination
 from utils.permissions import IsStaffOrOwner
-from .tasks import track_and_notify_budget
+from .utils import apply_monthly_deltas, collect_monthly_deltas
+from saving_plan.utils import apply_savings_delta
+from .tasks import (
+    enqueue_budget_checks,
+    import_transactions_csv,
+)
 from utils.logging import logger
+from utils.cache import invalidate_user_reports
 
 
-class TransactionListCreateView(APIView, CustomPageNumberPagination):
+class TransactionListCreateView(APIView, CursorOrPageNumberPagination):
     """API view for listing and creating transactions."""
 
     permission_classes = [IsAuthenticated]
@@ -27,7 +40,7 @@ class TransactionListCreateView(APIView, CustomPageNumberPagination):
         """Retrieve all transactions based on user role and query parameters."""
         logger.info("Fetching transactions for user: %s", request.user)
         queryset = (
-            Transaction.objects.all().order_by("-created_at")
+            Transaction.objects.all_with_deleted().order_by("-created_at")
             if request.user.is_staff
             else Transaction.objects.filter(
                 user=request.user, is_deleted=False
@@ -42,14 +55,7 @@ class TransactionListCreateView(APIView, CustomPageNumberPagination):
         serializer = TransactionSerializer(paginated_data, many=True)
 
         logger.info("Transactions retrieved successfully for user: %s", request.user)
-        return success_response(
-            {
-                "count": queryset.count(),
-                "next": self.get_next_link(),
-                "previous": self.get_previous_link(),
-                "results": serializer.data,
-            }
-        )
+        return success_response(self.get_paginated_payload(serializer.data))
 
     def post(self, request):
         """Create a new transaction."""
@@ -60,7 +66,7 @@ class TransactionListCreateView(APIView, CustomPageNumberPagination):
         )
         if serializer.is_valid():
             transaction = serializer.save()
-            track_and_notify_budget.delay(transaction.id)
+            enqueue_budget_checks([transaction])
 
             logger.info("Transaction created successfully with ID: %s", transaction.id)
             return success_single_response(
@@ -74,6 +80,83 @@ class TransactionListCreateView(APIView, CustomPageNumberPagination):
         return validation_error_response(serializer.errors)
 
 
+class TransactionBulkCreateView(APIView):
+    """API view for creating a batch of transactions in one request."""
+
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        """Create up to `MAX_BATCH_SIZE` transactions with a single insert."""
+        logger.info("Bulk creating transactions for user: %s", request.user)
+        serializer = TransactionBulkCreateSerializer(
+            data=request.data, context={"request": request}
+        )
+        if serializer.is_valid():
+            transactions = serializer.save()
+            enqueue_budget_checks(transactions)
+
+            logger.info(
+                "Bulk created %s transactions for user: %s",
+                len(transactions),
+                request.user,
+            )
+            return success_single_response(
+                {
+                    "count": len(transactions),
+                    "results": TransactionSerializer(transactions, many=True).data,
+                },
+                status_code=status.HTTP_201_CREATED,
+            )
+        logger.error(
+            "Bulk transaction creation failed for user: %s. Errors: %s",
+            request.user,
+            serializer.errors,
+        )
+        return validation_error_response(serializer.errors)
+
+
+class TransactionImportCreateView(APIView):
+    """API view for uploading a bank statement CSV to import in the background."""
+
+    permission_classes = [IsAuthenticated]
+    parser_classes = [MultiPartParser, FormParser]
+
+    def post(self, request):
+        """Store the uploaded statement and queue it for import."""
+        logger.info("Uploading a statement import for user: %s", request.user)
+        serializer = TransactionImportSerializer(
+            data=request.data, context={"request": request}
+        )
+        if serializer.is_valid():
+            job = serializer.save()
+            import_transactions_csv.delay(job.id)
+            logger.info("Statement import queued with ID: %s", job.id)
+            return success_single_response(
+                serializer.data, status_code=status.HTTP_202_ACCEPTED
+            )
+        logger.error(
+            "Statement import failed for user: %s. Errors: %s",
+            request.user,
+            serializer.errors,
+        )
+        return validation_error_response(serializer.errors)
+
+
+class TransactionImportDetailView(APIView):
+    """API view for checking the progress of a statement import."""
+
+    permission_classes = [IsStaffOrOwner, IsAuthenticated]
+
+    def get(self, request, id):
+        """Retrieve the status and row counts of an import."""
+        try:
+            job = get_object_or_404(TransactionImport, id=id)
+            self.check_object_permissions(request, job)
+        except Exception:
+            return not_found_error_response(f"No import found with ID: {id}")
+        return success_single_response(TransactionImportSerializer(job).data)
+
+
 class TransactionDetailView(APIView):
     """API view for retrieving, updating, and deleting a specific transaction."""
 
@@ -82,7 +165,7 @@ class TransactionDetailView(APIView):
     def get_object(self, id, request):
         """Helper method to get the transaction object by primary key with permission check."""
         logger.info("Fetching transaction with ID: %s", id)
-        transaction = get_object_or_404(Transaction, id=id)
+        transaction = get_object_or_404(Transaction.objects.visible_to(request.user), id=id)
         self.check_object_permissions(request, transaction)
         return transaction
 
@@ -110,8 +193,10 @@ class TransactionDetailView(APIView):
             context={"request": request},
         )
         if serializer.is_valid():
+            # The period the transaction leaves needs a re-check as well.
+            previous = copy.copy(transaction)
             updated_transaction = serializer.save()
-            track_and_notify_budget.delay(updated_transaction.id)
+            enqueue_budget_checks([previous, updated_transaction])
             logger.info("Transaction updated successfully with ID: %s", id)
             return success_single_response(serializer.data)
         logger.error(
@@ -127,17 +212,15 @@ class TransactionDetailView(APIView):
             transaction = self.get_object(id, request)
         except Exception:
             return not_found_error_response(f"No transaction found with ID: {id}")
-        savings_plan = transaction.savings_plan
-        transaction.is_deleted = True
-        transaction.save()
-        if savings_plan and savings_plan.status == "COMPLETED":
-            current_total = Transaction.objects.filter(
-                savings_plan=savings_plan, is_deleted=False
-            ).aggregate(total=models.Sum("amount"))["total"] or 0
-
-            if current_total < savings_plan.target_amount:
-                savings_plan.status = "ACTIVE"
-                savings_plan.save()
+        with db_transaction.atomic():
+            transaction.is_deleted = True
+            transaction.save()
+            apply_monthly_deltas(collect_monthly_deltas([transaction], sign=-1))
+            invalidate_user_reports(transaction.user_id)
+            if transaction.savings_plan_id:
+                apply_savings_delta(transaction.savings_plan_id, -transaction.amount)
+            # Spending may fall back under a threshold, which re-arms its alert.
+            db_transaction.on_commit(partial(enqueue_budget_checks, [transaction]))
 
         logger.info("Transaction deleted successfully with ID: %s", id)
         return success_no_content_response()
@@ -1 +1,4 @@
 from django.contrib import admin
+from .models import SpendingAnomaly
+
+admin.site.register(SpendingAnomaly)
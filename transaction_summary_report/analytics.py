@@ -0,0 +1,349 @@
+"""
+Columnar, NumPy-backed analytics over a user's transactions.
+
+A `TransactionFrame` loads a date range with one `values_list` query into
+parallel arrays (amount in integer cents, epoch day, category code, credit
+flag). Report metrics are then computed with vectorized group-bys on those
+arrays instead of one aggregate query per metric.
+"""
+
+from decimal import Decimal
+
+import numpy as np
+from django.db.models.functions import TruncDate
+
+from utils.constants import TransactionType
+
+EPOCH = np.datetime64("1970-01-01", "D")
+
+# Five years of monthly totals feed the forecast.
+FORECAST_HISTORY_MONTHS = 60
+
+
+def cents_to_decimal(cents):
+    return Decimal(int(cents)).scaleb(-2)
+
+
+def cents_to_float(cents):
+    return float(cents_to_decimal(cents))
+
+
+class TransactionFrame:
+    """Transactions of one date range held as parallel NumPy columns."""
+
+    def __init__(self, amount, day, category, is_credit, categories):
+        # Integer cents keep sums exact.
+        self.amount = amount
+        # Days since 1970-01-01 in the current time zone.
+        self.day = day
+        # Index into `categories`; savings-plan rows map to a None category.
+        self.category = category
+        self.is_credit = is_credit
+        self.categories = categories
+
+    @classmethod
+    def from_queryset(cls, transactions):
+        rows = list(
+            transactions.order_by().values_list(
+                "amount", TruncDate("date"), "category__name", "type"
+            )
+        )
+        if not rows:
+            empty = np.zeros(0, dtype=np.int64)
+            return cls(empty, empty, empty, np.zeros(0, dtype=bool), [])
+
+        amounts, days, names, types = zip(*rows)
+        amount = (np.array(amounts, dtype=object) * 100).astype(np.int64)
+        day = (np.array(days, dtype="datetime64[D]") - EPOCH).astype(np.int64)
+        # np.unique needs comparable values, so None sorts as "".
+        categories, category = np.unique(
+            np.array([name or "" for name in names], dtype=object), return_inverse=True
+        )
+        is_credit = np.array(types, dtype=object) == TransactionType.CREDIT
+        return cls(
+            amount,
+            day,
+            category.astype(np.int64),
+            is_credit,
+            [name or None for name in categories],
+        )
+
+    def __len__(self):
+        return len(self.amount)
+
+    @property
+    def is_debit(self):
+        return ~self.is_credit
+
+    def total(self, mask):
+        return int(self.amount[mask].sum())
+
+    def totals_by_category(self, mask):
+        """Sum of amounts per category code for the rows selected by `mask`."""
+        return np.bincount(
+            self.category[mask],
+            weights=self.amount[mask],
+            minlength=len(self.categories),
+        ).astype(np.int64)
+
+    def category_breakdown(self, mask):
+        """[(category name, total cents)] for categories with rows in `mask`, largest first."""
+        totals = self.totals_by_category(mask)
+        present = np.bincount(self.category[mask], minlength=len(self.categories)) > 0
+        order = np.argsort(-totals, kind="stable")
+        return [(self.categories[i], int(totals[i])) for i in order if present[i]]
+
+    def bucket_index(self, start_date, granularity):
+        """Bucket number of every row, counted from the bucket holding `start_date`."""
+        days = self.day.astype("datetime64[D]")
+        start = np.datetime64(start_date, "D")
+        if granularity == "day":
+            return (days - start).astype(np.int64)
+        if granularity == "week":
+            # 1970-01-01 was a Thursday; shift so weeks start on Monday.
+            week = (self.day + 3) // 7
+            start_week = ((start - EPOCH).astype(np.int64) + 3) // 7
+            return week - start_week
+        unit = "M" if granularity == "month" else "Y"
+        return (
+            days.astype(f"datetime64[{unit}]") - start.astype(f"datetime64[{unit}]")
+        ).astype(np.int64)
+
+    def bucketed_totals(self, start_date, granularity, bucket_count):
+        """
+        Dense (type, category, bucket) totals in cents.
+
+        Returns an array of shape (2, len(categories), bucket_count) where the
+        first axis is 0 for debits and 1 for credits.
+        """
+        buckets = self.bucket_index(start_date, granularity)
+        shape = (2, len(self.categories), bucket_count)
+        keys = np.ravel_multi_index(
+            (self.is_credit.astype(np.int64), self.category, buckets), shape
+        )
+        return (
+            np.bincount(keys, weights=self.amount, minlength=int(np.prod(shape)))
+            .astype(np.int64)
+            .reshape(shape)
+        )
+
+    def daily_totals(self, mask, start_date, end_date):
+        """Per-day totals (in cents) of the rows selected by `mask`, gaps included."""
+        start = (np.datetime64(start_date, "D") - EPOCH).astype(np.int64)
+        length = (end_date - start_date).days + 1
+        return np.bincount(
+            self.day[mask] - start, weights=self.amount[mask], minlength=length
+        ).astype(np.int64)
+
+    @staticmethod
+    def rolling_sum(values, window):
+        """Trailing `window`-length sums of `values`."""
+        cumulative = np.cumsum(values)
+        rolling = cumulative.copy()
+        rolling[window:] -= cumulative[:-window]
+        return rolling
+
+    def percentiles(self, mask, q):
+        """Percentiles (in cents) of the amounts selected by `mask`."""
+        if not mask.any():
+            return [0 for _ in q]
+        return np.percentile(self.amount[mask], q).tolist()
+
+
+def build_report_totals(frame):
+    """Totals and category breakdown for `TransactionReportAPI`."""
+    return {
+        "total_income": cents_to_decimal(frame.total(frame.is_credit)),
+        "total_expense": cents_to_decimal(frame.total(frame.is_debit)),
+        "category_expense": [
+            {"category_name": name, "total": cents_to_decimal(total)}
+            for name, total in frame.category_breakdown(frame.is_debit)
+        ],
+    }
+
+
+def build_trends(frame, start_date, end_date, granularity=None, buckets=None):
+    """Spending trends report from a frame, matching the SQL engine's output."""
+    total_income = frame.total(frame.is_credit)
+    total_expense = frame.total(frame.is_debit)
+
+    def get_category_data(mask, total):
+        if total <= 0:
+            return []
+        return [
+            {
+                "category_name": name,
+                "amount": cents_to_float(amount),
+                "percentage": round(amount / total * 100, 2),
+            }
+            for name, amount in frame.category_breakdown(mask)
+        ]
+
+    daily_income = frame.daily_totals(frame.is_credit, start_date, end_date)
+    daily_expense = frame.daily_totals(frame.is_debit, start_date, end_date)
+    report = {
+        "start_date": str(start_date),
+        "end_date": str(end_date),
+        "total_income": cents_to_float(total_income),
+        "total_expense": cents_to_float(total_expense),
+        "income": get_category_data(frame.is_credit, total_income),
+        "expense": get_category_data(frame.is_debit, total_expense),
+        "statistics": {
+            "expense_percentiles": dict(
+                zip(
+                    ("p50", "p90", "p99"),
+                    (v / 100 for v in frame.percentiles(frame.is_debit, [50, 90, 99])),
+                )
+            ),
+            "max_7_day_expense": cents_to_float(
+                frame.rolling_sum(daily_expense, 7).max(initial=0)
+            ),
+            "net_balance": cents_to_float((daily_income - daily_expense).sum()),
+        },
+    }
+    if granularity:
+        totals = frame.bucketed_totals(start_date, granularity, len(buckets))
+        debit, credit = totals
+        report["granularity"] = granularity
+        report["buckets"] = [str(bucket) for bucket in buckets]
+        report["income_totals"] = [cents_to_float(v) for v in credit.sum(axis=0)]
+        report["expense_totals"] = [cents_to_float(v) for v in debit.sum(axis=0)]
+        report["cumulative_balance"] = [
+            cents_to_float(v) for v in np.cumsum(credit.sum(axis=0) - debit.sum(axis=0))
+        ]
+        series = []
+        for type, by_category in (
+            (TransactionType.CREDIT, credit),
+            (TransactionType.DEBIT, debit),
+        ):
+            present = np.bincount(
+                frame.category[frame.is_credit == (type == TransactionType.CREDIT)],
+                minlength=len(frame.categories),
+            )
+            for code in sorted(
+                np.flatnonzero(present), key=lambda c: frame.categories[c] or ""
+            ):
+                series.append(
+                    {
+                        "type": type,
+                        "category_name": frame.categories[code],
+                        "amounts": [cents_to_float(v) for v in by_category[code]],
+                    }
+                )
+        report["series"] = series
+    return report
+
+
+def month_index(year, month):
+    """Months since year 0, so consecutive months differ by one."""
+    return year * 12 + month - 1
+
+
+def build_history_matrix(rows, start, length):
+    """
+    Arrange (category_id, category_name, year, month, total) rows as a matrix.
+
+    Returns the category ids (one per matrix row), their names, and a
+    (categories, length) array of totals in cents whose first column is month
+    index `start`. Rows outside the window are ignored.
+    """
+    rows = [row for row in rows if 0 <= month_index(row[2], row[3]) - start < length]
+    category_ids = sorted({row[0] for row in rows})
+    names = {row[0]: row[1] for row in rows}
+    codes = {category_id: i for i, category_id in enumerate(category_ids)}
+
+    history = np.zeros((len(category_ids), length), dtype=np.int64)
+    if rows:
+        history[
+            [codes[row[0]] for row in rows],
+            [month_index(row[2], row[3]) - start for row in rows],
+        ] = [int(row[4] * 100) for row in rows]
+    return category_ids, names, history
+
+
+def forecast_monthly_spending(history, horizon, alpha=0.3, z=1.96):
+    """
+    Project the next `horizon` months from a (categories, months) history.
+
+    `history` holds monthly totals in cents, oldest month first, ending with
+    the month right before the first forecast month. Every category is handled
+    in the same array operations:
+
+    * level: exponentially weighted mean of the months since the category's
+      first spending, so a recently added category is not averaged with zeros;
+    * seasonality: the same month last year relative to the trailing 12-month
+      mean, applied once a category has a year of history;
+    * band: `z` weighted standard deviations around the seasonal forecast.
+
+    Returns (forecast, lower, upper), each of shape (categories, horizon).
+    """
+    categories, months = history.shape
+    if not categories or not months:
+        empty = np.zeros((categories, horizon))
+        return empty, empty, empty
+
+    history = history.astype(float)
+    active = np.maximum.accumulate(history != 0, axis=1)
+    ages = np.arange(months - 1, -1, -1)
+    weights = (1 - alpha) ** ages * active
+    weight_sums = np.maximum(weights.sum(axis=1), 1e-12)
+    level = (history * weights).sum(axis=1) / weight_sums
+    spread = np.sqrt(
+        (weights * (history - level[:, None]) ** 2).sum(axis=1) / weight_sums
+    )
+
+    factors = np.ones((categories, horizon))
+    if months >= 12:
+        trailing = history[:, -12:].mean(axis=1)
+        seasonal = active[:, -12] & (trailing > 0)
+        # Month h of the forecast lines up with column (months - 12 + h % 12).
+        same_month = history[:, months - 12 + np.arange(horizon) % 12]
+        ratios = np.clip(
+            same_month / np.where(trailing > 0, trailing, 1)[:, None], 0.5, 2.0
+        )
+        factors = np.where(seasonal[:, None], ratios, 1.0)
+
+    forecast = level[:, None] * factors
+    band = z * spread[:, None] * factors
+    return forecast, np.maximum(forecast - band, 0), forecast + band
+
+
+def group_median_mad(codes, values, groups):
+    """
+    Median, MAD and size of `values` per group code, without a Python loop.
+
+    Each group's values are sorted into a contiguous run, so the median is read
+    at the middle offsets of that run; the MAD repeats this on the absolute
+    deviations. Empty groups get zeros.
+    """
+    counts = np.bincount(codes, minlength=groups)
+    if not len(values):
+        zeros = np.zeros(groups)
+        return zeros, zeros, counts
+
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    last = np.maximum(counts - 1, 0)
+    lo = starts + last // 2
+    hi = starts + (last + 1) // 2
+    has_rows = counts > 0
+
+    def run_median(sorted_values):
+        medians = np.zeros(groups)
+        medians[has_rows] = (
+            sorted_values[lo[has_rows]] + sorted_values[hi[has_rows]]
+        ) / 2
+        return medians
+
+    order = np.lexsort((values, codes))
+    median = run_median(values[order])
+    deviations = np.abs(values - median[codes])
+    order = np.lexsort((deviations, codes))
+    mad = run_median(deviations[order])
+    return median, mad, counts
+
+
+def robust_z_scores(values, median, mad):
+    """Modified z-score (Iglewicz & Hoaglin); zero where the MAD is zero."""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        scores = 0.6745 * (values - median) / mad
+    return np.where(mad > 0, scores, 0.0)
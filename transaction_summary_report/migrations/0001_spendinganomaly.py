@@ -0,0 +1,40 @@
+# Generated by Django 5.1.3 on 2026-10-18 18:32
+
+import django.db.models.deletion
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('category', '0002_alter_category_type'),
+        ('transaction', '0006_monthlycategorytotal'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SpendingAnomaly',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('is_deleted', models.BooleanField(default=False)),
+                ('amount', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('median', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('mad', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('score', models.FloatField()),
+                ('detected_for', models.DateField()),
+                ('category', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='spending_anomalies', to='category.category')),
+                ('transaction', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='anomaly', to='transaction.transaction')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='spending_anomalies', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['user', '-detected_for'], name='anomaly_user_detected_idx')],
+            },
+        ),
+    ]
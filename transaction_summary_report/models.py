@@ -1,3 +1,40 @@
 from django.db import models
+from user.models import CustomUser
+from category.models import Category
+from transaction.models import Transaction
+from utils.models import BaseModel
 
-# Create your models here.
+
+class SpendingAnomaly(BaseModel):
+    """
+    A debit flagged by the nightly `detect_spending_anomalies` job.
+
+    The median and MAD are those of the user's debits in the same category over
+    the history window before `detected_for`; `score` is the robust z-score of
+    the transaction amount against them.
+    """
+
+    user = models.ForeignKey(
+        CustomUser, on_delete=models.CASCADE, related_name="spending_anomalies"
+    )
+    transaction = models.OneToOneField(
+        Transaction, on_delete=models.CASCADE, related_name="anomaly"
+    )
+    category = models.ForeignKey(
+        Category, on_delete=models.CASCADE, related_name="spending_anomalies"
+    )
+    amount = models.DecimalField(max_digits=10, decimal_places=2)
+    median = models.DecimalField(max_digits=10, decimal_places=2)
+    mad = models.DecimalField(max_digits=10, decimal_places=2)
+    score = models.FloatField()
+    detected_for = models.DateField()
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["user", "-detected_for"], name="anomaly_user_detected_idx"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.transaction_id} ({self.score:.1f})"
@@ -1,14 +1,29 @@
 from rest_framework import serializers
-from transaction.models import Transaction
+from .models import SpendingAnomaly
 
 
-class TransactionReportSerializer(serializers.ModelSerializer):
-    category = serializers.CharField(source="category.name")
+class TransactionReportSerializer(serializers.Serializer):
+    """Serializes report rows fetched as `values()` dicts with a joined category name."""
+
+    category = serializers.CharField(source="category_name", allow_null=True)
+    amount = serializers.DecimalField(max_digits=10, decimal_places=2)
     date = serializers.DateTimeField()
 
-    class Meta:
-        model = Transaction
-        fields = ["category", "amount", "date"]
 
-    def get_date(self, obj):
-        return obj.date.date()
+class SpendingAnomalySerializer(serializers.ModelSerializer):
+    category_name = serializers.CharField(source="category.name", read_only=True)
+
+    class Meta:
+        model = SpendingAnomaly
+        fields = [
+            "id",
+            "transaction",
+            "category",
+            "category_name",
+            "amount",
+            "median",
+            "mad",
+            "score",
+            "detected_for",
+            "created_at",
+        ]
@@ -2,11 +2,23 @@ from services.notification import send_mail
 from celery import shared_task
 from django.conf import settings
 from transaction.models import Transaction
-import csv, io
+import csv
+import io
+import tempfile
+import uuid
+from datetime import date, timedelta
+import numpy as np
+from django.core.cache import cache
+from django.utils import timezone
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import Coalesce
+from utils.constants import TransactionType
 from utils.logging import logger
 from reportlab.lib.pagesizes import letter
 from reportlab.lib import colors
 from user.models import CustomUser
+from .analytics import group_median_mad, robust_z_scores
+from .models import SpendingAnomaly
 from reportlab.platypus import (
     SimpleDocTemplate,
     Paragraph,
@@ -18,24 +30,94 @@ from reportlab.lib.units import inch
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 
 
+class ReportRow:
+    """One report line; __slots__ keeps per-row overhead small while streaming."""
+
+    __slots__ = ("category", "amount", "date")
+
+    def __init__(self, category, amount, date):
+        self.category = category
+        self.amount = amount
+        self.date = date
+
+
+class _FlowableStream(list):
+    """
+    Flowable list for `doc.build` that is refilled lazily from a generator.
+
+    reportlab consumes flowables from the front of the list, so only a small
+    window of tables is held in memory instead of one table for every row.
+    """
+
+    def __init__(self, source, lookahead=8):
+        super().__init__()
+        self._source = iter(source)
+        self._lookahead = lookahead
+
+    def _fill(self):
+        while list.__len__(self) < self._lookahead:
+            try:
+                self.append(next(self._source))
+            except StopIteration:
+                break
+
+    def __len__(self):
+        self._fill()
+        return list.__len__(self)
+
+    def __getitem__(self, index):
+        self._fill()
+        return list.__getitem__(self, index)
+
+
 class TransactionReport:
-    """Handles creating transaction reports in CSV or PDF format"""
+    """
+    Handles creating transaction reports in CSV or PDF format.
+
+    Reports are built in two phases: the totals come from one DB aggregate,
+    then rows are streamed from a chunked cursor straight into the CSV writer
+    or PDF tables, so memory does not grow with the number of transactions.
+    """
+
+    CHUNK_SIZE = 2000
+    PDF_TABLE_ROWS = 200
+    # Output is kept in memory up to this size before spilling to disk.
+    SPOOL_SIZE = 5 * 1024 * 1024
 
     def __init__(self, start_date, end_date, transactions):
         self.start_date = start_date
         self.end_date = end_date
+        self.transactions = transactions
 
-        # Split transactions into income and expenses
-        self.income = [t for t in transactions if t["type"] == "credit"]
-        self.expenses = [t for t in transactions if t["type"] == "debit"]
-
-        # Calculate totals
-        self.total_income = sum(float(t["amount"]) for t in self.income)
-        self.total_expenses = sum(float(t["amount"]) for t in self.expenses)
+        totals = transactions.aggregate(
+            total_income=Sum("amount", filter=Q(type=TransactionType.CREDIT), default=0),
+            total_expenses=Sum("amount", filter=Q(type=TransactionType.DEBIT), default=0),
+            income_count=Count("id", filter=Q(type=TransactionType.CREDIT)),
+            expense_count=Count("id", filter=Q(type=TransactionType.DEBIT)),
+        )
+        self.total_income = totals["total_income"]
+        self.total_expenses = totals["total_expenses"]
+        self.income_count = totals["income_count"]
+        self.expense_count = totals["expense_count"]
+
+    def iter_rows(self, type):
+        """Yield the rows of one transaction type from a chunked cursor."""
+        rows = (
+            self.transactions.filter(type=type)
+            .order_by("date", "id")
+            .values_list(
+                Coalesce("category__name", "savings_plan__name"), "amount", "date"
+            )
+            .iterator(chunk_size=self.CHUNK_SIZE)
+        )
+        for category, amount, date in rows:
+            yield ReportRow(category, amount, date.date().isoformat())
 
     def make_csv(self):
         """Creates a CSV report of transactions"""
-        output = io.StringIO()
+        output = tempfile.SpooledTemporaryFile(
+            max_size=self.SPOOL_SIZE, mode="w+", newline=""
+        )
         writer = csv.writer(output)
 
         # Write header info
@@ -51,23 +133,43 @@ class TransactionReport:
         # Write income
         writer.writerow(["Income"])
         writer.writerow(["Category", "Amount", "Date"])
-        for t in self.income:
-            writer.writerow([t["category"], f"{float(t['amount']):.2f}", t["date"]])
+        for t in self.iter_rows(TransactionType.CREDIT):
+            writer.writerow([t.category, f"{t.amount:.2f}", t.date])
         writer.writerow([])
 
         # Write expenses
         writer.writerow(["Expenses"])
         writer.writerow(["Category", "Amount", "Date"])
-        for t in self.expenses:
-            writer.writerow([t["category"], f"{float(t['amount']):.2f}", t["date"]])
+        for t in self.iter_rows(TransactionType.DEBIT):
+            writer.writerow([t.category, f"{t.amount:.2f}", t.date])
 
         output.seek(0)
         return output
 
     def make_pdf(self):
         """Creates a structured and well-styled PDF report of transactions"""
-        output = io.BytesIO()
+        output = tempfile.SpooledTemporaryFile(max_size=self.SPOOL_SIZE)
         doc = SimpleDocTemplate(output, pagesize=letter)
+
+        # Footer with Page Number
+        def footer(canvas, doc):
+            canvas.saveState()
+            footer_text = "Page %d" % doc.page
+            canvas.setFont("Helvetica", 9)
+            canvas.drawRightString(7.5 * inch, 0.5 * inch, footer_text)
+            canvas.restoreState()
+
+        doc.build(
+            _FlowableStream(self.make_pdf_content()),
+            onLaterPages=footer,
+            onFirstPage=footer,
+        )
+
+        output.seek(0)
+        return output
+
+    def make_pdf_content(self):
+        """Yield the PDF flowables; transaction tables are produced as rows stream in."""
         styles = getSampleStyleSheet()
 
         # Custom styles
@@ -84,16 +186,11 @@ class TransactionReport:
         normal_style = styles["Normal"]
         normal_style.spaceAfter = 8
 
-        # Content List
-        content = []
-
         # Title and Date Range
-        content.append(Paragraph("Your Transaction History", title_style))
-        content.append(Spacer(1, 10))
-        content.append(
-            Paragraph(f"From {self.start_date} to {self.end_date}", normal_style)
-        )
-        content.append(Spacer(1, 15))
+        yield Paragraph("Your Transaction History", title_style)
+        yield Spacer(1, 10)
+        yield Paragraph(f"From {self.start_date} to {self.end_date}", normal_style)
+        yield Spacer(1, 15)
 
         # Summary Table
         summary_data = [
@@ -113,51 +210,41 @@ class TransactionReport:
                 ]
             )
         )
-        content.append(summary_table)
-        content.append(Spacer(1, 20))
-
-        # Transaction Table Generator
-        def make_transaction_table(title, transactions):
-            content.append(Paragraph(title, subtitle_style))
-            content.append(Spacer(1, 10))
-
-            data = [["Category", "Amount", "Date"]]
-            for t in transactions:
-                data.append([t["category"], f"RS {float(t['amount']):.2f}", t["date"]])
-
-            table = Table(data, colWidths=[200, 120, 120])
-            table.setStyle(
-                TableStyle(
-                    [
-                        ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#003366")),
-                        ("TEXTCOLOR", (0, 0), (-1, 0), colors.white),
-                        ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
-                        ("ALIGN", (0, 0), (-1, -1), "CENTER"),
-                        ("GRID", (0, 0), (-1, -1), 1, colors.black),
-                        ("PADDING", (0, 0), (-1, -1), 6),
-                    ]
-                )
-            )
-            content.append(table)
-            content.append(Spacer(1, 15))
-
-        if self.income:
-            make_transaction_table("Income Transactions", self.income)
-        if self.expenses:
-            make_transaction_table("Expense Transactions", self.expenses)
-
-        # Footer with Page Number
-        def footer(canvas, doc):
-            canvas.saveState()
-            footer_text = "Page %d" % doc.page
-            canvas.setFont("Helvetica", 9)
-            canvas.drawRightString(7.5 * inch, 0.5 * inch, footer_text)
-            canvas.restoreState()
-
-        doc.build(content, onLaterPages=footer, onFirstPage=footer)
-
-        output.seek(0)
-        return output
+        yield summary_table
+        yield Spacer(1, 20)
+
+        if self.income_count:
+            yield Paragraph("Income Transactions", subtitle_style)
+            yield Spacer(1, 10)
+            yield from self.make_pdf_tables(TransactionType.CREDIT)
+            yield Spacer(1, 15)
+        if self.expense_count:
+            yield Paragraph("Expense Transactions", subtitle_style)
+            yield Spacer(1, 10)
+            yield from self.make_pdf_tables(TransactionType.DEBIT)
+            yield Spacer(1, 15)
+
+    def make_pdf_tables(self, type):
+        """Yield the rows of one type as a series of fixed-size tables."""
+        table_style = TableStyle(
+            [
+                ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#003366")),
+                ("TEXTCOLOR", (0, 0), (-1, 0), colors.white),
+                ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
+                ("ALIGN", (0, 0), (-1, -1), "CENTER"),
+                ("GRID", (0, 0), (-1, -1), 1, colors.black),
+                ("PADDING", (0, 0), (-1, -1), 6),
+            ]
+        )
+        header = ["Category", "Amount", "Date"]
+        data = [header]
+        for t in self.iter_rows(type):
+            data.append([t.category, f"RS {t.amount:.2f}", t.date])
+            if len(data) > self.PDF_TABLE_ROWS:
+                yield Table(data, colWidths=[200, 120, 120], style=table_style, repeatRows=1)
+                data = [header]
+        if len(data) > 1:
+            yield Table(data, colWidths=[200, 120, 120], style=table_style, repeatRows=1)
 
 
 @shared_task(max_retries=3)
@@ -168,22 +255,10 @@ def email_transaction_history(user_id, user_email, start_date, end_date, file_ty
         user = CustomUser.objects.get(id=user_id)
         transactions = Transaction.objects.filter(
             user=user, is_deleted=False, date__date__range=(start_date, end_date)
-        ).select_related("category")
-
-        # Format transactions for the report
-        formatted_transactions = []
-        for t in transactions:
-            formatted_transactions.append(
-                {
-                    "type": t.type,
-                    "category": t.category.name,
-                    "amount": str(t.amount),
-                    "date": t.date.date().isoformat(),
-                }
-            )
+        )
 
         # Create the report
-        report = TransactionReport(start_date, end_date, formatted_transactions)
+        report = TransactionReport(start_date, end_date, transactions)
         if file_type == "csv":
             file_data = report.make_csv()
         else:
@@ -197,19 +272,33 @@ def email_transaction_history(user_id, user_email, start_date, end_date, file_ty
             "end_date": end_date,
         }
 
-        attachment = {
-            "file_name": f"transactions_{start_date}_{end_date}.{file_type}",
-            "file_data": file_data.getvalue(),
-            "file_type": f"application/{file_type}",
-        }
+        with file_data:
+            file_data.seek(0, io.SEEK_END)
+            size = file_data.tell()
+            file_data.seek(0)
+            if size > settings.REPORT_EMAIL_ATTACHMENT_MAX_BYTES:
+                # Too large to attach: link to the streamed download instead.
+                attachment = None
+                email_data["download_url"] = (
+                    f"{settings.REPORT_DOWNLOAD_BASE_URL}"
+                    "/api/v1/transaction-analytics/summary/?delivery=download"
+                    f"&file_format=csv&start_date={start_date}&end_date={end_date}"
+                )
+            else:
+                # send_mail encodes the open file chunk by chunk.
+                attachment = {
+                    "file_name": f"transactions_{start_date}_{end_date}.{file_type}",
+                    "file_data": file_data,
+                    "file_type": f"application/{file_type}",
+                }
 
-        success = send_mail(
-            [user_email],
-            "Your Transaction History",
-            dynamic_template_data=email_data,
-            dynamic_template_id=settings.SENDGRID_TRANSACTION_HISTORY_TEMPLATE_ID,
-            attachment=attachment,
-        )
+            success = send_mail(
+                [user_email],
+                "Your Transaction History",
+                dynamic_template_data=email_data,
+                dynamic_template_id=settings.SENDGRID_TRANSACTION_HISTORY_TEMPLATE_ID,
+                attachment=attachment,
+            )
 
         if not success:
             raise Exception("Couldn't send email")
@@ -218,3 +307,154 @@ def email_transaction_history(user_id, user_email, start_date, end_date, file_ty
         logger.error(f"Failed to send transaction report: {str(e)}")
         # Retry the task if it fails
         raise email_transaction_history.retry(exc=e)
+
+
+ANOMALY_HISTORY_DAYS = 90
+ANOMALY_MIN_HISTORY = 5
+ANOMALY_SCORE_THRESHOLD = 3.5
+ANOMALY_USER_CHUNK_SIZE = 500
+
+
+@shared_task
+def detect_spending_anomalies(day=None):
+    """
+    Nightly entry point: find the users with debits on `day` (default
+    yesterday) once, split them into user-id shards and fan each shard's ids
+    out to its own task so workers can process the shards in parallel.
+    """
+    day = day or (timezone.localdate() - timedelta(days=1)).isoformat()
+    shards = settings.ANOMALY_DETECTION_SHARDS
+    user_ids = [[] for _ in range(shards)]
+    for user_id in (
+        _anomaly_candidates(date.fromisoformat(day))
+        .values_list("user_id", flat=True)
+        .order_by()
+        .distinct()
+    ):
+        user_ids[user_id.int % shards].append(str(user_id))
+
+    queued = 0
+    for shard_user_ids in user_ids:
+        if shard_user_ids:
+            detect_spending_anomalies_shard.delay(day, shard_user_ids)
+            queued += 1
+    return f"Queued anomaly detection for {day} across {queued} shards"
+
+
+@shared_task
+def detect_spending_anomalies_shard(day, user_ids):
+    """Flag outlier debits of `day` for the users in `user_ids`."""
+    day = date.fromisoformat(day)
+    user_ids = [uuid.UUID(user_id) for user_id in user_ids]
+    flagged = 0
+    for i in range(0, len(user_ids), ANOMALY_USER_CHUNK_SIZE):
+        flagged += _detect_anomalies_for_users(
+            day, user_ids[i : i + ANOMALY_USER_CHUNK_SIZE]
+        )
+    logger.info(
+        "Anomaly detection for %s flagged %s transactions of %s users",
+        day,
+        flagged,
+        len(user_ids),
+    )
+    return flagged
+
+
+def _anomaly_candidates(day):
+    return Transaction.objects.filter(
+        is_deleted=False,
+        type=TransactionType.DEBIT,
+        category__isnull=False,
+        date__date=day,
+    )
+
+
+def _detect_anomalies_for_users(day, user_ids):
+    """Score one chunk of users' debits of `day` against their cached baselines."""
+    candidates = list(
+        _anomaly_candidates(day)
+        .filter(user_id__in=user_ids)
+        .values_list("id", "user_id", "category_id", "amount")
+    )
+    baselines = _get_anomaly_baselines(day, user_ids)
+    no_baseline = (0.0, 0.0, 0)
+    stats = np.array(
+        [
+            baselines[user_id].get(category_id, no_baseline)
+            for _, user_id, category_id, _ in candidates
+        ],
+        dtype=float,
+    ).reshape(-1, 3)
+    amounts = np.array([float(row[3]) for row in candidates])
+    scores = robust_z_scores(amounts, stats[:, 0], stats[:, 1])
+    outliers = np.flatnonzero(
+        (scores > ANOMALY_SCORE_THRESHOLD) & (stats[:, 2] >= ANOMALY_MIN_HISTORY)
+    )
+
+    SpendingAnomaly.objects.bulk_create(
+        [
+            SpendingAnomaly(
+                transaction_id=candidates[i][0],
+                user_id=candidates[i][1],
+                category_id=candidates[i][2],
+                amount=candidates[i][3],
+                median=round(stats[i, 0], 2),
+                mad=round(stats[i, 1], 2),
+                score=float(scores[i]),
+                detected_for=day,
+            )
+            for i in outliers
+        ],
+        # Re-running a day must not duplicate flags.
+        ignore_conflicts=True,
+    )
+    return len(outliers)
+
+
+def _get_anomaly_baselines(day, user_ids):
+    """
+    {user_id: {category_id: (median, mad, count)}} over the history window
+    before `day`. Baselines are cached per (user, day), so retries and reruns
+    of a shard skip the history query; missing users are computed together
+    from one query.
+    """
+    keys = {user_id: f"anomaly-baseline:{user_id}:{day}" for user_id in user_ids}
+    cached = cache.get_many(keys.values())
+    baselines = {
+        user_id: cached[key] for user_id, key in keys.items() if key in cached
+    }
+    missing = [user_id for user_id in user_ids if user_id not in baselines]
+    if not missing:
+        return baselines
+
+    history = list(
+        Transaction.objects.filter(
+            user_id__in=missing,
+            is_deleted=False,
+            type=TransactionType.DEBIT,
+            category__isnull=False,
+            date__date__gte=day - timedelta(days=ANOMALY_HISTORY_DAYS),
+            date__date__lt=day,
+        ).values_list("user_id", "category_id", "amount")
+    )
+    groups = {}
+    codes = np.array(
+        [groups.setdefault((row[0], row[1]), len(groups)) for row in history],
+        dtype=np.int64,
+    )
+    amounts = np.array([float(row[2]) for row in history])
+    median, mad, counts = group_median_mad(codes, amounts, len(groups))
+
+    computed = {user_id: {} for user_id in missing}
+    for (user_id, category_id), code in groups.items():
+        computed[user_id][category_id] = (
+            float(median[code]),
+            float(mad[code]),
+            int(counts[code]),
+        )
+    cache.set_many(
+        {keys[user_id]: value for user_id, value in computed.items()},
+        timeout=60 * 60 * 48,
+    )
+    baselines.update(computed)
+    return baselines
@@ -2,11 +2,15 @@ from django.urls import path
 from .views import (
     TransactionReportAPI,
     SpendingTrendsView,
+    SpendingForecastView,
+    SpendingAnomalyListView,
     TransactionHistoryExportView,
 )
 
 urlpatterns = [
     path("", TransactionReportAPI.as_view(), name="transaction-report"),
     path("trends/", SpendingTrendsView.as_view(), name="transaction-report"),
+    path("forecast/", SpendingForecastView.as_view(), name="spending-forecast"),
+    path("anomalies/", SpendingAnomalyListView.as_view(), name="spending-anomalies"),
     path("summary/", TransactionHistoryExportView.as_view(), name="transaction-report"),
 ]
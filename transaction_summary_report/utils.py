@@ -0,0 +1,182 @@
+import csv
+import json
+import zlib
+from datetime import timedelta
+from decimal import Decimal
+
+from dateutil.relativedelta import relativedelta
+from django.db.models import DateField, Sum
+from django.db.models.functions import TruncDay, TruncMonth, TruncWeek, TruncYear
+
+from utils.constants import TransactionType
+
+EXPORT_CHUNK_SIZE = 2000
+
+EXPORT_COLUMNS = ["date", "type", "category", "savings_plan", "amount", "description"]
+
+
+def iter_export_rows(transactions):
+    """
+    Yield export rows as tuples in EXPORT_COLUMNS order.
+
+    Rows come from a `values_list` projection read through a server-side
+    cursor, so no model instances are built and memory does not grow with the
+    size of the date range.
+    """
+    return (
+        transactions.order_by("date", "id")
+        .values_list(
+            "date",
+            "type",
+            "category__name",
+            "savings_plan__name",
+            "amount",
+            "description",
+        )
+        .iterator(chunk_size=EXPORT_CHUNK_SIZE)
+    )
+
+
+class _Echo:
+    """File-like object whose write() hands the line back to the caller."""
+
+    def write(self, value):
+        return value
+
+
+def stream_csv(rows):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(EXPORT_COLUMNS)
+    for date, type, category, savings_plan, amount, description in rows:
+        yield writer.writerow(
+            [date.isoformat(), type, category or "", savings_plan or "", amount, description]
+        )
+
+
+def stream_ndjson(rows):
+    for date, type, category, savings_plan, amount, description in rows:
+        yield json.dumps(
+            {
+                "date": date.isoformat(),
+                "type": type,
+                "category": category,
+                "savings_plan": savings_plan,
+                "amount": str(amount),
+                "description": description,
+            }
+        ) + "\n"
+
+
+def gzip_stream(chunks, min_flush_size=64 * 1024):
+    """Gzip-encode a stream of text chunks, emitting compressed blocks as they fill."""
+    compressor = zlib.compressobj(wbits=16 + zlib.MAX_WBITS)
+    pending = 0
+    for chunk in chunks:
+        data = chunk.encode("utf-8")
+        pending += len(data)
+        block = compressor.compress(data)
+        if pending >= min_flush_size:
+            block += compressor.flush(zlib.Z_SYNC_FLUSH)
+            pending = 0
+        if block:
+            yield block
+    yield compressor.flush()
+
+
+def accepts_gzip(request):
+    """Whether the Accept-Encoding header allows a gzip response."""
+    for coding in request.META.get("HTTP_ACCEPT_ENCODING", "").split(","):
+        name, _, params = coding.strip().partition(";")
+        if name.strip().lower() not in ("gzip", "*"):
+            continue
+        quality = params.strip().lower()
+        if quality.startswith("q="):
+            try:
+                return float(quality[2:]) > 0
+            except ValueError:
+                return False
+        return True
+    return False
+
+
+TREND_GRANULARITIES = {
+    "day": TruncDay,
+    "week": TruncWeek,
+    "month": TruncMonth,
+    "year": TruncYear,
+}
+
+
+def truncate_date(day, granularity):
+    """Python counterpart of the Trunc* functions for a date."""
+    if granularity == "week":
+        return day - timedelta(days=day.weekday())
+    if granularity == "month":
+        return day.replace(day=1)
+    if granularity == "year":
+        return day.replace(month=1, day=1)
+    return day
+
+
+def get_buckets(start_date, end_date, granularity):
+    """Every bucket start between `start_date` and `end_date`, gaps included."""
+    step = {
+        "day": relativedelta(days=1),
+        "week": relativedelta(weeks=1),
+        "month": relativedelta(months=1),
+        "year": relativedelta(years=1),
+    }[granularity]
+    buckets = []
+    bucket = truncate_date(start_date, granularity)
+    while bucket <= end_date:
+        buckets.append(bucket)
+        bucket += step
+    return buckets
+
+
+def get_bucketed_totals(transactions, granularity):
+    """Totals grouped by (bucket, type, category) in a single query."""
+    trunc = TREND_GRANULARITIES[granularity]
+    return (
+        transactions.annotate(bucket=trunc("date", output_field=DateField()))
+        .values("bucket", "type", "category__name")
+        .annotate(total=Sum("amount"))
+        .order_by()
+    )
+
+
+def build_dense_series(rows, buckets):
+    """
+    Turn (bucket, type, category, total) rows into zero-filled series.
+
+    Returns one series per (type, category) plus per-type totals, each holding
+    one amount per bucket.
+    """
+    index = {bucket: i for i, bucket in enumerate(buckets)}
+    series = {}
+    totals = {
+        TransactionType.CREDIT: [Decimal("0")] * len(buckets),
+        TransactionType.DEBIT: [Decimal("0")] * len(buckets),
+    }
+    for row in rows:
+        i = index[row["bucket"]]
+        key = (row["type"], row["category__name"])
+        if key not in series:
+            series[key] = [Decimal("0")] * len(buckets)
+        series[key][i] += row["total"]
+        totals[row["type"]][i] += row["total"]
+    return {
+        "buckets": [str(bucket) for bucket in buckets],
+        "income_totals": [float(amount) for amount in totals[TransactionType.CREDIT]],
+        "expense_totals": [float(amount) for amount in totals[TransactionType.DEBIT]],
+        "series": [
+            {
+                "type": type,
+                "category_name": category,
+                "amounts": [float(amount) for amount in amounts],
+            }
+            for (type, category), amounts in sorted(
+                series.items(), key=lambda item: (item[0][0], item[0][1] or "")
+            )
+        ],
+    }
@@ -1,10 +1,9 @@
 from rest_framework.views import APIView
 from rest_framework.response import Response
+from django.http import StreamingHttpResponse
 from rest_framework import status
 from rest_framework.exceptions import ValidationError
-from django.db.models import Sum, F
-from django.views.decorators.cache import cache_page
-from django.utils.decorators import method_decorator
+from django.db.models import Sum, F, Q
 from datetime import datetime
 from utils.responses import (
     success_response,
@@ -12,11 +11,37 @@ from utils.responses import (
     not_found_error_response,
     success_single_response,
 )
-from transaction.models import Transaction
+from django.utils import timezone
+from budget.models import Budget
+from transaction.models import MonthlyCategoryTotal, Transaction
+from utils.constants import TransactionType
 from user.models import CustomUser
-from .serializers import TransactionReportSerializer
+from .models import SpendingAnomaly
+from .serializers import SpendingAnomalySerializer, TransactionReportSerializer
+from utils.pagination import CursorOrPageNumberPagination
 from utils.is_uuid import is_uuid
+from utils.cache import get_cached_report
 from .tasks import email_transaction_history
+from .analytics import (
+    FORECAST_HISTORY_MONTHS,
+    TransactionFrame,
+    build_history_matrix,
+    build_report_totals,
+    build_trends,
+    forecast_monthly_spending,
+    month_index,
+)
+from .utils import (
+    TREND_GRANULARITIES,
+    accepts_gzip,
+    build_dense_series,
+    get_bucketed_totals,
+    get_buckets,
+    gzip_stream,
+    iter_export_rows,
+    stream_csv,
+    stream_ndjson,
+)
 from rest_framework.permissions import IsAuthenticated
 
 
@@ -46,6 +71,19 @@ class BaseTransactionView(APIView):
         except (KeyError, ValueError):
             raise ValidationError("Valid start_date and end_date (YYYY-MM-DD) required")
 
+    def get_engine(self, request):
+        """`sql` aggregates in the database; `vector` computes on NumPy columns."""
+        engine = request.query_params.get("engine", "sql").lower()
+        if engine not in ["sql", "vector"]:
+            raise ValidationError("Invalid engine. Use 'sql' or 'vector'")
+        return engine
+
+    def get_report(self, kind, user, params, build):
+        """Serve a report from the per-user report cache, building it on a miss."""
+        if user is None:
+            return build()
+        return get_cached_report(kind, user.id, params, build)
+
     def get_transactions(self, user, start_date, end_date):
         return Transaction.objects.filter(
             user=user, is_deleted=False, date__date__range=(start_date, end_date)
@@ -57,41 +95,78 @@ class TransactionReportAPI(BaseTransactionView):
 
     permission_classes = [IsAuthenticated]
 
-    @method_decorator(cache_page(60 * 15))
     def get(self, request):
         try:
             user = self.get_target_user(request)
             start_date, end_date = self.get_date_range(request)
-            transactions = self.get_transactions(user, start_date, end_date)
-            credit_trans = transactions.filter(type="CREDIT")
-            debit_trans = transactions.filter(type="DEBIT")
+            include_transactions = self.get_include_transactions(request)
+            engine = self.get_engine(request)
 
-            return success_response(
-                {
-                    "total_income": credit_trans.aggregate(total=Sum("amount"))["total"]
-                    or 0,
-                    "total_expense": debit_trans.aggregate(total=Sum("amount"))["total"]
-                    or 0,
-                    "category_expense": debit_trans.values(
-                        category_name=F("category__name")
-                    )
-                    .annotate(total=Sum("amount"))
-                    .order_by("-total"),
-                    "transactions": {
-                        "credit_transactions": TransactionReportSerializer(
-                            credit_trans.order_by("-date"), many=True
-                        ).data,
-                        "debit_transactions": TransactionReportSerializer(
-                            debit_trans.order_by("-date"), many=True
-                        ).data,
-                    },
-                }
+            report = self.get_report(
+                "transactions",
+                user,
+                (start_date, end_date, include_transactions, engine),
+                lambda: self.build_report(
+                    user, start_date, end_date, include_transactions, engine
+                ),
             )
+            return success_response(report)
         except ValidationError as e:
             return validation_error_response(
                 {"error": str(e)},
             )
 
+    def build_report(
+        self, user, start_date, end_date, include_transactions, engine="sql"
+    ):
+        transactions = self.get_transactions(user, start_date, end_date)
+        if engine == "vector":
+            report = build_report_totals(TransactionFrame.from_queryset(transactions))
+        else:
+            report = self.get_totals(transactions)
+            report["category_expense"] = list(
+                transactions.filter(type=TransactionType.DEBIT)
+                .values(category_name=F("category__name"))
+                .annotate(total=Sum("amount"))
+                .order_by("-total")
+            )
+        if include_transactions:
+            report["transactions"] = self.get_transaction_rows(transactions)
+        return report
+
+    def get_include_transactions(self, request):
+        value = request.query_params.get("include_transactions", "true").lower()
+        if value not in ("true", "false"):
+            raise ValidationError("include_transactions must be 'true' or 'false'")
+        return value == "true"
+
+    def get_totals(self, transactions):
+        """Income and expense totals in a single conditional aggregate."""
+        return transactions.aggregate(
+            total_income=Sum(
+                "amount", filter=Q(type=TransactionType.CREDIT), default=0
+            ),
+            total_expense=Sum(
+                "amount", filter=Q(type=TransactionType.DEBIT), default=0
+            ),
+        )
+
+    def get_transaction_rows(self, transactions):
+        """Credit and debit rows from one projected query, split by type."""
+        rows = {TransactionType.CREDIT: [], TransactionType.DEBIT: []}
+        for row in transactions.order_by("-date").values(
+            "type", "amount", "date", category_name=F("category__name")
+        ):
+            rows[row["type"]].append(row)
+        return {
+            "credit_transactions": TransactionReportSerializer(
+                rows[TransactionType.CREDIT], many=True
+            ).data,
+            "debit_transactions": TransactionReportSerializer(
+                rows[TransactionType.DEBIT], many=True
+            ).data,
+        }
+
 
 class SpendingTrendsView(BaseTransactionView):
     """API view for generating spending trends report."""
@@ -102,61 +177,226 @@ class SpendingTrendsView(BaseTransactionView):
         try:
             user = self.get_target_user(request)
             start_date, end_date = self.get_date_range(request)
-            transactions = self.get_transactions(user, start_date, end_date)
+            granularity = self.get_granularity(request)
+            engine = self.get_engine(request)
 
-            credit_trans = transactions.filter(type="CREDIT")
-            debit_trans = transactions.filter(type="DEBIT")
-
-            total_income = credit_trans.aggregate(total=Sum("amount"))["total"] or 0
-            total_expense = debit_trans.aggregate(total=Sum("amount"))["total"] or 0
-
-            def get_category_data(queryset, total):
-                data = queryset.values("category__name").annotate(total=Sum("amount"))
-                return (
-                    [
-                        {
-                            "category_name": item["category__name"],
-                            "amount": float(item["total"]),
-                            "percentage": round((item["total"] / total * 100), 2),
-                        }
-                        for item in data
-                    ]
-                    if total > 0
-                    else []
+            report = self.get_report(
+                "trends",
+                user,
+                (start_date, end_date, granularity, engine),
+                lambda: self.build_report(
+                    user, start_date, end_date, granularity, engine
+                ),
+            )
+            return success_response(report)
+        except ValidationError as e:
+            return validation_error_response(
+                {"error": str(e)},
+            )
+
+    def get_granularity(self, request):
+        granularity = request.query_params.get("granularity")
+        if granularity is None:
+            return None
+        granularity = granularity.lower()
+        if granularity not in TREND_GRANULARITIES:
+            raise ValidationError(
+                "Invalid granularity. Use 'day', 'week', 'month' or 'year'"
+            )
+        return granularity
+
+    def build_report(self, user, start_date, end_date, granularity=None, engine="sql"):
+        transactions = self.get_transactions(user, start_date, end_date)
+        if engine == "vector":
+            return build_trends(
+                TransactionFrame.from_queryset(transactions),
+                start_date,
+                end_date,
+                granularity,
+                get_buckets(start_date, end_date, granularity) if granularity else None,
+            )
+
+        credit_trans = transactions.filter(type="CREDIT")
+        debit_trans = transactions.filter(type="DEBIT")
+
+        total_income = credit_trans.aggregate(total=Sum("amount"))["total"] or 0
+        total_expense = debit_trans.aggregate(total=Sum("amount"))["total"] or 0
+
+        def get_category_data(queryset, total):
+            data = queryset.values("category__name").annotate(total=Sum("amount"))
+            return (
+                [
+                    {
+                        "category_name": item["category__name"],
+                        "amount": float(item["total"]),
+                        "percentage": round((item["total"] / total * 100), 2),
+                    }
+                    for item in data
+                ]
+                if total > 0
+                else []
+            )
+
+        report = {
+            "start_date": str(start_date),
+            "end_date": str(end_date),
+            "total_income": float(total_income),
+            "total_expense": float(total_expense),
+            "income": get_category_data(credit_trans, total_income),
+            "expense": get_category_data(debit_trans, total_expense),
+        }
+        if granularity:
+            report["granularity"] = granularity
+            report.update(
+                build_dense_series(
+                    get_bucketed_totals(transactions, granularity),
+                    get_buckets(start_date, end_date, granularity),
                 )
+            )
+        return report
+
+
+class SpendingForecastView(BaseTransactionView):
+    """API view projecting the coming months of spending per category."""
+
+    permission_classes = [IsAuthenticated]
 
-            return success_response(
+    MAX_MONTHS = 12
+
+    def get(self, request):
+        try:
+            user = self.get_target_user(request)
+            months = self.get_months(request)
+            return success_response(self.build_forecast(user, months))
+        except ValidationError as e:
+            return validation_error_response(
+                {"error": str(e)},
+            )
+
+    def get_months(self, request):
+        try:
+            months = int(request.query_params.get("months", 3))
+        except ValueError:
+            raise ValidationError("months must be an integer")
+        if not 1 <= months <= self.MAX_MONTHS:
+            raise ValidationError(f"months must be between 1 and {self.MAX_MONTHS}")
+        return months
+
+    def build_forecast(self, user, months):
+        """
+        Forecast from the monthly rollup. The current (incomplete) month is the
+        first forecast month; history is the FORECAST_HISTORY_MONTHS before it.
+        """
+        today = timezone.localdate()
+        first = month_index(today.year, today.month)
+        start = first - FORECAST_HISTORY_MONTHS
+        forecast_months = [divmod(first + h, 12) for h in range(months)]
+
+        rows = list(
+            MonthlyCategoryTotal.objects.filter(
+                user=user,
+                type=TransactionType.DEBIT,
+                category__is_deleted=False,
+                year__gte=start // 12,
+                year__lte=(first - 1) // 12,
+            ).values_list("category_id", "category__name", "year", "month", "total")
+        )
+        category_ids, names, history = build_history_matrix(
+            rows, start, FORECAST_HISTORY_MONTHS
+        )
+        forecast, lower, upper = forecast_monthly_spending(history, months)
+
+        budgets = {
+            (category_id, year, month): amount
+            for category_id, year, month, amount in Budget.objects.filter(
+                user=user,
+                is_deleted=False,
+                category_id__in=category_ids,
+                year__gte=forecast_months[0][0],
+                year__lte=forecast_months[-1][0],
+            ).values_list("category_id", "year", "month", "amount")
+        }
+
+        categories = []
+        for code, category_id in enumerate(category_ids):
+            points = []
+            for h, (year, month0) in enumerate(forecast_months):
+                budget = budgets.get((category_id, year, month0 + 1))
+                amount = round(float(forecast[code, h]) / 100, 2)
+                points.append(
+                    {
+                        "year": year,
+                        "month": month0 + 1,
+                        "amount": amount,
+                        "lower": round(float(lower[code, h]) / 100, 2),
+                        "upper": round(float(upper[code, h]) / 100, 2),
+                        "budget": float(budget) if budget is not None else None,
+                        "over_budget": budget is not None and amount > float(budget),
+                    }
+                )
+            categories.append(
                 {
-                    "start_date": str(start_date),
-                    "end_date": str(end_date),
-                    "total_income": float(total_income),
-                    "total_expense": float(total_expense),
-                    "income": get_category_data(credit_trans, total_income),
-                    "expense": get_category_data(debit_trans, total_expense),
+                    "category_id": str(category_id),
+                    "category_name": names[category_id],
+                    "forecast": points,
                 }
             )
+
+        return {
+            "months": [f"{year}-{month0 + 1:02d}" for year, month0 in forecast_months],
+            "categories": categories,
+        }
+
+
+class SpendingAnomalyListView(BaseTransactionView, CursorOrPageNumberPagination):
+    """API view listing debits flagged by the nightly anomaly detection."""
+
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        try:
+            user = self.get_target_user(request)
         except ValidationError as e:
             return validation_error_response(
                 {"error": str(e)},
             )
+        anomalies = SpendingAnomaly.objects.filter(
+            user=user, is_deleted=False, transaction__is_deleted=False
+        ).select_related("category")
+        page = self.paginate_queryset(anomalies, request)
+        serializer = SpendingAnomalySerializer(page, many=True)
+        return success_response(self.get_paginated_payload(serializer.data))
 
 
 class TransactionHistoryExportView(BaseTransactionView):
-    """API view for exporting transaction history."""
+    """API view for exporting transaction history by email or as a streamed download."""
 
     permission_classes = [IsAuthenticated]
 
+    EMAIL_FORMATS = ["csv", "pdf"]
+    DOWNLOAD_FORMATS = {"csv": "text/csv", "ndjson": "application/x-ndjson"}
+
     def get(self, request):
         try:
+            delivery = request.query_params.get("delivery", "email").lower()
+            if delivery not in ["email", "download"]:
+                raise ValidationError("Invalid delivery. Use 'email' or 'download'")
             file_format = request.query_params.get("file_format", "csv").lower()
-            if file_format not in ["csv", "pdf"]:
+            if delivery == "email" and file_format not in self.EMAIL_FORMATS:
                 raise ValidationError("Invalid format. Use 'csv' or 'pdf'")
+            if delivery == "download" and file_format not in self.DOWNLOAD_FORMATS:
+                raise ValidationError("Invalid format. Use 'csv' or 'ndjson'")
             user = self.get_target_user(request)
             start_date, end_date = self.get_date_range(request)
             transactions = self.get_transactions(user, start_date, end_date)
             if not transactions.exists():
                 return not_found_error_response("No transactions found")
 
+            if delivery == "download":
+                return self.stream_download(
+                    request, transactions, file_format, start_date, end_date
+                )
+
             email_transaction_history.delay(
                 user.id, user.email, str(start_date), str(end_date), file_format
             )
@@ -168,3 +408,19 @@ class TransactionHistoryExportView(BaseTransactionView):
             return validation_error_response(
                 {"error": str(e)},
             )
+
+    def stream_download(self, request, transactions, file_format, start_date, end_date):
+        rows = iter_export_rows(transactions)
+        chunks = stream_csv(rows) if file_format == "csv" else stream_ndjson(rows)
+        use_gzip = accepts_gzip(request)
+        response = StreamingHttpResponse(
+            gzip_stream(chunks) if use_gzip else chunks,
+            content_type=self.DOWNLOAD_FORMATS[file_format],
+        )
+        if use_gzip:
+            response["Content-Encoding"] = "gzip"
+        response["Vary"] = "Accept-Encoding"
+        response["Content-Disposition"] = (
+            f'attachment; filename="transactions_{start_date}_{end_date}.{file_format}"'
+        )
+        return response
@@ -1,10 +1,27 @@
 import jwt
+from uuid import UUID
 from rest_framework.authentication import BaseAuthentication
 from rest_framework.exceptions import AuthenticationFailed
 from django.conf import settings
+from django.db import router
 from rest_framework import exceptions
-from .models import ActiveTokens
+from .models import ActiveTokens, CustomUser
 from rest_framework.response import Response
+from utils.token_cache import token_cache, token_digest
+
+
+def cached_user(entry):
+    """
+    Build `request.user` from a token cache entry.
+
+    The instance holds only the cached fields; any other field is loaded
+    from the database the first time it is read, like a deferred field.
+    """
+    return CustomUser.from_db(
+        router.db_for_read(CustomUser),
+        ["id", "email", "is_active", "is_staff"],
+        [UUID(entry["user_id"]), entry["email"], entry["is_active"], entry["is_staff"]],
+    )
 
 
 class CustomTokenAuthentication(BaseAuthentication):
@@ -12,7 +29,9 @@ class CustomTokenAuthentication(BaseAuthentication):
         """
         Custom token authentication method.
 
-        Validates JWT token, checks token validity, and user status.
+        Validates JWT token, checks token validity, and user status. Validated
+        tokens are cached (see `utils.token_cache`), so repeat requests with the
+        same token do not query the database.
         """
         auth_header = request.headers.get("Authorization")
         if not auth_header or not auth_header.startswith("Bearer "):
@@ -21,18 +40,32 @@ class CustomTokenAuthentication(BaseAuthentication):
         try:
             token = auth_header.split(" ")[1]
             payload = jwt.decode(token, settings.SECRET_KEY, algorithms=["HS256"])
-            # Check token in ActiveTokens
-            active_token = ActiveTokens.objects.filter(
-                token=token,
-            ).first()
-            if not active_token:
-                raise AuthenticationFailed("Invalid or expired token")
-
-            user = active_token.user
-            if not user.is_active:
+            digest = token_digest(token)
+            entry = token_cache.get(digest)
+            if entry is None:
+                # Check token in ActiveTokens
+                row = (
+                    ActiveTokens.objects.filter(digest=digest)
+                    .values_list(
+                        "user_id", "user__email", "user__is_active", "user__is_staff"
+                    )
+                    .first()
+                )
+                if not row:
+                    raise AuthenticationFailed("Invalid or expired token")
+                entry = {
+                    "user_id": str(row[0]),
+                    "email": row[1],
+                    "is_active": row[2],
+                    "is_staff": row[3],
+                    "exp": payload["exp"],
+                }
+                token_cache.set(digest, entry)
+
+            if not entry["is_active"]:
                 raise AuthenticationFailed("User account is inactive")
 
-            return (user, token)
+            return (cached_user(entry), token)
 
         except jwt.ExpiredSignatureError:
             raise AuthenticationFailed("Token has expired")
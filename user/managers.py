@@ -1,8 +1,26 @@
+from functools import partial
 from django.contrib.auth.models import BaseUserManager
 from django.core.exceptions import ValidationError
+from django.db import models, transaction
+from utils.token_cache import token_cache
 
 
-class CustomUserManager(BaseUserManager):
+class CustomUserQuerySet(models.QuerySet):
+    def update(self, **kwargs):
+        """
+        Update the users and, when a field copied into cached tokens changes
+        (e.g. deactivation), revoke their cached tokens after commit.
+        """
+        if not set(kwargs) & set(self.model.TOKEN_CACHED_FIELDS):
+            return super().update(**kwargs)
+        user_ids = list(self.values_list("id", flat=True))
+        rows = super().update(**kwargs)
+        for user_id in user_ids:
+            transaction.on_commit(partial(token_cache.revoke_user, user_id))
+        return rows
+
+
+class CustomUserManager(BaseUserManager.from_queryset(CustomUserQuerySet)):
     def create_user(self, email, username, password, **extra_fields):
         if not username:
             raise ValueError("Username must be present")
@@ -0,0 +1,57 @@
+import hashlib
+
+import jwt
+from django.db import migrations, models
+from rest_framework_simplejwt.utils import datetime_from_epoch
+
+
+def backfill_digests(apps, schema_editor):
+    ActiveTokens = apps.get_model("user", "ActiveTokens")
+    undecodable = []
+    for row in ActiveTokens.objects.only("id", "token").iterator():
+        try:
+            payload = jwt.decode(row.token, options={"verify_signature": False})
+            expires_at = datetime_from_epoch(payload["exp"])
+        except (jwt.InvalidTokenError, KeyError, TypeError, ValueError):
+            undecodable.append(row.id)
+            continue
+        ActiveTokens.objects.filter(id=row.id).update(
+            digest=hashlib.sha256(row.token.encode()).digest(),
+            expires_at=expires_at,
+        )
+    ActiveTokens.objects.filter(id__in=undecodable).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("user", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="activetokens",
+            name="digest",
+            field=models.BinaryField(max_length=32, null=True),
+        ),
+        migrations.AddField(
+            model_name="activetokens",
+            name="expires_at",
+            field=models.DateTimeField(null=True),
+        ),
+        migrations.RunPython(backfill_digests, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name="activetokens",
+            name="token",
+        ),
+        migrations.AlterField(
+            model_name="activetokens",
+            name="digest",
+            field=models.BinaryField(max_length=32, unique=True),
+        ),
+        migrations.AlterField(
+            model_name="activetokens",
+            name="expires_at",
+            field=models.DateTimeField(db_index=True),
+        ),
+    ]
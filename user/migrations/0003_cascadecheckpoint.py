@@ -0,0 +1,22 @@
+# Generated by Django 5.1.3 on 2026-10-18 19:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user', '0002_activetokens_digest'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CascadeCheckpoint',
+            fields=[
+                ('job', models.CharField(max_length=100, primary_key=True, serialize=False)),
+                ('step', models.PositiveSmallIntegerField(default=0)),
+                ('last_pk', models.CharField(max_length=64, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
@@ -1,5 +1,6 @@
 from django.contrib.auth.models import AbstractBaseUser, PermissionsMixin
-from django.db import models
+from django.db import models, transaction
+from functools import partial
 import uuid
 from .managers import CustomUserManager
 from django.core.validators import (
@@ -7,6 +8,7 @@ from django.core.validators import (
     RegexValidator,
 )
 from utils.models import BaseModel
+from utils.token_cache import token_cache
 
 
 class CustomUser(AbstractBaseUser, PermissionsMixin):
@@ -28,13 +30,61 @@ class CustomUser(AbstractBaseUser, PermissionsMixin):
     USERNAME_FIELD = "username"
     REQUIRED_FIELDS = ["email"]
 
+    # Fields copied into cached tokens (see utils.token_cache).
+    TOKEN_CACHED_FIELDS = ("email", "is_active", "is_staff")
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        user = super().from_db(db, field_names, values)
+        user._loaded_token_flags = user._token_flags()
+        return user
+
+    def _token_flags(self):
+        return {
+            field: self.__dict__[field]
+            for field in self.TOKEN_CACHED_FIELDS
+            if field in self.__dict__
+        }
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        flags = self._token_flags()
+        loaded = getattr(self, "_loaded_token_flags", {})
+        if any(loaded[field] != flags.get(field) for field in loaded):
+            transaction.on_commit(partial(token_cache.revoke_user, self.id))
+        self._loaded_token_flags = flags
+
     def __str__(self):
         return self.email
 
 
 class ActiveTokens(BaseModel):
+    """
+    An access token that has not been logged out.
+
+    Only the SHA-256 digest of the JWT is stored, so the unique index stays
+    narrow; rows past `expires_at` are removed by `purge_expired_tokens`.
+    """
+
     user = models.ForeignKey(CustomUser, on_delete=models.CASCADE, related_name="token")
-    token = models.CharField(max_length=1024, unique=True)
+    digest = models.BinaryField(max_length=32, unique=True)
+    expires_at = models.DateTimeField(db_index=True)
 
     def __str__(self):
         return f"{self.user}"
+
+
+class CascadeCheckpoint(models.Model):
+    """
+    Progress of an unfinished `utils.cascade.run_cascade` job: the step it is
+    on and the last primary key that step has handled. Kept in the database so
+    a retry on any worker resumes where the failed run stopped.
+    """
+
+    job = models.CharField(max_length=100, primary_key=True)
+    step = models.PositiveSmallIntegerField(default=0)
+    last_pk = models.CharField(max_length=64, null=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return self.job
@@ -5,6 +5,7 @@ from .models import CustomUser, ActiveTokens
 from django.contrib.auth.password_validation import validate_password
 from django.core.exceptions import PermissionDenied
 from utils.logging import logger
+from utils.token import TokenHandler
 
 
 class UserSerializer(serializers.ModelSerializer):
@@ -106,9 +107,9 @@ class UpdatePasswordSerializer(serializers.Serializer):
 
         # Invalidate all other tokens except current one only for non-staff users
         if not self.context["request"].user.is_staff:
-            ActiveTokens.objects.filter(user=user).exclude(
-                token=self.context["request"].auth
-            ).delete()
+            TokenHandler.invalidate_user_tokens(
+                user, exclude_token=self.context["request"].auth
+            )
 
         logger.info(f"Password updated successfully for user {user.username}")
         return True
@@ -136,7 +137,7 @@ class DeleteUserSerializer(serializers.Serializer):
 
             user.is_active = False
             user.save()
-            ActiveTokens.objects.filter(user=user).delete()
+            TokenHandler.invalidate_user_tokens(user)
 
             logger.info(f"User {user.username} soft-deleted successfully.")
             return True
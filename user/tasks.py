@@ -1,8 +1,11 @@
 from celery import shared_task
 from services.notification import send_mail
 from django.conf import settings
-from django.db import transaction
-from user.models import CustomUser
+from django.utils import timezone
+from user.models import CustomUser, ActiveTokens
+from utils.cache import invalidate_user_reports
+from utils.cascade import CascadeStep, run_cascade
+from utils.logging import logger
 
 
 @shared_task
@@ -23,29 +26,63 @@ def send_email_task(to_email, reset_link):
     return "Email sent successfully"
 
 
-@shared_task
-def soft_delete_related_data(user_id):
+@shared_task(bind=True, max_retries=5, default_retry_delay=60)
+def soft_delete_related_data(self, user_id):
     """
     Soft delete related data by setting is_deleted = True.
+
+    Runs as a batched cascade (see utils.cascade.run_cascade), so no
+    table is locked for the whole deletion and a retry resumes where the
+    failed run stopped. Recurring schedules go first so nothing new is
+    posted while the rest is deleted.
     """
-    from transaction.models import Transaction
+    from transaction.models import Transaction, MonthlyCategoryTotal
     from budget.models import Budget
     from category.models import Category
-    from saving_plan.models import SavingsPlan, DeadlineExtension, SavingsTransaction
+    from saving_plan.models import SavingsPlan
     from recurring_transaction.models import RecurringTransaction
 
-    # Update all related records to is_deleted=True
+    steps = [
+        CascadeStep("recurring_transactions", RecurringTransaction.objects.filter(user_id=user_id)),
+        CascadeStep("transactions", Transaction.objects.filter(user_id=user_id)),
+        CascadeStep(
+            "monthly_totals",
+            MonthlyCategoryTotal.objects.filter(user_id=user_id),
+            hard_delete=True,
+        ),
+        CascadeStep("budgets", Budget.objects.filter(user_id=user_id)),
+        CascadeStep("savings_plans", SavingsPlan.objects.filter(user_id=user_id)),
+        CascadeStep("categories", Category.objects.filter(user_id=user_id)),
+    ]
     try:
-        user = CustomUser.objects.get(id=user_id)
-        with transaction.atomic():
-            Transaction.objects.filter(user=user).update(is_deleted=True)
-            Budget.objects.filter(user=user).update(is_deleted=True)
-            Category.objects.filter(user=user).update(is_deleted=True)
-            SavingsPlan.objects.filter(user=user).update(is_deleted=True)
-            SavingsTransaction.objects.filter(user=user).update(is_deleted=True)
-            DeadlineExtension.objects.filter(user=user).update(is_deleted=True)
-            RecurringTransaction.objects.filter(user=user).update(is_deleted=True)
-        return "Related data soft deleted successfully."
-
+        changed = run_cascade(f"user:{user_id}", steps)
     except Exception as e:
-        return f"Error soft deleting related data: {str(e)}"
+        logger.error(f"Error soft deleting related data of user {user_id}: {str(e)}", exc_info=True)
+        raise self.retry(exc=e)
+
+    invalidate_user_reports(user_id)
+    return changed
+
+
+@shared_task
+def purge_expired_tokens(batch_size=5000, max_batches=100):
+    """
+    Delete expired ActiveTokens rows in batches of `batch_size`, so each
+    DELETE holds its locks briefly. Stops after `max_batches`; the next run
+    picks up whatever is left.
+    """
+    now = timezone.now()
+    deleted = 0
+    for _ in range(max_batches):
+        ids = list(
+            ActiveTokens.objects.filter(expires_at__lte=now).values_list(
+                "id", flat=True
+            )[:batch_size]
+        )
+        if not ids:
+            break
+        count, _ = ActiveTokens.objects.filter(id__in=ids).delete()
+        deleted += count
+        if len(ids) < batch_size:
+            break
+    return f"Purged {deleted} expired tokens."
@@ -0,0 +1,60 @@
+import time
+from functools import partial
+
+from django.core.cache import cache
+from django.db import transaction as db_transaction
+
+REPORT_CACHE_TIMEOUT = 60 * 15
+
+
+def _generation_key(user_id):
+    return f"report-generation:{user_id}"
+
+
+def get_report_generation(user_id):
+    """Return the current report cache generation of a user."""
+    key = _generation_key(user_id)
+    generation = cache.get(key)
+    if generation is None:
+        # Start from the clock so a counter lost to eviction never reuses a
+        # generation that still has live report entries.
+        cache.add(key, time.time_ns(), timeout=None)
+        generation = cache.get(key)
+    return generation
+
+
+def _bump_report_generation(user_id):
+    key = _generation_key(user_id)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, time.time_ns(), timeout=None)
+
+
+def invalidate_user_reports(*user_ids):
+    """
+    Invalidate the cached reports of `user_ids`.
+
+    The generation is bumped once the surrounding DB transaction commits, so a
+    report built before the commit cannot be cached under the new generation.
+    """
+    for user_id in set(user_ids):
+        db_transaction.on_commit(partial(_bump_report_generation, user_id))
+
+
+def get_cached_report(kind, user_id, params, build):
+    """
+    Return the `kind` report of a user for `params`, building it on a miss.
+
+    Entries are keyed by the user's generation, so writes made through
+    `invalidate_user_reports` make older entries unreachable.
+    """
+    generation = get_report_generation(user_id)
+    key = "report:{}:{}:{}:{}".format(
+        kind, user_id, generation, ":".join(str(p) for p in params)
+    )
+    report = cache.get(key)
+    if report is None:
+        report = build()
+        cache.set(key, report, timeout=REPORT_CACHE_TIMEOUT)
+    return report
@@ -0,0 +1,67 @@
+from django.conf import settings
+from django.db import transaction as db_transaction
+
+from user.models import CascadeCheckpoint
+from utils.logging import logger
+
+
+class CascadeStep:
+    """
+    One table of a cascade: the rows of `queryset` are soft deleted, or
+    deleted outright when `hard_delete` is set.
+    """
+
+    def __init__(self, name, queryset, hard_delete=False):
+        self.name = name
+        self.queryset = queryset if hard_delete else queryset.filter(is_deleted=False)
+        self.hard_delete = hard_delete
+
+    def apply(self, pks):
+        rows = self.queryset.model.objects.filter(pk__in=pks)
+        if self.hard_delete:
+            return rows.delete()[0]
+        return rows.update(is_deleted=True)
+
+
+def run_cascade(job, steps, batch_size=None):
+    """
+    Apply `steps` in order, in primary-key ordered batches of `batch_size`.
+
+    Every batch runs in its own short DB transaction, so no lock is held for
+    longer than one batch. The (step, last pk) position of `job` is saved in
+    a CascadeCheckpoint row in the same transaction as the batch, so a retry
+    of the same job on any worker resumes exactly after the last committed
+    batch. Returns the number of rows changed per step name.
+    """
+    batch_size = batch_size or settings.CASCADE_BATCH_SIZE
+    checkpoint, _ = CascadeCheckpoint.objects.get_or_create(job=job)
+    changed = {}
+
+    for index, step in enumerate(steps):
+        if index < checkpoint.step:
+            continue
+        last_pk = checkpoint.last_pk if index == checkpoint.step else None
+        changed[step.name] = 0
+
+        while True:
+            queryset = step.queryset.order_by("pk")
+            if last_pk is not None:
+                queryset = queryset.filter(pk__gt=last_pk)
+            pks = list(queryset.values_list("pk", flat=True)[:batch_size])
+            if not pks:
+                break
+
+            with db_transaction.atomic():
+                changed[step.name] += step.apply(pks)
+                last_pk = pks[-1]
+                checkpoint.step, checkpoint.last_pk = index, str(last_pk)
+                checkpoint.save(update_fields=["step", "last_pk", "updated_at"])
+            if len(pks) < batch_size:
+                break
+
+        checkpoint.step, checkpoint.last_pk = index + 1, None
+        checkpoint.save(update_fields=["step", "last_pk", "updated_at"])
+
+    checkpoint.delete()
+    logger.info("Cascade %s finished: %s", job, changed)
+    return changed
@@ -28,6 +28,19 @@ class Frequency:
     ]
 
 
+class BudgetAlertLevel:
+    """Enum for the highest budget threshold already alerted on"""
+    NONE = 0
+    WARNING = 1
+    CRITICAL = 2
+
+    CHOICES = [
+        (NONE, "None"),
+        (WARNING, "Warning"),
+        (CRITICAL, "Critical"),
+    ]
+
+
 class TransactionType:
     """Enum for Transaction Type"""
     CREDIT = "CREDIT"
@@ -37,3 +50,18 @@ class TransactionType:
         (CREDIT, "Credit"),
         (DEBIT, "Debit"),
     ]
+
+
+class ImportStatus:
+    """Enum for Transaction Import Status"""
+    PENDING = "PENDING"
+    PROCESSING = "PROCESSING"
+    COMPLETED = "COMPLETED"
+    FAILED = "FAILED"
+
+    CHOICES = [
+        (PENDING, "Pending"),
+        (PROCESSING, "Processing"),
+        (COMPLETED, "Completed"),
+        (FAILED, "Failed"),
+    ]
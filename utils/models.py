@@ -3,6 +3,26 @@ import uuid
 from django.db import models
 
 
+class SoftDeleteManager(models.Manager):
+    """
+    Default manager of BaseModel models: soft-deleted rows are left out.
+
+    Use `all_with_deleted()` where deleted rows must be seen too (staff
+    listings, de-duplication). Related-object access through a foreign key
+    goes through the plain base manager and still finds deleted rows.
+    """
+
+    def get_queryset(self):
+        return super().get_queryset().filter(is_deleted=False)
+
+    def all_with_deleted(self):
+        return super().get_queryset()
+
+    def visible_to(self, user):
+        """Rows `user` may look up: staff see deleted rows too."""
+        return self.all_with_deleted() if user.is_staff else self.get_queryset()
+
+
 class BaseModel(models.Model):
 
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
@@ -10,5 +30,7 @@ class BaseModel(models.Model):
     updated_at = models.DateTimeField(auto_now=True)
     is_deleted = models.BooleanField(default=False)
 
+    objects = SoftDeleteManager()
+
     class Meta:
         abstract = True
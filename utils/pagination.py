@@ -1,4 +1,12 @@
-from rest_framework.pagination import PageNumberPagination
+import base64
+import json
+from datetime import datetime
+from uuid import UUID
+
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import PageNumberPagination, BasePagination
+from rest_framework.utils.urls import replace_query_param
 
 
 class CustomPageNumberPagination(PageNumberPagination):
@@ -7,3 +15,149 @@ class CustomPageNumberPagination(PageNumberPagination):
     page_size = 5
     page_size_query_param = "page_size"
     max_page_size = 100
+
+
+class CustomCursorPagination(BasePagination):
+    """
+    Keyset pagination on (created_at, id).
+
+    Pages are fetched with a `WHERE (created_at, id) < cursor` filter instead of
+    an OFFSET, so deep pages cost the same as the first one, and no COUNT query
+    is issued. Cursors are opaque base64 tokens.
+    """
+
+    page_size = 5
+    page_size_query_param = "page_size"
+    max_page_size = 100
+    cursor_query_param = "cursor"
+    invalid_cursor_message = "Invalid cursor"
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        self.next_position = None
+        self.previous_position = None
+
+        cursor = self.decode_cursor(request)
+        reverse = bool(cursor and cursor["reverse"])
+
+        if cursor is None:
+            queryset = queryset.order_by("-created_at", "-id")
+        elif reverse:
+            queryset = queryset.filter(
+                Q(created_at__gt=cursor["created_at"])
+                | Q(created_at=cursor["created_at"], id__gt=cursor["id"])
+            ).order_by("created_at", "id")
+        else:
+            queryset = queryset.filter(
+                Q(created_at__lt=cursor["created_at"])
+                | Q(created_at=cursor["created_at"], id__lt=cursor["id"])
+            ).order_by("-created_at", "-id")
+
+        # Fetch one extra row to know whether there is more in this direction.
+        results = list(queryset[: self.page_size + 1])
+        has_more = len(results) > self.page_size
+        results = results[: self.page_size]
+        if reverse:
+            results.reverse()
+            has_next, has_previous = True, has_more
+        else:
+            has_next, has_previous = has_more, cursor is not None
+
+        if results:
+            if has_next:
+                self.next_position = results[-1]
+            if has_previous:
+                self.previous_position = results[0]
+
+        return results
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+            if page_size > 0:
+                return min(page_size, self.max_page_size)
+        except (KeyError, ValueError):
+            pass
+        return self.page_size
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            raw = json.loads(base64.urlsafe_b64decode(encoded.encode("ascii")))
+            return {
+                "created_at": datetime.fromisoformat(raw["c"]),
+                "id": UUID(raw["i"]),
+                "reverse": bool(raw.get("r")),
+            }
+        except (TypeError, ValueError, KeyError, UnicodeEncodeError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def encode_cursor(self, obj, reverse):
+        raw = {"c": obj.created_at.isoformat(), "i": str(obj.id)}
+        if reverse:
+            raw["r"] = 1
+        token = base64.urlsafe_b64encode(json.dumps(raw).encode("ascii"))
+        return replace_query_param(
+            self.base_url, self.cursor_query_param, token.decode("ascii")
+        )
+
+    def get_next_link(self):
+        if self.next_position is None:
+            return None
+        return self.encode_cursor(self.next_position, reverse=False)
+
+    def get_previous_link(self):
+        if self.previous_position is None:
+            return None
+        return self.encode_cursor(self.previous_position, reverse=True)
+
+
+class CursorOrPageNumberPagination:
+    """
+    List pagination used by the API views.
+
+    Cursor pagination is the default. Clients that still page by number can pass
+    `?pagination=offset` (or a `page` parameter) to get the previous
+    page-number behaviour, including the total `count`.
+    """
+
+    pagination_query_param = "pagination"
+
+    def use_offset_pagination(self, request):
+        mode = request.query_params.get(self.pagination_query_param)
+        if mode:
+            return mode.lower() == "offset"
+        return CustomPageNumberPagination.page_query_param in request.query_params
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if self.use_offset_pagination(request):
+            self._paginator = CustomPageNumberPagination()
+        else:
+            self._paginator = CustomCursorPagination()
+        return self._paginator.paginate_queryset(queryset, request, view=view)
+
+    def get_next_link(self):
+        return self._paginator.get_next_link()
+
+    def get_previous_link(self):
+        return self._paginator.get_previous_link()
+
+    def get_paginated_payload(self, results):
+        """Build the `data` body of a paginated list response."""
+        payload = {}
+        if isinstance(self._paginator, CustomPageNumberPagination):
+            # Reuse the count the paginator already ran instead of a second COUNT.
+            page = getattr(self._paginator, "page", None)
+            payload["count"] = page.paginator.count if page is not None else 0
+        payload.update(
+            {
+                "next": self.get_next_link(),
+                "previous": self.get_previous_link(),
+                "results": results,
+            }
+        )
+        return payload
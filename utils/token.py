@@ -1,7 +1,11 @@
 from .logging import logger
+from django.conf import settings
+from django.utils import timezone
 from rest_framework_simplejwt.tokens import RefreshToken, AccessToken
+from rest_framework_simplejwt.utils import datetime_from_epoch
 from rest_framework.exceptions import ValidationError
 from user.models import ActiveTokens
+from .token_cache import token_cache, token_digest
 
 # Set up logging
 
@@ -27,11 +31,17 @@ class TokenHandler:
         """
         Generate access and refresh tokens for a user.
         """
-        access_token = str(AccessToken.for_user(user))
+        access = AccessToken.for_user(user)
+        access_token = str(access)
         refresh_token = str(RefreshToken.for_user(user))
 
-        # Store the active access token in the database
-        ActiveTokens.objects.create(user=user, token=access_token)
+        # Store the digest of the active access token in the database
+        ActiveTokens.objects.create(
+            user=user,
+            digest=token_digest(access_token),
+            expires_at=datetime_from_epoch(access["exp"]),
+        )
+        TokenHandler.enforce_session_limit(user)
         logger.info(f"Generated tokens for user {user.username}.")
         return {
             "access_token": access_token,
@@ -39,23 +49,63 @@ class TokenHandler:
         }
 
     @staticmethod
-    def invalidate_user_tokens(user):
+    def invalidate_user_tokens(user, exclude_token=None):
         """
-        Invalidate all active tokens for a given user.
+        Invalidate all active tokens for a given user, optionally keeping
+        `exclude_token`, and evict them from the token cache.
         """
-        deleted_count, _ = ActiveTokens.objects.filter(user=user).delete()
+        tokens = ActiveTokens.objects.filter(user=user)
+        if exclude_token:
+            tokens = tokens.exclude(digest=token_digest(exclude_token))
+        deleted_count = TokenHandler._delete_tokens(tokens)
         logger.info(f"Invalidated {deleted_count} tokens for user {user.username}.")
 
+    @staticmethod
+    def enforce_session_limit(user):
+        """
+        Keep at most MAX_ACTIVE_SESSIONS_PER_USER active tokens for `user`,
+        logging out the oldest ones. A limit of 0 means no limit.
+        """
+        limit = settings.MAX_ACTIVE_SESSIONS_PER_USER
+        if not limit:
+            return
+        stale = ActiveTokens.objects.filter(
+            id__in=ActiveTokens.objects.filter(user=user)
+            .order_by("-created_at", "-id")
+            .values_list("id", flat=True)[limit:]
+        )
+        deleted_count = TokenHandler._delete_tokens(stale)
+        if deleted_count:
+            logger.info(
+                f"Logged out {deleted_count} old sessions for user {user.username}."
+            )
+
+    @staticmethod
+    def _delete_tokens(tokens):
+        """Delete `tokens` and revoke their users' cached tokens in every process."""
+        rows = list(tokens.values_list("digest", "user_id"))
+        token_cache.evict(*(bytes(digest) for digest, _ in rows))
+        for user_id in {user_id for _, user_id in rows}:
+            token_cache.revoke_user(user_id)
+        deleted_count, _ = tokens.delete()
+        return deleted_count
+
     @staticmethod
     def invalidate_access_token(token):
         """
         Invalidate a specific access token.
         """
-        deleted_count, _ = ActiveTokens.objects.filter(token=token).delete()
+        digest = token_digest(token)
+        token_cache.evict(digest)
+        deleted_count = TokenHandler._delete_tokens(
+            ActiveTokens.objects.filter(digest=digest)
+        )
         if deleted_count == 0:
-            logger.warning(f"Attempted to invalidate a non-existent token: {token}.")
+            logger.warning(
+                f"Attempted to invalidate a non-existent token: {digest.hex()}."
+            )
         else:
-            logger.info(f"Invalidated access token: {token}.")
+            logger.info(f"Invalidated access token: {digest.hex()}.")
 
     @staticmethod
     def blacklist_refresh_token(refresh_token):
@@ -76,10 +126,12 @@ class TokenHandler:
         Validate a token and ensure it's active.
         """
         try:
-            active_token = ActiveTokens.objects.filter(token=token).first()
+            active_token = ActiveTokens.objects.filter(
+                digest=token_digest(token), expires_at__gt=timezone.now()
+            ).first()
             if not active_token:
                 raise ValidationError("Token is invalid or has been logged out.")
-            logger.info(f"Token {token} is valid.")
+            logger.info(f"Token for user {active_token.user_id} is valid.")
             return active_token.user
         except ValidationError as e:
             logger.error(f"Token validation failed: {str(e)}.")
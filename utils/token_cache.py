@@ -0,0 +1,145 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+
+
+def token_digest(token):
+    """Return the 32-byte SHA-256 digest that identifies a token."""
+    return hashlib.sha256(token.encode()).digest()
+
+
+class TokenCache:
+    """
+    Two-level cache of validated access tokens.
+
+    Maps a token digest to {"user_id", "email", "is_active", "is_staff",
+    "exp"}. The first level is an in-process LRU whose entries live for at
+    most TOKEN_CACHE_LOCAL_TTL seconds (and never past the token's `exp`).
+    The second level is the default Django cache, where entries expire with
+    the token.
+
+    Every entry also records its user's generation, a shared counter that
+    `revoke_user` bumps on logout, deactivation and permission changes. Hits
+    from either level whose generation is behind are dropped, so other
+    processes stop accepting a revoked token at once. That needs a cache all
+    processes share, so without TOKEN_CACHE_SHARED nothing is cached and
+    every request checks the database.
+    """
+
+    def __init__(self):
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def max_size(self):
+        return settings.TOKEN_CACHE_LOCAL_MAX_SIZE
+
+    @property
+    def local_ttl(self):
+        return settings.TOKEN_CACHE_LOCAL_TTL
+
+    @property
+    def shared(self):
+        return settings.TOKEN_CACHE_SHARED
+
+    @property
+    def generation_ttl(self):
+        return int(settings.SIMPLE_JWT["ACCESS_TOKEN_LIFETIME"].total_seconds())
+
+    @staticmethod
+    def _shared_key(digest):
+        # v2 entries carry the email; older ones are not read.
+        return f"auth-token:v2:{digest.hex()}"
+
+    @staticmethod
+    def _generation_key(user_id):
+        return f"auth-token-generation:{user_id}"
+
+    def _generation(self, user_id):
+        return cache.get(self._generation_key(user_id), 0)
+
+    def get(self, digest):
+        if not self.shared:
+            return None
+        now = time.time()
+        entry = None
+        with self._lock:
+            item = self._entries.get(digest)
+            if item is not None:
+                entry, expires_at = item
+                if expires_at > now:
+                    self._entries.move_to_end(digest)
+                else:
+                    entry = None
+                    del self._entries[digest]
+
+        if entry is None:
+            entry = cache.get(self._shared_key(digest))
+            if entry is None:
+                return None
+            self._store_local(digest, entry, now)
+        if entry.get("generation") != self._generation(entry["user_id"]):
+            self.evict(digest)
+            return None
+        return entry
+
+    def set(self, digest, entry):
+        if not self.shared:
+            return
+        now = time.time()
+        entry = {**entry, "generation": self._generation(entry["user_id"])}
+        self._store_local(digest, entry, now)
+        timeout = int(entry["exp"] - now)
+        if timeout > 0:
+            cache.set(self._shared_key(digest), entry, timeout=timeout)
+
+    def _store_local(self, digest, entry, now):
+        expires_at = min(now + self.local_ttl, entry["exp"])
+        with self._lock:
+            self._entries[digest] = (entry, expires_at)
+            self._entries.move_to_end(digest)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def evict(self, *digests):
+        """Drop `digests` from both levels."""
+        with self._lock:
+            for digest in digests:
+                self._entries.pop(digest, None)
+        if self.shared and digests:
+            cache.delete_many([self._shared_key(digest) for digest in digests])
+
+    def revoke_user(self, user_id):
+        """
+        Drop every cached token of `user_id`: its local entries here and, by
+        bumping its generation, its entries in the shared cache and in the
+        local caches of other processes.
+        """
+        user_id = str(user_id)
+        with self._lock:
+            for digest in [
+                digest
+                for digest, (entry, _) in self._entries.items()
+                if entry["user_id"] == user_id
+            ]:
+                del self._entries[digest]
+        if self.shared:
+            # The counter outlives every token cached under its old value.
+            key = self._generation_key(user_id)
+            cache.add(key, 0, timeout=self.generation_ttl)
+            try:
+                cache.incr(key)
+            except ValueError:
+                # Expired between add() and incr(); a fresh counter works too.
+                cache.set(key, 1, timeout=self.generation_ttl)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+token_cache = TokenCache()